@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     # Server
     HOST: str = Field(default="0.0.0.0", description="Server host")
     PORT: int = Field(default=8000, description="Server port")
+    API_BASE_URL: str = Field(default="http://localhost:8000", description="Public API base URL used in tracking links")
     
     # Security
     SECRET_KEY: str = Field(..., description="Application secret key")
@@ -80,11 +81,19 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, description="API rate limit per minute")
     RATE_LIMIT_BURST: int = Field(default=100, description="API rate limit burst")
+    RATE_LIMIT_APPROXIMATE: bool = Field(default=False, description="Admit API requests from quota leased from Redis in chunks")
+    RATE_LIMIT_MAX_ERROR: float = Field(default=0.05, description="Fraction of a rate limit one process may lease at a time")
+    RATE_LIMIT_LEASE_SECONDS: float = Field(default=1.0, description="Seconds leased rate limit quota stays usable")
     
     # Email Settings
     EMAIL_BATCH_SIZE: int = Field(default=100, description="Email batch size for sending")
     EMAIL_RETRY_ATTEMPTS: int = Field(default=3, description="Email retry attempts")
     EMAIL_RETRY_DELAY: int = Field(default=60, description="Email retry delay in seconds")
+    EMAIL_DISPATCH_CONCURRENCY: int = Field(default=10, description="Max in-flight SES sends per queue worker")
+    EMAIL_ACK_BATCH_SIZE: int = Field(default=50, description="Completed jobs acknowledged to the queue per batch")
+    EMAIL_SEND_RATE_SHARE: Optional[float] = Field(default=None, description="Fraction of the SES MaxSendRate one queue worker may use, split evenly across live workers when unset")
+    EMAIL_REPUTATION_CACHE_TTL: int = Field(default=60, description="Seconds a cached SES reputation verdict stays valid")
+    SES_FALLBACK_SEND_RATE: float = Field(default=1.0, description="Send rate (emails/s) used when the SES quota cannot be read")
     
     # Token Limits
     DEFAULT_TOKEN_LIMIT: int = Field(default=10000, description="Default monthly token limit")
@@ -2,44 +2,35 @@
 Redis client configuration and connection management for ColdCopy.
 """
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 import json
 import asyncio
+import math
+import time
 from datetime import datetime, timedelta
 
-import aioredis
-from aioredis import Redis
+from redis.asyncio import Redis
 
 from core.config import get_settings
+from utils.cache_codecs import fast_json_dumps, fast_json_loads
+from utils.cache_manager import TAG_CHUNK_SIZE, TAG_INDEX_SCRIPT, iter_tag_members
+from utils.redis_manager import get_redis_pool
 
 logger = logging.getLogger(__name__)
 
 
 class RedisClient:
-    """Redis client with connection pooling and error handling."""
+    """Redis client borrowed from the shared "default" pool in utils.redis_manager."""
     
     def __init__(self):
         self.settings = get_settings()
         self._client: Optional[Redis] = None
-        self._connection_pool = None
     
     async def connect(self):
-        """Initialize Redis connection."""
+        """Borrow the shared text client."""
         if self._client is None:
             try:
-                self._client = aioredis.from_url(
-                    self.settings.REDIS_URL,
-                    encoding="utf-8",
-                    decode_responses=True,
-                    socket_keepalive=True,
-                    socket_keepalive_options={},
-                    health_check_interval=30,
-                    retry_on_timeout=True,
-                    max_connections=20
-                )
-                
-                # Test connection
-                await self._client.ping()
+                self._client = await get_redis_pool("default")
                 logger.info("Redis connection established successfully")
                 
             except Exception as e:
@@ -47,11 +38,10 @@ class RedisClient:
                 raise
     
     async def disconnect(self):
-        """Close Redis connection."""
+        """Release the client; the pool itself is closed by shutdown_redis()."""
         if self._client:
-            await self._client.close()
             self._client = None
-            logger.info("Redis connection closed")
+            logger.info("Redis connection released")
     
     @property
     def client(self) -> Redis:
@@ -83,23 +73,33 @@ async def get_redis() -> Redis:
 
 
 class CacheManager:
-    """High-level cache management with serialization and TTL support."""
+    """
+    High-level cache management with serialization and TTL support.
+    
+    Values are stored as JSON text, encoded with orjson when it is installed,
+    so they stay readable by every client of this Redis.
+    """
     
     def __init__(self, redis_client: Redis, prefix: str = "coldcopy"):
         self.redis = redis_client
         self.prefix = prefix
+        self._tag_script = redis_client.register_script(TAG_INDEX_SCRIPT)
     
     def _make_key(self, key: str) -> str:
         """Create prefixed cache key."""
         return f"{self.prefix}:{key}"
     
+    def _make_tag_key(self, tag: str) -> str:
+        """Create tag index key, shared with utils.cache_manager.CacheManager."""
+        return f"{self.prefix}:tags:{tag}"
+    
     async def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache with JSON deserialization."""
         try:
             cached_value = await self.redis.get(self._make_key(key))
             if cached_value is None:
                 return default
-            return json.loads(cached_value)
+            return fast_json_loads(cached_value)
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {str(e)}")
             return default
@@ -108,18 +108,31 @@ class CacheManager:
         self, 
         key: str, 
         value: Any, 
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """Set value in cache with JSON serialization."""
         try:
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = fast_json_dumps(value)
             cache_key = self._make_key(key)
+            pipe = self.redis.pipeline()
             
             if ttl_seconds:
-                await self.redis.setex(cache_key, ttl_seconds, serialized_value)
+                pipe.setex(cache_key, ttl_seconds, serialized_value)
             else:
-                await self.redis.set(cache_key, serialized_value)
+                pipe.set(cache_key, serialized_value)
             
+            # Register the key so clear_tag finds it without scanning
+            if tags:
+                now = time.time()
+                expires_at = now + ttl_seconds if ttl_seconds else "+inf"
+                await self._tag_script(
+                    keys=[self._make_tag_key(tag) for tag in tags],
+                    args=[cache_key, expires_at, now],
+                    client=pipe
+                )
+            
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {str(e)}")
@@ -170,7 +183,7 @@ class CacheManager:
             for i, (original_key, value) in enumerate(zip(keys, values)):
                 if value is not None:
                     try:
-                        result[original_key] = json.loads(value)
+                        result[original_key] = fast_json_loads(value)
                     except json.JSONDecodeError:
                         result[original_key] = value
                 else:
@@ -191,7 +204,7 @@ class CacheManager:
             pipe = self.redis.pipeline()
             
             for key, value in mapping.items():
-                serialized_value = json.dumps(value, default=str)
+                serialized_value = fast_json_dumps(value)
                 cache_key = self._make_key(key)
                 
                 if ttl_seconds:
@@ -205,17 +218,39 @@ class CacheManager:
             logger.error(f"Cache set_many error: {str(e)}")
             return False
     
+    async def clear_tag(self, tag: str) -> int:
+        """Clear all keys registered under a tag, a chunk at a time."""
+        deleted = 0
+        try:
+            async for keys in iter_tag_members(self.redis, self._make_tag_key(tag)):
+                deleted += await self.redis.delete(*keys)
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache clear_tag error for tag {tag}: {str(e)}")
+            return deleted
+    
     async def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching pattern."""
+        """
+        Clear all keys matching pattern.
+        
+        This walks the whole keyspace with SCAN. Tag entries when they are
+        written and use clear_tag instead wherever possible.
+        """
+        deleted = 0
         try:
             pattern_key = self._make_key(pattern)
-            keys = await self.redis.keys(pattern_key)
-            if keys:
-                return await self.redis.delete(*keys)
-            return 0
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern_key, count=TAG_CHUNK_SIZE):
+                batch.append(key)
+                if len(batch) >= TAG_CHUNK_SIZE:
+                    deleted += await self.redis.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis.delete(*batch)
+            return deleted
         except Exception as e:
             logger.error(f"Cache clear_pattern error for pattern {pattern}: {str(e)}")
-            return 0
+            return deleted
 
 
 class EnrichmentCache:
@@ -288,11 +323,120 @@ class SessionCache:
         return await self.cache.delete(f"refresh_token:{user_id}")
 
 
+# Sliding window counters: each window keeps the request count of its current
+# and previous fixed interval in a hash, and usage is the current count plus
+# the previous one weighted by how much of it still overlaps the window. That
+# is constant memory per identifier and O(1) per check. All windows are checked
+# before any is charged, so a request denied by one window consumes nothing.
+# Time comes from the Redis server, so API replicas never disagree on it (this
+# needs Redis 5+, which replicates script effects rather than the script).
+# Counters left as JSON lists by the previous implementation are replaced.
+# KEYS: one counter per window. ARGV: cost, then limit and window seconds per key.
+# Returns: allowed (1/0), then usage before this request and retry-after in
+# milliseconds per key.
+RATE_LIMIT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local state = {}
+
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    local index = math.floor(now / window)
+    
+    if redis.call('TYPE', key)['ok'] == 'string' then
+        redis.call('DEL', key)
+    end
+    
+    local data = redis.call('HMGET', key, 'w', 'c', 'p')
+    local stored = tonumber(data[1])
+    local current = tonumber(data[2]) or 0
+    local previous = tonumber(data[3]) or 0
+    if stored == index - 1 then
+        previous, current = current, 0
+    elseif stored ~= index then
+        previous, current = 0, 0
+    end
+    
+    local overlap = 1 - (now - index * window) / window
+    local usage = previous * overlap + current
+    local retry = 0
+    if usage + cost > limit then
+        allowed = 0
+        if current + cost > limit or previous == 0 then
+            -- Wait for the next interval, until enough of this one has slid out
+            local next_start = (index + 1) * window
+            local needed = current > 0 and math.max(0, 1 - (limit - cost) / current) or 0
+            retry = next_start + window * needed - now
+        else
+            retry = index * window + window * (1 - (limit - cost - current) / previous) - now
+        end
+    end
+    
+    state[i] = {index, current, previous, usage, retry, window}
+end
+
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+    local s = state[i]
+    if allowed == 1 and cost > 0 then
+        redis.call('HSET', key, 'w', s[1], 'c', s[2] + cost, 'p', s[3])
+        redis.call('EXPIRE', key, s[6] * 2)
+    end
+    table.insert(result, math.floor(s[4]))
+    table.insert(result, math.ceil(s[5] * 1000))
+end
+return result
+"""
+
+
 class RateLimitCache:
-    """Rate limiting cache with sliding window."""
+    """Rate limiting cache with sliding window counters, see RATE_LIMIT_SCRIPT."""
     
     def __init__(self, cache_manager: CacheManager):
         self.cache = cache_manager
+        self._script = cache_manager.redis.register_script(RATE_LIMIT_SCRIPT)
+    
+    async def check_rate_limits(
+        self,
+        windows: List[Tuple[str, int, int]],
+        cost: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Check several windows in one atomic round trip.
+        
+        Args:
+            windows: (identifier, limit, window_seconds) per window
+            cost: Quota consumed, only if every window allows it
+        
+        Returns:
+            One result per window, in order. A window's "allowed" is False
+            when any window denied the request.
+        """
+        keys = [self.cache._make_key(f"rate_limit:{identifier}") for identifier, _, _ in windows]
+        args = [cost]
+        for _, limit, window_seconds in windows:
+            args.extend((limit, window_seconds))
+        
+        result = await self._script(keys=keys, args=args)
+        allowed = bool(result[0])
+        now = datetime.utcnow()
+        
+        checks = []
+        for position, (_, limit, window_seconds) in enumerate(windows):
+            current_usage = result[1 + 2 * position]
+            retry_after = math.ceil(result[2 + 2 * position] / 1000)
+            checks.append({
+                "allowed": allowed,
+                "current_usage": current_usage,
+                "limit": limit,
+                "reset_time": (now + timedelta(seconds=retry_after or window_seconds)).isoformat(),
+                "retry_after": retry_after
+            })
+        
+        return checks
     
     async def check_rate_limit(
         self, 
@@ -302,43 +446,8 @@ class RateLimitCache:
         cost: int = 1
     ) -> Dict[str, Any]:
         """Check rate limit with sliding window algorithm."""
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=window_seconds)
-        
-        key = f"rate_limit:{identifier}"
-        
-        # Get current requests
-        current_requests = await self.cache.get(key, [])
-        
-        # Filter requests within window
-        valid_requests = [
-            req for req in current_requests 
-            if datetime.fromisoformat(req["timestamp"]) > window_start
-        ]
-        
-        # Calculate current usage
-        current_usage = sum(req["cost"] for req in valid_requests)
-        
-        # Check if request can be allowed
-        allowed = (current_usage + cost) <= limit
-        
-        if allowed:
-            # Add new request
-            valid_requests.append({
-                "timestamp": now.isoformat(),
-                "cost": cost
-            })
-            
-            # Store updated requests
-            await self.cache.set(key, valid_requests, window_seconds)
-        
-        return {
-            "allowed": allowed,
-            "current_usage": current_usage,
-            "limit": limit,
-            "reset_time": (now + timedelta(seconds=window_seconds)).isoformat(),
-            "retry_after": window_seconds if not allowed else 0
-        }
+        checks = await self.check_rate_limits([(identifier, limit, window_seconds)], cost)
+        return checks[0]
     
     async def get_rate_limit_status(
         self, 
@@ -347,24 +456,14 @@ class RateLimitCache:
         window_seconds: int
     ) -> Dict[str, Any]:
         """Get current rate limit status without consuming quota."""
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=window_seconds)
-        
-        key = f"rate_limit:{identifier}"
-        current_requests = await self.cache.get(key, [])
-        
-        valid_requests = [
-            req for req in current_requests 
-            if datetime.fromisoformat(req["timestamp"]) > window_start
-        ]
-        
-        current_usage = sum(req["cost"] for req in valid_requests)
+        check = await self.check_rate_limit(identifier, limit, window_seconds, cost=0)
+        current_usage = check["current_usage"]
         
         return {
             "current_usage": current_usage,
             "limit": limit,
             "remaining": max(0, limit - current_usage),
-            "reset_time": (now + timedelta(seconds=window_seconds)).isoformat()
+            "reset_time": check["reset_time"]
         }
 
 
@@ -386,7 +485,7 @@ class AnalyticsCache:
         """Cache a metric value."""
         key = f"metrics:{workspace_id}:{metric_name}"
         ttl = ttl_override or self.metrics_ttl
-        return await self.cache.set(key, value, ttl)
+        return await self.cache.set(key, value, ttl, tags=[f"workspace:{workspace_id}"])
     
     async def get_metric(self, workspace_id: str, metric_name: str) -> Any:
         """Get cached metric value."""
@@ -403,7 +502,7 @@ class AnalyticsCache:
         """Cache report data."""
         key = f"reports:{workspace_id}:{report_type}"
         ttl = ttl_override or self.reports_ttl
-        return await self.cache.set(key, report_data, ttl)
+        return await self.cache.set(key, report_data, ttl, tags=[f"workspace:{workspace_id}"])
     
     async def get_report(self, workspace_id: str, report_type: str) -> Optional[Dict[str, Any]]:
         """Get cached report data."""
@@ -412,8 +511,7 @@ class AnalyticsCache:
     
     async def invalidate_workspace_cache(self, workspace_id: str) -> int:
         """Invalidate all cache for a workspace."""
-        pattern = f"*:{workspace_id}:*"
-        return await self.cache.clear_pattern(pattern)
+        return await self.cache.clear_tag(f"workspace:{workspace_id}")
 
 
 class EmailDeliverabilityCache:
@@ -464,10 +562,18 @@ async def get_session_cache() -> SessionCache:
     return SessionCache(cache_manager)
 
 
+_rate_limit_cache: Optional[RateLimitCache] = None
+
+
 async def get_rate_limit_cache() -> RateLimitCache:
-    """Get rate limit cache instance."""
-    cache_manager = await get_cache_manager()
-    return RateLimitCache(cache_manager)
+    """Get rate limit cache instance on its own pool, so it never waits behind caching."""
+    global _rate_limit_cache
+    
+    redis = await get_redis_pool("rate_limit")
+    # Built once per client, so the limiter script is not re-registered per request
+    if _rate_limit_cache is None or _rate_limit_cache.cache.redis is not redis:
+        _rate_limit_cache = RateLimitCache(CacheManager(redis))
+    return _rate_limit_cache
 
 
 async def get_analytics_cache() -> AnalyticsCache:
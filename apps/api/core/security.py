@@ -1,7 +1,10 @@
 """
 Security utilities and authentication.
 """
+import hashlib
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Set
 from uuid import UUID
@@ -13,9 +16,10 @@ from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import get_settings
-from core.database import get_db
+from core.database import get_async_session, get_db
 from models.user import User
 from services.user_service import UserService
+from utils.cache_manager import CacheNamespace, get_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,10 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT token scheme
 security = HTTPBearer()
 
+# Verified principals are cached by token hash for at most this long, and
+# never past the token's own expiry
+PRINCIPAL_CACHE_TTL = 300
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -70,12 +78,72 @@ def verify_token(token: str) -> Dict[str, Any]:
         )
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
-    token = credentials.credentials
+@dataclass(frozen=True)
+class Principal:
+    """
+    The verified identity behind a bearer token.
+    
+    Enough to rate limit and authorize a request, but not a User row. Code
+    that needs the user's other columns or relationships depends on
+    get_current_user, which loads the row, the rest on get_current_principal.
+    """
+    id: UUID
+    email: str
+    role: str
+    is_active: bool
+    workspace_id: UUID
+
+
+def _token_hash(token: str) -> str:
+    """Cache key for a token, so tokens themselves never reach Redis."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _principal_tag(user_id: Any) -> str:
+    """Cache tag of every principal cached for a user."""
+    return f"auth_user:{user_id}"
+
+
+def _principal_from_user(user: User) -> Dict[str, Any]:
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "role": user.role,
+        "is_active": user.is_active,
+        "workspace_id": str(user.workspace_id)
+    }
+
+
+def _load_principal(principal: Dict[str, Any]) -> Principal:
+    """Rebuild a Principal from its cached form."""
+    return Principal(
+        id=UUID(principal["id"]),
+        email=principal["email"],
+        role=principal["role"],
+        is_active=principal["is_active"],
+        workspace_id=UUID(principal["workspace_id"])
+    )
+
+
+async def _get_principal_cache():
+    """The shared cache, or None to authenticate uncached when Redis is down."""
+    try:
+        return await get_cache()
+    except Exception as e:
+        logger.error(f"Principal cache unavailable: {e}")
+        return None
+
+
+async def invalidate_user_principals(user_id: Any) -> int:
+    """Drop cached principals of a user, in every process, after it changes."""
+    cache = await _get_principal_cache()
+    if cache is None:
+        return 0
+    return await cache.delete_by_tag(_principal_tag(user_id))
+
+
+async def _verify_and_load_user(token: str, db: Optional[AsyncSession]) -> tuple[User, float]:
+    """Verify a token and load its user, with the token's expiry."""
     payload = verify_token(token)
     
     user_id: str = payload.get("sub")
@@ -93,8 +161,112 @@ async def get_current_user(
             detail="Invalid user ID format"
         )
     
-    user_service = UserService(db)
-    user = await user_service.get_user_by_id(user_uuid)
+    if db is None:
+        async with get_async_session() as session:
+            user = await UserService(session).get_user_by_id(user_uuid)
+    else:
+        user = await UserService(db).get_user_by_id(user_uuid)
+    
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    return user, payload.get("exp", time.time() + PRINCIPAL_CACHE_TTL)
+
+
+async def _resolve_principal(
+    token: str,
+    request: Optional[Request],
+    db: Optional[AsyncSession]
+) -> tuple[Principal, Optional[User]]:
+    """
+    Resolve the principal of a token, with the user if it had to be loaded.
+    
+    The principal is resolved once per request and kept on request.state.
+    Across requests it is cached by token hash, in process memory and Redis,
+    so steady-state requests skip JWT decoding.
+    """
+    token_hash = _token_hash(token)
+    if request is not None and getattr(request.state, "auth_token_hash", None) == token_hash:
+        return request.state.principal, None
+    
+    cache = await _get_principal_cache()
+    cached = None
+    if cache is not None:
+        cached = await cache.get(token_hash, namespace=CacheNamespace.AUTH_PRINCIPALS)
+    
+    user = None
+    if cached is None:
+        user, expires_at = await _verify_and_load_user(token, db)
+        cached = _principal_from_user(user)
+        ttl = min(PRINCIPAL_CACHE_TTL, int(expires_at - time.time()))
+        if cache is not None and ttl > 0:
+            await cache.set(
+                token_hash,
+                cached,
+                ttl=ttl,
+                namespace=CacheNamespace.AUTH_PRINCIPALS,
+                tags=[_principal_tag(user.id)]
+            )
+    
+    principal = _load_principal(cached)
+    if request is not None:
+        request.state.principal = principal
+        request.state.auth_token_hash = token_hash
+    
+    return principal, user
+
+
+async def get_current_user_from_token(
+    token: str,
+    request: Optional[Request] = None,
+    db: Optional[AsyncSession] = None
+) -> Principal:
+    """Get the principal of a bearer token, for rate limiting before the endpoint runs."""
+    principal, _ = await _resolve_principal(token, request, db)
+    return principal
+
+
+async def get_current_user_from_request(request: Request) -> Optional[Principal]:
+    """Get the principal of a request's bearer token, None without one."""
+    auth_header = request.headers.get("authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    return await get_current_user_from_token(auth_header.split(" ", 1)[1], request)
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+    request: Request = None
+) -> Principal:
+    """
+    Get the current authenticated principal.
+    
+    Served from request.state or the principal cache, so steady-state
+    requests reach neither the token verification nor the database. Use
+    get_current_user instead when the endpoint needs the User row.
+    """
+    principal, _ = await _resolve_principal(credentials.credentials, request, db)
+    return principal
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+    request: Request = None
+) -> User:
+    """
+    Get the current authenticated user.
+    
+    A cached principal saves verifying the token, the user row is still
+    loaded in the request's session.
+    """
+    principal, user = await _resolve_principal(credentials.credentials, request, db)
+    if user is None:
+        user = await UserService(db).get_user_by_id(principal.id)
     
     if user is None:
         raise HTTPException(
@@ -106,9 +278,21 @@ async def get_current_user(
 
 
 async def get_current_active_user(
+    current_user: Principal = Depends(get_current_principal)
+) -> Principal:
+    """Get the current active principal."""
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return current_user
+
+
+async def get_current_active_user_row(
     current_user: User = Depends(get_current_user)
 ) -> User:
-    """Get the current active user."""
+    """Get the current active user's row, for endpoints that need more than the principal."""
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,8 +304,8 @@ async def get_current_active_user(
 def require_workspace_access(workspace_id: UUID):
     """Dependency to check workspace access."""
     async def _check_workspace_access(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_active_user)
+    ) -> Principal:
         if current_user.workspace_id != workspace_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -135,8 +319,8 @@ def require_workspace_access(workspace_id: UUID):
 def require_role(required_role: str):
     """Dependency to check user role."""
     async def _check_role(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_active_user)
+    ) -> Principal:
         if current_user.role != required_role and current_user.role != "admin":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -150,8 +334,8 @@ def require_role(required_role: str):
 def require_permissions(required_permissions: Set[str]):
     """Dependency to check user permissions."""
     async def _check_permissions(
-        current_user: User = Depends(get_current_active_user)
-    ) -> User:
+        current_user: Principal = Depends(get_current_active_user)
+    ) -> Principal:
         user_permissions = get_role_permissions(current_user.role)
         
         if not required_permissions.issubset(user_permissions):
@@ -202,10 +386,11 @@ def get_role_permissions(role: str) -> Set[str]:
 
 async def get_current_user_with_workspace(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    request: Request = None
 ) -> Dict[str, Any]:
     """Get current user with workspace information."""
-    user = await get_current_user(credentials, db)
+    user = await get_current_user(credentials, db, request)
     user_service = UserService(db)
     workspace = await user_service.get_workspace_by_id(user.workspace_id)
     
@@ -231,14 +416,15 @@ optional_security = OptionalBearer()
 
 async def get_optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    request: Request = None
 ) -> Optional[User]:
     """Get current user if authenticated, otherwise None."""
     if not credentials:
         return None
     
     try:
-        return await get_current_user(credentials, db)
+        return await get_current_user(credentials, db, request)
     except HTTPException:
         return None
 
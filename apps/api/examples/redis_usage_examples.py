@@ -396,7 +396,7 @@ async def pipeline_example():
     """Example of using Redis pipeline for bulk operations."""
     print("\n=== Pipeline Example ===")
     
-    redis = await get_redis_pool("cache")
+    redis = await get_redis_pool("default")
     
     # Prepare data for bulk insert
     user_sessions = {}
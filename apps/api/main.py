@@ -71,15 +71,8 @@ def create_app() -> FastAPI:
         strict_mode=settings.ENVIRONMENT == "production"
     )
     
-    # Rate limiting middleware
-    app.add_middleware(
-        RateLimitMiddleware,
-        default_requests_per_minute=60,
-        default_requests_per_hour=1000,
-        burst_requests_per_minute=100
-    )
-    
-    # Cache middleware
+    # Cache middleware, added before rate limiting so it runs inside it and
+    # reuses the principal the rate limiter resolves
     app.add_middleware(
         CacheMiddleware,
         default_ttl=300,  # 5 minutes default
@@ -97,6 +90,17 @@ def create_app() -> FastAPI:
             "/health"
         ]
     )
+    
+    # Rate limiting middleware
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_requests_per_minute=60,
+        default_requests_per_hour=1000,
+        burst_requests_per_minute=100,
+        approximate=settings.RATE_LIMIT_APPROXIMATE,
+        max_error=settings.RATE_LIMIT_MAX_ERROR,
+        lease_seconds=settings.RATE_LIMIT_LEASE_SECONDS
+    )
 
     # Include routers
     app.include_router(health.router, prefix="/health", tags=["health"])
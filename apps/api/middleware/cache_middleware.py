@@ -1,43 +1,102 @@
 """
 Cache middleware for FastAPI to automatically cache API responses.
 """
+import functools
 import hashlib
 import json
-from typing import Optional, Callable, List
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.datastructures import Headers
+import struct
+from typing import Optional, Callable, List, Tuple
+from fastapi import HTTPException, Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from utils.cache_manager import CacheManager, CacheNamespace, get_cache
+from core.security import Principal, get_current_user_from_request
+from utils.cache_manager import CacheManager, CacheNamespace, get_cache, workspace_tag
 import logging
 
 logger = logging.getLogger(__name__)
 
+# A cached response is stored as raw bytes: the status code and the length of
+# the header block, the header list as JSON, then the body exactly as the
+# endpoint sent it. Hits are replayed without decoding the body. The entity tag
+# is also kept under its own small key so conditional requests are answered
+# without reading the body.
+ENTRY_HEADER = struct.Struct(">HI")
+ETAG_SUFFIX = ":etag"
 
-class CacheMiddleware(BaseHTTPMiddleware):
+
+def cache_tags(workspace_id: str, path: str) -> List[str]:
+    """
+    Tags a cached API response is indexed under.
+    
+    The workspace and every prefix of the path under /api, e.g.
+    "workspace:1", "workspace:1:campaigns" and "workspace:1:campaigns:42",
+    so an item and its sub-resources can be invalidated together.
+    """
+    segments = [segment for segment in path.split("/") if segment]
+    if segments and segments[0] == "api":
+        segments = segments[1:]
+    
+    tags = [workspace_tag(workspace_id)]
+    for depth in range(1, len(segments) + 1):
+        tags.append(":".join([tags[0]] + segments[:depth]))
+    
+    return tags
+
+
+def _find_request(args: tuple, kwargs: dict) -> Optional[Request]:
+    """The Request an endpoint was called with, if it takes one."""
+    for arg in args:
+        if isinstance(arg, Request):
+            return arg
+    return kwargs.get("request")
+
+
+def _endpoint_workspace_id(request: Optional[Request], kwargs: dict) -> Optional[str]:
+    """The workspace of the request's principal, else the endpoint's workspace_id argument."""
+    if request is not None:
+        principal = getattr(request.state, "principal", None)
+        if isinstance(principal, Principal):
+            return str(principal.workspace_id)
+        workspace_id = getattr(request.state, "workspace_id", None)
+        if workspace_id:
+            return workspace_id
+    return kwargs.get("workspace_id")
+
+
+# Headers that describe a single transfer rather than the response content
+UNCACHED_HEADERS = {"content-length", "transfer-encoding", "connection", "date", "x-cache", "x-cache-key"}
+
+
+class CacheMiddleware:
     """
     Middleware to automatically cache GET API responses.
     
     Features:
     - Automatic caching of successful GET responses
     - Cache key generation from URL and query params
-    - Workspace-aware caching
+    - Workspace-aware caching, only for authenticated requests
     - Cache control headers support
     - Conditional caching based on paths
+    - ETag and If-None-Match support
+    
+    Implemented as plain ASGI so response bodies are copied to the cache as
+    they stream out and hits are served from the stored bytes.
     """
     
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         cache_manager: Optional[CacheManager] = None,
         default_ttl: int = 300,
         cacheable_paths: Optional[List[str]] = None,
-        excluded_paths: Optional[List[str]] = None
+        excluded_paths: Optional[List[str]] = None,
+        max_body_size: int = 5 * 1024 * 1024
     ):
-        super().__init__(app)
+        self.app = app
         self.cache_manager = cache_manager
         self.default_ttl = default_ttl
+        self.max_body_size = max_body_size
         self.cacheable_paths = cacheable_paths or [
             "/api/campaigns",
             "/api/leads",
@@ -51,15 +110,24 @@ class CacheMiddleware(BaseHTTPMiddleware):
             "/api/system"
         ]
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         # Only cache GET requests
-        if request.method != "GET":
-            return await call_next(request)
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
         
         # Check if path should be cached
-        path = request.url.path
-        if not self._should_cache_path(path):
-            return await call_next(request)
+        if not self._should_cache_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        
+        # Only authenticated requests are cached, per workspace of the principal
+        request = Request(scope)
+        principal = await self._get_principal(request)
+        if principal is None:
+            await self.app(scope, receive, send)
+            return
+        workspace_id = str(principal.workspace_id)
         
         # Initialize cache if needed
         if not self.cache_manager:
@@ -67,41 +135,36 @@ class CacheMiddleware(BaseHTTPMiddleware):
                 self.cache_manager = await get_cache()
             except Exception as e:
                 logger.error(f"Failed to initialize cache: {e}")
-                return await call_next(request)
+                await self.app(scope, receive, send)
+                return
         
         # Generate cache key
-        cache_key = await self._generate_cache_key(request)
+        cache_key = await self._generate_cache_key(request, workspace_id)
+        tags = cache_tags(workspace_id, scope["path"])
+        
+        # Answer conditional requests from the entity tag alone
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            etag = await self.cache_manager.get(
+                f"{cache_key}{ETAG_SUFFIX}",
+                namespace=CacheNamespace.API_RESPONSES
+            )
+            if etag and self._etag_matches(if_none_match, etag):
+                await self._send_not_modified(etag, cache_key, send)
+                return
         
         # Check cache
-        cached_response = await self.cache_manager.get(
+        entry = await self.cache_manager.get(
             cache_key,
             namespace=CacheNamespace.API_RESPONSES
         )
         
-        if cached_response:
-            # Return cached response
-            return JSONResponse(
-                content=cached_response["content"],
-                status_code=cached_response["status_code"],
-                headers={
-                    **cached_response.get("headers", {}),
-                    "X-Cache": "HIT",
-                    "X-Cache-Key": cache_key
-                }
-            )
-        
-        # Call the actual endpoint
-        response = await call_next(request)
-        
-        # Cache successful responses
-        if response.status_code == 200:
-            await self._cache_response(cache_key, response, request)
-        
-        # Add cache headers
-        response.headers["X-Cache"] = "MISS"
-        response.headers["X-Cache-Key"] = cache_key
+        if isinstance(entry, bytes):
+            await self._send_cached(entry, cache_key, send)
+            return
         
-        return response
+        # Call the actual endpoint, copying the body to the cache on the way out
+        await self.app(scope, receive, self._caching_send(cache_key, tags, if_none_match, send))
     
     def _should_cache_path(self, path: str) -> bool:
         """Check if path should be cached."""
@@ -117,21 +180,26 @@ class CacheMiddleware(BaseHTTPMiddleware):
         
         return False
     
-    async def _generate_cache_key(self, request: Request) -> str:
-        """Generate cache key from request."""
-        # Get workspace ID from request state or headers
-        workspace_id = getattr(request.state, "workspace_id", None)
-        if not workspace_id:
-            # Try to get from auth token
-            user = getattr(request.state, "user", None)
-            if user:
-                workspace_id = getattr(user, "workspace_id", "unknown")
-            else:
-                workspace_id = "unknown"
+    async def _get_principal(self, request: Request) -> Optional[Principal]:
+        """
+        Principal of the request's bearer token, None if it has no valid one.
         
+        Resolved the same way endpoints authenticate and kept on request.state,
+        so the endpoint's own auth reuses it.
+        """
+        try:
+            principal = await get_current_user_from_request(request)
+        except HTTPException:
+            return None
+        if principal is None or not principal.is_active:
+            return None
+        return principal
+    
+    async def _generate_cache_key(self, request: Request, workspace_id: str) -> str:
+        """Generate cache key from request."""
         # Build key components
         components = [
-            str(workspace_id),
+            workspace_id,
             request.url.path,
             str(sorted(request.query_params.items()))
         ]
@@ -144,62 +212,192 @@ class CacheMiddleware(BaseHTTPMiddleware):
         key_string = ":".join(components)
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    async def _cache_response(
+    def _caching_send(
         self,
         cache_key: str,
-        response: Response,
-        request: Request
-    ):
-        """Cache the response."""
-        try:
-            # Read response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
+        tags: List[str],
+        if_none_match: Optional[str],
+        send: Send
+    ) -> Send:
+        """Wrap send to tee a cacheable response body into the cache."""
+        status = 200
+        headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+        size = 0
+        ttl = 0
+        etag: Optional[str] = None
+        held_start: Optional[Message] = None
+        
+        async def send_wrapper(message: Message):
+            nonlocal status, headers, size, ttl, etag, held_start
             
-            # Parse response
-            try:
-                content = json.loads(body.decode())
-            except:
-                # Don't cache non-JSON responses
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = MutableHeaders(scope=message)
+                
+                if status == 200 and self._is_cacheable(response_headers):
+                    ttl = self._get_ttl_from_headers(response_headers)
+                    if ttl is None:
+                        ttl = self.default_ttl
+                    etag = response_headers.get("etag")
+                
+                # Add cache headers
+                response_headers["X-Cache"] = "MISS"
+                response_headers["X-Cache-Key"] = cache_key
+                
+                if ttl > 0:
+                    # Hold the start until the body shows whether an ETag can be sent
+                    held_start = message
+                    return
+                
+            elif message["type"] == "http.response.body" and ttl > 0:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                
+                if held_start is not None:
+                    start, held_start = held_start, None
+                    
+                    # A body sent in one message can be tagged on this response
+                    if not more_body:
+                        if etag is None:
+                            etag = self._compute_etag(body)
+                            MutableHeaders(scope=start)["ETag"] = etag
+                        if if_none_match and self._etag_matches(if_none_match, etag):
+                            await self._send_not_modified(etag, cache_key, send, miss=True)
+                            await self._cache_response(cache_key, tags, status, start["headers"], body, etag, ttl)
+                            return
+                    
+                    headers = start["headers"]
+                    await send(start)
+                
+                size += len(body)
+                if size > self.max_body_size:
+                    # Too large to be worth caching, stop collecting
+                    ttl = 0
+                    chunks.clear()
+                elif body:
+                    chunks.append(body)
+                
+                await send(message)
+                
+                if ttl > 0 and not more_body:
+                    body = b"".join(chunks)
+                    await self._cache_response(
+                        cache_key,
+                        tags,
+                        status,
+                        headers,
+                        body,
+                        etag or self._compute_etag(body),
+                        ttl
+                    )
                 return
             
-            # Determine TTL from cache-control header or use default
-            ttl = self._get_ttl_from_headers(response.headers) or self.default_ttl
+            await send(message)
+        
+        return send_wrapper
+    
+    def _is_cacheable(self, headers: Headers) -> bool:
+        """Only cache complete JSON responses that are not user cookies."""
+        content_type = headers.get("content-type", "")
+        return content_type.startswith("application/json") and "set-cookie" not in headers
+    
+    @staticmethod
+    def _compute_etag(body: bytes) -> str:
+        """Strong entity tag from a hash of the response body."""
+        return f'"{hashlib.md5(body).hexdigest()}"'
+    
+    @staticmethod
+    def _etag_matches(if_none_match: str, etag: str) -> bool:
+        """Weak comparison of an If-None-Match header against an entity tag."""
+        if if_none_match.strip() == "*":
+            return True
+        
+        def opaque(tag: str) -> str:
+            tag = tag.strip()
+            return tag[2:] if tag.startswith("W/") else tag
+        
+        return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
+    
+    async def _cache_response(
+        self,
+        cache_key: str,
+        tags: List[str],
+        status: int,
+        raw_headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        etag: str,
+        ttl: int
+    ):
+        """Cache the response and its entity tag."""
+        try:
+            headers = [
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, value in raw_headers
+                if name.decode("latin-1").lower() not in UNCACHED_HEADERS
+            ]
+            if not any(name.lower() == "etag" for name, _ in headers):
+                headers.append(("etag", etag))
             
-            # Prepare cache data
-            cache_data = {
-                "content": content,
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "cached_at": datetime.utcnow().isoformat()
-            }
+            header_block = json.dumps(headers).encode("utf-8")
+            entry = ENTRY_HEADER.pack(status, len(header_block)) + header_block + body
             
-            # Cache it
+            # Cache it, the entry first so a stored tag always has a body behind it
             await self.cache_manager.set(
                 cache_key,
-                cache_data,
+                entry,
                 ttl=ttl,
                 namespace=CacheNamespace.API_RESPONSES,
-                compress=len(body) > 1024  # Compress if > 1KB
+                compress=len(body) > 1024,  # Compress if > 1KB
+                tags=tags
             )
-            
-            # Reset response body
-            response = Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
+            await self.cache_manager.set(
+                f"{cache_key}{ETAG_SUFFIX}",
+                etag,
+                ttl=ttl,
+                namespace=CacheNamespace.API_RESPONSES,
+                tags=tags
             )
             
         except Exception as e:
             logger.error(f"Failed to cache response: {e}")
     
+    async def _send_cached(self, entry: bytes, cache_key: str, send: Send):
+        """Replay a cached response from its stored bytes."""
+        status, header_size = ENTRY_HEADER.unpack_from(entry)
+        offset = ENTRY_HEADER.size + header_size
+        headers = json.loads(entry[ENTRY_HEADER.size:offset])
+        body = entry[offset:]
+        
+        raw_headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        ]
+        raw_headers += [
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"x-cache", b"HIT"),
+            (b"x-cache-key", cache_key.encode("latin-1")),
+        ]
+        
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+    
+    async def _send_not_modified(self, etag: str, cache_key: str, send: Send, miss: bool = False):
+        """Send a bodiless 304 for a client that already has this entity."""
+        raw_headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"x-cache", b"MISS" if miss else b"HIT"),
+            (b"x-cache-key", cache_key.encode("latin-1")),
+        ]
+        
+        await send({"type": "http.response.start", "status": 304, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": b""})
+    
     def _get_ttl_from_headers(self, headers: Headers) -> Optional[int]:
         """Extract TTL from cache-control headers."""
         cache_control = headers.get("cache-control", "")
         
-        if "no-cache" in cache_control or "no-store" in cache_control:
+        if "no-cache" in cache_control or "no-store" in cache_control or "private" in cache_control:
             return 0
         
         # Look for max-age
@@ -236,15 +434,10 @@ def cache_endpoint(
             return {"data": "value"}
     """
     def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Get request from kwargs or args
-            request = None
-            for arg in args:
-                if isinstance(arg, Request):
-                    request = arg
-                    break
-            if not request:
-                request = kwargs.get("request")
+            request = _find_request(args, kwargs)
             
             if not request:
                 # No request object, just call the function
@@ -259,7 +452,7 @@ def cache_endpoint(
                 cache_key = key_func(request, *args, **kwargs)
             else:
                 # Default key generation
-                workspace_id = getattr(request.state, "workspace_id", "unknown")
+                workspace_id = _endpoint_workspace_id(request, kwargs) or "unknown"
                 path = request.url.path
                 params = str(sorted(request.query_params.items()))
                 cache_key = f"{workspace_id}:{path}:{params}"
@@ -271,28 +464,26 @@ def cache_endpoint(
                 # Cache not available, proceed without caching
                 return await func(*args, **kwargs)
             
-            # Try to get from cache
-            cached = await cache.get(cache_key, namespace=namespace)
-            if cached is not None:
-                # Add cache headers if response object
-                if hasattr(cached, "headers"):
-                    cached.headers["X-Cache"] = "HIT"
-                return cached
+            # Get from cache, concurrent misses share one call of the endpoint
+            computed = False
             
-            # Call the function
-            result = await func(*args, **kwargs)
+            async def compute():
+                nonlocal computed
+                computed = True
+                return await func(*args, **kwargs)
             
-            # Cache the result
-            await cache.set(
+            workspace_id = _endpoint_workspace_id(request, kwargs) or "unknown"
+            result = await cache.get_or_compute(
                 cache_key,
-                result,
+                compute,
                 ttl=ttl,
-                namespace=namespace
+                namespace=namespace,
+                tags=cache_tags(workspace_id, request.url.path)
             )
             
             # Add cache headers if response object
             if hasattr(result, "headers"):
-                result.headers["X-Cache"] = "MISS"
+                result.headers["X-Cache"] = "MISS" if computed else "HIT"
             
             return result
         
@@ -302,19 +493,25 @@ def cache_endpoint(
 
 def invalidate_cache(
     pattern: str = "*",
-    namespace: CacheNamespace = CacheNamespace.API_RESPONSES
+    namespace: CacheNamespace = CacheNamespace.API_RESPONSES,
+    tags: Optional[List[str]] = None
 ):
     """
     Decorator to invalidate cache after endpoint execution.
     
+    Tags (see cache_tags) only touch the affected entries and are preferred
+    over patterns. Both may use {workspace_id} and the endpoint's keyword
+    arguments as placeholders.
+    
     Example:
         @app.post("/api/campaigns")
-        @invalidate_cache(pattern="campaigns:*")
+        @invalidate_cache(tags=["workspace:{workspace_id}:campaigns"])
         async def create_campaign():
             # This will invalidate all campaign caches after execution
             return {"id": "123"}
     """
     def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Execute the function first
             result = await func(*args, **kwargs)
@@ -323,21 +520,23 @@ def invalidate_cache(
             try:
                 cache = await get_cache()
                 
-                # Get workspace_id if available
-                workspace_id = None
-                for arg in args:
-                    if isinstance(arg, Request):
-                        workspace_id = getattr(arg.state, "workspace_id", None)
-                        break
+                # Get workspace_id if available, as cache_endpoint does
+                workspace_id = _endpoint_workspace_id(_find_request(args, kwargs), kwargs)
                 
-                # Build pattern with workspace
-                if workspace_id and "{workspace_id}" in pattern:
-                    final_pattern = pattern.format(workspace_id=workspace_id)
-                else:
-                    final_pattern = pattern
+                # Fill placeholders with workspace and endpoint arguments
+                values = dict(kwargs)
+                if workspace_id:
+                    values["workspace_id"] = workspace_id
                 
-                deleted = await cache.delete_pattern(final_pattern, namespace)
-                logger.info(f"Invalidated {deleted} cache entries matching {final_pattern}")
+                if tags:
+                    deleted = 0
+                    for tag in tags:
+                        deleted += await cache.delete_by_tag(tag.format_map(values))
+                    logger.info(f"Invalidated {deleted} cache entries tagged {tags}")
+                else:
+                    final_pattern = pattern.format_map(values) if "{" in pattern else pattern
+                    deleted = await cache.delete_pattern(final_pattern, namespace)
+                    logger.info(f"Invalidated {deleted} cache entries matching {final_pattern}")
                 
             except Exception as e:
                 logger.error(f"Failed to invalidate cache: {e}")
@@ -346,7 +545,3 @@ def invalidate_cache(
         
         return wrapper
     return decorator
-
-
-# Import datetime at the top
-from datetime import datetime
\ No newline at end of file
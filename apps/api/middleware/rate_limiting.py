@@ -11,6 +11,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from core.redis import get_rate_limit_cache
 from core.security import get_current_user_from_token
+from utils.rate_limit_leases import LeasedRateLimiter
+from utils.route_patterns import RouteTrie
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +28,25 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         default_requests_per_minute: int = 60,
         default_requests_per_hour: int = 1000,
         burst_requests_per_minute: int = 100,
+        approximate: bool = False,
+        max_error: float = 0.05,
+        lease_seconds: float = 1.0,
     ):
         super().__init__(app)
         self.default_rpm = default_requests_per_minute
         self.default_rph = default_requests_per_hour
         self.burst_rpm = burst_requests_per_minute
         
+        # Approximate mode admits most requests from quota leased in chunks,
+        # see utils.rate_limit_leases
+        self.leased_limiter: Optional[LeasedRateLimiter] = None
+        if approximate:
+            self.leased_limiter = LeasedRateLimiter(
+                get_rate_limit_cache,
+                max_error=max_error,
+                lease_seconds=lease_seconds
+            )
+        
         # Rate limit configurations for different endpoints and user types
         self.rate_limits = {
             # API endpoints with specific limits
@@ -85,6 +100,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 "description": "IP-based limit"
             }
         }
+        
+        # Endpoint rules compiled once, so parameterized paths match too
+        self.endpoint_rules = RouteTrie.from_rules(self.rate_limits)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with rate limiting."""
@@ -94,26 +112,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
         
         try:
-            # Get rate limit cache
-            rate_cache = await get_rate_limit_cache()
-            
             # Determine identifier and limits
             identifier, limits = await self._get_identifier_and_limits(request)
+            windows = [
+                (f"{identifier}:minute", limits["rpm"], 60),
+                (f"{identifier}:hour", limits["rph"], 3600),
+            ]
             
-            # Check rate limits (minute and hour windows)
-            minute_check = await rate_cache.check_rate_limit(
-                f"{identifier}:minute",
-                limits["rpm"],
-                60,  # 60 seconds
-                1    # cost
-            )
-            
-            hour_check = await rate_cache.check_rate_limit(
-                f"{identifier}:hour",
-                limits["rph"],
-                3600,  # 3600 seconds
-                1      # cost
-            )
+            # Check the minute and hour windows in one atomic round trip
+            if self.leased_limiter is not None:
+                minute_check, hour_check = await self.leased_limiter.check_rate_limits(identifier, windows)
+            else:
+                rate_cache = await get_rate_limit_cache()
+                minute_check, hour_check = await rate_cache.check_rate_limits(windows)
             
             # If either limit is exceeded, return 429
             if not minute_check["allowed"] or not hour_check["allowed"]:
@@ -126,7 +137,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             self._add_rate_limit_headers(response, minute_check, hour_check)
             
             return response
-            
+        
         except Exception as e:
             logger.error(f"Rate limiting error: {str(e)}")
             # On error, allow request to proceed (fail open)
@@ -154,22 +165,20 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             auth_header = request.headers.get("authorization")
             if auth_header and auth_header.startswith("Bearer "):
                 token = auth_header.split(" ")[1]
-                user = await get_current_user_from_token(token)
+                # Kept on request.state, so the endpoint's auth reuses it
+                user = await get_current_user_from_token(token, request)
         except:
             pass  # User not authenticated or invalid token
         
-        # Get method and path for endpoint-specific limits
-        method = request.method
-        path = request.url.path
-        endpoint_key = f"{method}:{path}"
-        
-        # Check for specific endpoint limits first
-        if endpoint_key in self.rate_limits:
+        # Check for specific endpoint limits first, one per route pattern
+        # rather than per concrete path
+        endpoint = self.endpoint_rules.match(request.method, request.url.path)
+        if endpoint is not None:
             if user:
-                identifier = f"user:{user.id}:endpoint:{endpoint_key}"
+                identifier = f"user:{user.id}:endpoint:{endpoint.pattern}"
             else:
-                identifier = f"ip:{self._get_client_ip(request)}:endpoint:{endpoint_key}"
-            return identifier, self.rate_limits[endpoint_key]
+                identifier = f"ip:{self._get_client_ip(request)}:endpoint:{endpoint.pattern}"
+            return identifier, endpoint.value
         
         # Use user-type specific limits if user is authenticated
         if user:
@@ -218,14 +227,18 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     ) -> JSONResponse:
         """Create rate limit exceeded response."""
         
-        # Determine which limit was exceeded
-        if not minute_check["allowed"]:
-            retry_after = 60  # Retry after 1 minute
+        # Determine which limit was exceeded. Windows are checked together, so
+        # both report denied and the one that denied has a wait
+        minute_exceeded = minute_check.get("retry_after") or (
+            not minute_check["allowed"] and not hour_check.get("retry_after")
+        )
+        if minute_exceeded:
+            retry_after = minute_check.get("retry_after") or 60  # Retry after 1 minute
             limit_type = "minute"
             current = minute_check["current_usage"]
             limit = minute_check["limit"]
         else:
-            retry_after = 3600  # Retry after 1 hour
+            retry_after = hour_check.get("retry_after") or 3600  # Retry after 1 hour
             limit_type = "hour"
             current = hour_check["current_usage"]
             limit = hour_check["limit"]
@@ -237,7 +250,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             "current_usage": current,
             "limit": limit,
             "retry_after": retry_after,
-            "reset_time": minute_check["reset_time"] if not minute_check["allowed"] else hour_check["reset_time"]
+            "reset_time": minute_check["reset_time"] if limit_type == "minute" else hour_check["reset_time"]
         }
         
         headers = {
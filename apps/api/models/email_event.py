@@ -25,8 +25,18 @@ class EmailEvent(Base):
     event_type: Mapped[str] = mapped_column(String(50), nullable=False)
     event_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False
+    )
     
     # Foreign keys
+    campaign_email_id: Mapped[Optional[UUID]] = mapped_column(
+        SQLAlchemyUUID(as_uuid=True),
+        ForeignKey("campaign_emails.id"),
+        nullable=True
+    )
     lead_id: Mapped[UUID] = mapped_column(
         SQLAlchemyUUID(as_uuid=True),
         ForeignKey("leads.id"),
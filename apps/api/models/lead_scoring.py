@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime
 import enum
 
-from ..core.database import Base
+from core.database import Base
 
 
 class ScoringModel(str, enum.Enum):
@@ -284,7 +284,8 @@ class LeadActivity(Base):
     # Context
     campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"))
     email_id = Column(UUID(as_uuid=True))
-    metadata = Column(JSON)
+    # "metadata" is reserved on declarative models
+    activity_metadata = Column("metadata", JSON)
     
     # Timestamp
     occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
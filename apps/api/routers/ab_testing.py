@@ -9,8 +9,7 @@ from datetime import datetime
 from uuid import UUID
 
 from ..core.database import get_db
-from ..core.security import get_current_user
-from ..models.user import User
+from ..core.security import Principal, get_current_principal
 from ..models.ab_testing import TestType, TestStatus, WinnerSelectionMethod
 from ..services.ab_testing_service import ABTestingService
 
@@ -78,7 +77,7 @@ class VariantAssignment(BaseModel):
 async def create_ab_test(
     test_data: ABTestCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new A/B test for a campaign."""
     service = ABTestingService(db)
@@ -134,7 +133,7 @@ async def list_ab_tests(
     status: Optional[TestStatus] = None,
     limit: int = 50,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List A/B tests for the workspace."""
     service = ABTestingService(db)
@@ -182,7 +181,7 @@ async def list_ab_tests(
 async def start_ab_test(
     test_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Start an A/B test."""
     service = ABTestingService(db)
@@ -203,7 +202,7 @@ async def assign_variant(
     lead_id: UUID,
     deterministic: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Assign a lead to a variant."""
     service = ABTestingService(db)
@@ -233,7 +232,7 @@ async def assign_variant(
 async def check_test_completion(
     test_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Check if test should be completed and analyze results."""
     service = ABTestingService(db)
@@ -251,7 +250,7 @@ async def check_test_completion(
 async def get_test_results(
     test_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get comprehensive test results."""
     service = ABTestingService(db)
@@ -272,7 +271,7 @@ async def update_variant_metrics(
     variant_id: UUID,
     event_type: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update variant metrics based on email events."""
     service = ABTestingService(db)
@@ -289,7 +288,7 @@ async def update_variant_metrics(
 async def get_campaign_tests(
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get all A/B tests for a specific campaign."""
     service = ABTestingService(db)
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from core.database import get_db
-from core.security import get_current_user
+from core.security import Principal, get_current_principal
 from utils.analytics_manager import (
     CampaignAnalyticsManager, 
     CampaignPerformance, 
@@ -18,7 +18,6 @@ from utils.analytics_manager import (
     AnalyticsTimeframe,
     EngagementSegment
 )
-from models.user import User
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -126,7 +125,7 @@ async def get_campaign_analytics(
     sort_desc: bool = Query(True),
     campaign_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get campaign performance analytics.
@@ -177,7 +176,7 @@ async def get_campaign_analytics(
 @router.get("/workspace", response_model=WorkspaceAnalyticsResponse)
 async def get_workspace_analytics(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get workspace-level analytics summary."""
     try:
@@ -220,7 +219,7 @@ async def get_lead_engagement(
     min_score: Optional[int] = Query(None, ge=0, le=100),
     limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get lead engagement analytics.
@@ -277,7 +276,7 @@ async def get_lead_engagement(
 async def get_optimal_send_times(
     limit: int = Query(5, ge=1, le=20),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get optimal send times based on historical performance.
@@ -319,7 +318,7 @@ async def get_daily_trends(
     days: int = Query(30, ge=1, le=365),
     campaign_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get daily performance trends.
@@ -361,7 +360,7 @@ async def get_daily_trends(
 @router.get("/engagement-distribution")
 async def get_engagement_distribution(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get lead engagement segment distribution."""
     try:
@@ -385,7 +384,7 @@ async def get_engagement_distribution(
 async def get_performance_comparison(
     timeframe: str = Query("30d", regex="^(7d|30d|90d|6m|1y|all)$"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get performance comparison between current and previous periods.
@@ -414,7 +413,7 @@ async def get_performance_comparison(
 @router.get("/dashboard")
 async def get_dashboard_data(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get comprehensive dashboard data for the workspace."""
     try:
@@ -493,7 +492,7 @@ async def get_dashboard_data(
 @router.get("/system/status")
 async def get_analytics_system_status(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get analytics system status and materialized view health."""
     try:
@@ -520,7 +519,7 @@ async def refresh_materialized_views(
     background_tasks: BackgroundTasks,
     view_names: Optional[List[str]] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Manually refresh materialized views.
@@ -563,7 +562,7 @@ async def get_campaign_details(
     include_trends: bool = Query(True),
     trend_days: int = Query(30, ge=1, le=90),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get detailed analytics for a specific campaign.
@@ -648,7 +647,7 @@ async def get_content_performance(
     metric: str = Query("engagement_score", regex="^(engagement_score|open_rate|click_rate|reply_rate)$"),
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get best performing email content based on metrics.
@@ -682,7 +681,7 @@ async def get_content_performance(
 async def get_conversion_funnel(
     campaign_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get conversion funnel metrics showing drop-off at each stage.
@@ -711,7 +710,7 @@ async def get_cohort_analysis(
     cohort_type: str = Query("weekly", regex="^(daily|weekly|monthly)$"),
     periods: int = Query(8, ge=1, le=24),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get cohort analysis for lead engagement over time.
@@ -741,7 +740,7 @@ async def get_cohort_analysis(
 async def get_attribution_sources(
     attribution_window: int = Query(30, ge=1, le=90),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get attribution analysis for lead sources and channels.
@@ -772,7 +771,7 @@ async def export_analytics_data(
     date_range: int = Query(30, ge=1, le=365),
     campaign_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Export analytics data in various formats.
@@ -817,7 +816,7 @@ async def get_ai_insights(
     insight_type: str = Query("general", regex="^(general|campaign|lead|content)$"),
     campaign_id: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get AI-powered insights and recommendations based on analytics data.
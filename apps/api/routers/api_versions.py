@@ -9,8 +9,7 @@ from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
 
 from core.versioning import version_registry, get_api_version_from_request
-from core.security import require_permissions
-from models.user import User
+from core.security import Principal, require_permissions
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -338,7 +337,7 @@ async def deprecate_api_version(
     version: str,
     deprecation_date: datetime,
     sunset_date: datetime,
-    current_user: User = Depends(require_permissions({"admin:write"}))
+    current_user: Principal = Depends(require_permissions({"admin:write"}))
 ):
     """Deprecate an API version (admin only)."""
     
@@ -377,7 +376,7 @@ async def deprecate_api_version(
 @router.post("/{version}/sunset")
 async def sunset_api_version(
     version: str,
-    current_user: User = Depends(require_permissions({"admin:write"}))
+    current_user: Principal = Depends(require_permissions({"admin:write"}))
 ):
     """Sunset an API version (admin only)."""
     
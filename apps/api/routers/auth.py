@@ -13,7 +13,9 @@ from core.database import get_db
 from core.security import (
     create_access_token,
     create_refresh_token,
+    Principal,
     get_current_active_user,
+    get_current_active_user_row,
     get_current_user_with_workspace,
     verify_password,
     verify_refresh_token
@@ -166,7 +168,7 @@ async def refresh_access_token(
 
 @router.get("/me")
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user_row)
 ) -> Dict[str, Any]:
     """Get current user information."""
     return {
@@ -212,7 +214,7 @@ async def get_current_user_with_workspace_info(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Dict[str, str]:
     """User logout endpoint."""
     # In a stateless JWT setup, logout is handled client-side
@@ -224,7 +226,7 @@ async def logout(
 async def change_password(
     current_password: str,
     new_password: str,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_row),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Change user password."""
@@ -242,7 +244,7 @@ async def change_password(
 
 @router.post("/verify-token")
 async def verify_token(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """Verify if the current token is valid."""
     return {
@@ -2,12 +2,12 @@
 Cache management API endpoints for monitoring and administration.
 """
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from datetime import datetime
 
 from models.user import User
 from utils.auth import get_current_user, require_admin
-from utils.cache_manager import CacheNamespace, get_cache
+from utils.cache_manager import CacheNamespace, get_cache, workspace_tag
 from middleware.cache_middleware import cache_endpoint, invalidate_cache
 from services.cache_warming_service import get_warming_service
 import logging
@@ -177,17 +177,9 @@ async def invalidate_workspace_cache(
     
     try:
         cache = await get_cache()
-        total_deleted = 0
         
-        if namespace:
-            # Invalidate specific namespace
-            deleted = await cache.delete_by_tag(workspace_id)
-            total_deleted = deleted
-        else:
-            # Invalidate all namespaces for workspace
-            for ns in CacheNamespace:
-                deleted = await cache.delete_by_tag(workspace_id)
-                total_deleted += deleted
+        # Every entry of the workspace carries its tag, in whatever namespace
+        total_deleted = await cache.delete_by_tag(workspace_tag(workspace_id), namespace=namespace)
         
         return {
             "workspace_id": workspace_id,
@@ -236,6 +228,7 @@ async def cache_health_check() -> Dict[str, Any]:
 @router.get("/campaigns/{campaign_id}/analytics")
 @cache_endpoint(ttl=300, namespace=CacheNamespace.ANALYTICS)
 async def get_campaign_analytics_cached(
+    request: Request,
     campaign_id: str,
     workspace_id: str = Query(...),
     current_user: User = Depends(get_current_user)
@@ -261,8 +254,9 @@ async def get_campaign_analytics_cached(
 
 
 @router.post("/campaigns/{campaign_id}/analytics/refresh")
-@invalidate_cache(pattern="{workspace_id}:campaigns:{campaign_id}:*")
+@invalidate_cache(tags=["workspace:{workspace_id}:cache:campaigns:{campaign_id}"])
 async def refresh_campaign_analytics(
+    request: Request,
     campaign_id: str,
     workspace_id: str = Query(...),
     current_user: User = Depends(get_current_user)
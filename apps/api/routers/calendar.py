@@ -10,8 +10,7 @@ from uuid import UUID
 import pytz
 
 from ..core.database import get_db
-from ..core.security import get_current_user
-from ..models.user import User
+from ..core.security import Principal, get_current_principal
 from ..models.calendar import (
     CalendarProvider, BookingStatus, MeetingType, TimeZonePreference
 )
@@ -208,7 +207,7 @@ class BookingAnalyticsResponse(BaseModel):
 async def connect_calendar_account(
     request: ConnectCalendarRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Connect a calendar account."""
     service = CalendarService(db)
@@ -259,7 +258,7 @@ async def connect_calendar_account(
 @router.get("/accounts", response_model=List[CalendarAccountResponse])
 async def list_calendar_accounts(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List connected calendar accounts."""
     from sqlalchemy import select
@@ -295,7 +294,7 @@ async def list_calendar_accounts(
 async def disconnect_calendar_account(
     account_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Disconnect a calendar account."""
     from ..models.calendar import CalendarAccount
@@ -319,7 +318,7 @@ async def disconnect_calendar_account(
 async def create_booking_page(
     request: CreateBookingPageRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new booking page."""
     service = CalendarService(db)
@@ -391,7 +390,7 @@ async def create_booking_page(
 @router.get("/booking-pages", response_model=List[BookingPageResponse])
 async def list_booking_pages(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List booking pages for the current user."""
     from sqlalchemy import select
@@ -437,7 +436,7 @@ async def list_booking_pages(
 async def get_booking_page(
     page_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get a specific booking page."""
     from sqlalchemy.orm import selectinload
@@ -483,7 +482,7 @@ async def update_booking_page(
     page_id: UUID,
     request: UpdateBookingPageRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a booking page."""
     from sqlalchemy.orm import selectinload
@@ -535,7 +534,7 @@ async def update_booking_page(
 async def delete_booking_page(
     page_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a booking page."""
     from ..models.calendar import BookingPage, CalendarAccount
@@ -698,7 +697,7 @@ async def list_meetings(
     end_date: Optional[date] = Query(None),
     status: Optional[BookingStatus] = Query(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List meetings for the current user."""
     from sqlalchemy import select, and_
@@ -758,7 +757,7 @@ async def reschedule_meeting(
     meeting_id: UUID,
     request: RescheduleRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Reschedule a meeting."""
     from sqlalchemy.orm import selectinload
@@ -797,7 +796,7 @@ async def cancel_meeting(
     meeting_id: UUID,
     reason: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Cancel a meeting."""
     from sqlalchemy.orm import selectinload
@@ -836,7 +835,7 @@ async def get_booking_page_analytics(
     start_date: date = Query(...),
     end_date: date = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get analytics for a booking page."""
     from ..models.calendar import BookingPage, CalendarAccount
@@ -10,8 +10,7 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from core.security import get_current_active_user, require_permissions
-from models.user import User
+from core.security import Principal, get_current_active_user, require_permissions
 from models.campaign import CampaignCreate, CampaignResponse, CampaignUpdate
 from services.campaign_service import CampaignService
 from workers.email_tasks import start_campaign, pause_campaign
@@ -60,7 +59,7 @@ async def get_campaigns(
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None, description="Filter by campaign status"),
     search: Optional[str] = Query(None, description="Search campaigns by name"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> List[CampaignResponse]:
     """Get campaigns for the current user's workspace with filtering."""
@@ -79,7 +78,7 @@ async def get_campaigns(
 async def get_campaign_stats(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> List[CampaignStatsResponse]:
     """Get campaign statistics for the current user's workspace."""
@@ -94,7 +93,7 @@ async def get_campaign_stats(
 @router.post("/", response_model=CampaignResponse)
 async def create_campaign(
     campaign: CampaignCreate,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> CampaignResponse:
     """Create a new campaign."""
@@ -109,7 +108,7 @@ async def create_campaign(
 @router.get("/{campaign_id}", response_model=CampaignResponse)
 async def get_campaign(
     campaign_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> CampaignResponse:
     """Get a specific campaign."""
@@ -136,7 +135,7 @@ async def get_campaign(
 async def update_campaign(
     campaign_id: UUID,
     campaign_update: CampaignUpdate,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> CampaignResponse:
     """Update a campaign."""
@@ -169,7 +168,7 @@ async def update_campaign(
 @router.delete("/{campaign_id}")
 async def delete_campaign(
     campaign_id: UUID,
-    current_user: User = Depends(require_permissions({"campaigns:delete"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:delete"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Delete a campaign."""
@@ -205,7 +204,7 @@ async def execute_campaign_action(
     campaign_id: UUID,
     action_request: CampaignActionRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Execute campaign actions: start, pause, resume, stop."""
@@ -296,7 +295,7 @@ async def execute_campaign_action(
 async def duplicate_campaign(
     campaign_id: UUID,
     name: Optional[str] = None,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> CampaignResponse:
     """Duplicate an existing campaign."""
@@ -327,7 +326,7 @@ async def duplicate_campaign(
 async def preview_campaign_emails(
     campaign_id: UUID,
     preview_request: CampaignPreviewRequest,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Preview emails that will be sent for a campaign."""
@@ -359,7 +358,7 @@ async def get_campaign_analytics(
     campaign_id: UUID,
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> CampaignAnalyticsResponse:
     """Get detailed analytics for a campaign."""
@@ -392,7 +391,7 @@ async def get_campaign_leads(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None, description="Filter by lead status"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Get leads associated with a campaign."""
@@ -424,7 +423,7 @@ async def get_campaign_leads(
 async def add_leads_to_campaign(
     campaign_id: UUID,
     lead_ids: List[UUID],
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Add leads to a campaign."""
@@ -469,7 +468,7 @@ async def add_leads_to_campaign(
 async def remove_lead_from_campaign(
     campaign_id: UUID,
     lead_id: UUID,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Remove a lead from a campaign."""
@@ -503,7 +502,7 @@ async def get_campaign_emails(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None, description="Filter by email status"),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Get emails sent for a campaign."""
@@ -536,7 +535,7 @@ async def send_test_email(
     campaign_id: UUID,
     test_email: str,
     lead_id: Optional[UUID] = None,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Send a test email for a campaign."""
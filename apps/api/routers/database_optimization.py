@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from core.database import get_db
-from core.security import get_current_user
+from core.security import Principal, get_current_principal
 from utils.index_monitor import (
     IndexMonitor, 
     quick_index_check,
@@ -19,7 +19,6 @@ from utils.index_monitor import (
     TableStats,
     IndexRecommendation
 )
-from models.user import User
 
 router = APIRouter(prefix="/api/system/database", tags=["database-optimization"])
 
@@ -91,7 +90,7 @@ async def get_index_usage(
     table_name: Optional[str] = Query(None, description="Filter by table name"),
     include_unused: bool = Query(True, description="Include unused indexes"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get index usage statistics for all tables.
@@ -143,7 +142,7 @@ async def get_table_statistics(
     min_size_mb: int = Query(10, ge=1, description="Minimum table size in MB"),
     only_problematic: bool = Query(False, description="Only show tables needing optimization"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get table statistics to identify optimization opportunities.
@@ -188,7 +187,7 @@ async def get_table_statistics(
 async def get_index_recommendations(
     priority: Optional[str] = Query(None, regex="^(high|medium|low)$"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get index creation recommendations based on usage patterns.
@@ -231,7 +230,7 @@ async def get_index_recommendations(
 @router.get("/indexes/health", response_model=IndexHealthSummary)
 async def get_index_health_summary(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get quick index health summary.
@@ -260,7 +259,7 @@ async def get_index_health_summary(
 async def check_index_bloat(
     bloat_threshold: float = Query(0.2, ge=0.1, le=0.9, description="Bloat threshold (0.2 = 20%)"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Check for bloated indexes that need maintenance.
@@ -294,7 +293,7 @@ async def check_index_bloat(
 @router.get("/optimization/report", response_model=OptimizationReportResponse)
 async def get_optimization_report(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Generate comprehensive database optimization report.
@@ -352,7 +351,7 @@ async def get_maintenance_commands(
     include_vacuum: bool = Query(True, description="Include VACUUM commands"),
     include_analyze: bool = Query(True, description="Include ANALYZE commands"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get recommended database maintenance commands.
@@ -419,7 +418,7 @@ async def optimize_specific_table(
     execute: bool = Query(False, description="Execute the optimization commands"),
     background_tasks: BackgroundTasks = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get or execute optimization commands for a specific table.
@@ -475,7 +474,7 @@ async def get_slow_queries(
     min_duration_ms: int = Query(100, ge=10, description="Minimum query duration in ms"),
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get slow queries for analysis.
@@ -10,8 +10,7 @@ from pydantic import BaseModel, EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from core.security import get_current_active_user, require_permissions
-from models.user import User
+from core.security import Principal, get_current_active_user, require_permissions
 from services.campaign_service import CampaignService
 from services.lead_service import LeadService
 from utils.email_client import AdvancedEmailClient, EmailTemplate, email_client
@@ -85,7 +84,7 @@ class QueueStatsResponse(BaseModel):
 async def send_email(
     email_request: SendEmailRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Send a single email."""
@@ -133,7 +132,7 @@ async def send_email(
 async def send_bulk_email(
     bulk_request: SendBulkEmailRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Send bulk emails."""
@@ -181,7 +180,7 @@ async def send_bulk_email(
 async def send_template_email(
     template_request: SendTemplateEmailRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(require_permissions({"campaigns:write"})),
+    current_user: Principal = Depends(require_permissions({"campaigns:write"})),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """Send email using template with variables."""
@@ -242,7 +241,7 @@ async def send_template_email(
 @router.get("/stats/{email_id}", response_model=EmailStatsResponse)
 async def get_email_stats(
     email_id: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> EmailStatsResponse:
     """Get statistics and events for a specific email."""
     
@@ -286,7 +285,7 @@ async def get_email_stats(
 
 @router.get("/queue/stats", response_model=QueueStatsResponse)
 async def get_queue_stats(
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ) -> QueueStatsResponse:
     """Get email queue statistics."""
     
@@ -317,7 +316,7 @@ async def get_queue_stats(
 async def process_queue(
     max_emails: int = Query(100, ge=1, le=1000),
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(require_permissions({"campaigns:write"}))
+    current_user: Principal = Depends(require_permissions({"campaigns:write"}))
 ) -> Dict[str, str]:
     """Manually trigger email queue processing."""
     
@@ -378,7 +377,7 @@ async def track_email_click(
 @router.get("/deliverability/reputation/{domain}")
 async def get_domain_reputation(
     domain: str,
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ) -> Dict[str, Any]:
     """Get deliverability reputation for a domain."""
     
@@ -395,7 +394,7 @@ async def get_domain_reputation(
 
 @router.get("/deliverability/suppression-list")
 async def get_suppression_list(
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ) -> Dict[str, List[str]]:
     """Get SES suppression list."""
     
@@ -414,7 +413,7 @@ async def get_suppression_list(
 async def send_test_email(
     to_email: EmailStr,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Dict[str, str]:
     """Send a test email to verify email sending functionality."""
     
@@ -466,7 +465,7 @@ async def send_test_email(
 
 @router.get("/templates/variables")
 async def get_template_variables(
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """Get available template variables for email composition."""
     
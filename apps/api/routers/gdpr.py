@@ -8,8 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from core.security import get_current_active_user
-from models.user import User
+from core.security import Principal, get_current_active_user
 from models.gdpr import (
     ConsentRequest,
     ConsentResponse,
@@ -25,7 +24,7 @@ router = APIRouter()
 @router.post("/consent", response_model=ConsentResponse)
 async def record_consent(
     consent_request: ConsentRequest,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Record consent for data processing."""
@@ -40,7 +39,7 @@ async def record_consent(
 async def check_consent(
     email: str,
     consent_type: str,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """Check consent status for an email address."""
@@ -61,7 +60,7 @@ async def check_consent(
 @router.post("/requests", response_model=DataSubjectRequestResponse)
 async def create_data_subject_request(
     request: DataSubjectRequest,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a data subject request (access, deletion, etc.)."""
@@ -76,7 +75,7 @@ async def create_data_subject_request(
 async def get_data_subject_requests(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get data subject requests for the workspace."""
@@ -92,7 +91,7 @@ async def get_data_subject_requests(
 async def export_personal_data(
     email: str,
     format: str = "json",
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Export personal data for a given email address."""
@@ -117,7 +116,7 @@ async def export_personal_data(
 async def delete_personal_data(
     email: str,
     deletion_strategy: str = "anonymize",
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete personal data for a given email address."""
@@ -141,7 +140,7 @@ async def delete_personal_data(
 @router.post("/suppression")
 async def add_to_suppression_list(
     suppression_request: SuppressionRequest,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Add email to suppression list."""
@@ -158,7 +157,7 @@ async def add_to_suppression_list(
 async def get_suppression_list(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get suppression list for the workspace."""
@@ -175,7 +174,7 @@ async def get_gdpr_audit_logs(
     skip: int = 0,
     limit: int = 100,
     action_category: str = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get GDPR audit logs for the workspace."""
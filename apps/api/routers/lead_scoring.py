@@ -9,8 +9,7 @@ from datetime import datetime
 from uuid import UUID
 
 from ..core.database import get_db
-from ..core.security import get_current_user
-from ..models.user import User
+from ..core.security import Principal, get_current_principal
 from ..models.lead_scoring import (
     ScoringModel, SegmentType, SegmentStatus, RuleOperator
 )
@@ -120,7 +119,7 @@ async def calculate_lead_score(
     lead_id: UUID,
     trigger_event: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Calculate or recalculate a lead's score."""
     service = LeadScoringService(db)
@@ -131,6 +130,7 @@ async def calculate_lead_score(
             current_user.workspace_id,
             trigger_event
         )
+        await db.commit()
         
         # Get score history
         history = [
@@ -167,36 +167,30 @@ async def calculate_lead_score(
 async def bulk_calculate_scores(
     request: BulkScoreCalculation,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Calculate scores for multiple leads."""
     service = LeadScoringService(db)
     
-    results = []
-    errors = []
+    scored = await service.calculate_lead_scores_bulk(
+        request.lead_ids,
+        current_user.workspace_id,
+        request.trigger_event
+    )
+    await db.commit()
     
-    for lead_id in request.lead_ids:
-        try:
-            lead_score = await service.calculate_lead_score(
-                str(lead_id),
-                current_user.workspace_id,
-                request.trigger_event
-            )
-            results.append({
-                'lead_id': str(lead_id),
-                'total_score': lead_score.total_score,
-                'grade': lead_score.grade
-            })
-        except Exception as e:
-            errors.append({
-                'lead_id': str(lead_id),
-                'error': str(e)
-            })
+    errors = [
+        {
+            'lead_id': lead_id,
+            'error': f"Lead {lead_id} not found"
+        }
+        for lead_id in scored['missing']
+    ]
     
     return {
-        'processed': len(results),
+        'processed': len(scored['results']),
         'failed': len(errors),
-        'results': results,
+        'results': scored['results'],
         'errors': errors
     }
 
@@ -205,7 +199,7 @@ async def bulk_calculate_scores(
 async def get_lead_score(
     lead_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get current lead score."""
     # Query lead score from database
@@ -261,7 +255,7 @@ async def get_lead_score(
 async def update_scoring_rules(
     updates: ScoringRuleUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update workspace scoring rules."""
     from sqlalchemy import select, and_
@@ -299,7 +293,7 @@ async def update_scoring_rules(
 async def create_segment(
     segment_data: SegmentCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new segment."""
     service = LeadScoringService(db)
@@ -340,7 +334,7 @@ async def list_segments(
     status: Optional[SegmentStatus] = None,
     limit: int = Query(50, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List workspace segments."""
     service = LeadScoringService(db)
@@ -375,7 +369,7 @@ async def list_segments(
 async def get_segment(
     segment_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get segment details."""
     from ..models.lead_scoring import Segment
@@ -410,7 +404,7 @@ async def update_segment(
     segment_id: UUID,
     updates: SegmentUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update segment configuration."""
     service = LeadScoringService(db)
@@ -448,7 +442,7 @@ async def update_segment_membership(
     segment_id: UUID,
     request: SegmentMembershipUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Add or remove leads from a segment."""
     service = LeadScoringService(db)
@@ -476,7 +470,7 @@ async def get_segment_members(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get members of a segment."""
     from sqlalchemy import select
@@ -518,7 +512,7 @@ async def get_segment_members(
 async def get_lead_segments(
     lead_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get all segments a lead belongs to."""
     service = LeadScoringService(db)
@@ -552,7 +546,7 @@ async def get_lead_segments(
 async def recalculate_segment(
     segment_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Recalculate dynamic segment membership."""
     from ..models.lead_scoring import Segment, SegmentType
@@ -583,7 +577,7 @@ async def recalculate_segment(
 @router.get("/analytics/score-distribution")
 async def get_score_distribution(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get lead score distribution for workspace."""
     from sqlalchemy import select, func, case
@@ -8,8 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from core.security import get_current_active_user
-from models.user import User
+from core.security import Principal, get_current_active_user
 from models.lead import LeadCreate, LeadResponse, LeadUpdate
 from services.lead_service import LeadService
 
@@ -20,7 +19,7 @@ router = APIRouter()
 async def get_leads(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get leads for the current user's workspace."""
@@ -36,7 +35,7 @@ async def get_leads(
 @router.post("/", response_model=LeadResponse)
 async def create_lead(
     lead: LeadCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new lead."""
@@ -50,7 +49,7 @@ async def create_lead(
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific lead."""
@@ -77,7 +76,7 @@ async def get_lead(
 async def update_lead(
     lead_id: UUID,
     lead_update: LeadUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a lead."""
@@ -103,7 +102,7 @@ async def update_lead(
 @router.delete("/{lead_id}")
 async def delete_lead(
     lead_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a lead."""
@@ -130,7 +129,7 @@ async def delete_lead(
 @router.post("/{lead_id}/enrich")
 async def enrich_lead(
     lead_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Trigger lead enrichment."""
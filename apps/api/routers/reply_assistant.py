@@ -9,8 +9,7 @@ from datetime import datetime
 from uuid import UUID
 
 from ..core.database import get_db
-from ..core.security import get_current_user
-from ..models.user import User
+from ..core.security import Principal, get_current_principal
 from ..models.reply_assistant import (
     ReplyTone, ReplyIntent, ReplyLength
 )
@@ -106,7 +105,7 @@ class OptimizationRequest(BaseModel):
 async def analyze_reply(
     request: AnalyzeReplyRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Analyze an incoming email reply."""
     service = ReplyAssistantService(db)
@@ -144,7 +143,7 @@ async def analyze_reply(
 async def generate_suggestions(
     request: GenerateSuggestionsRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Generate AI-powered reply suggestions."""
     service = ReplyAssistantService(db)
@@ -181,7 +180,7 @@ async def select_suggestion(
     suggestion_id: UUID,
     edited_text: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Mark a suggestion as selected and optionally save edits."""
     from ..models.reply_assistant import AISuggestedReply
@@ -222,7 +221,7 @@ async def provide_feedback(
     positive_response: bool,
     response_time_hours: Optional[float] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Provide feedback on suggestion effectiveness."""
     from ..models.reply_assistant import AISuggestedReply
@@ -255,7 +254,7 @@ async def provide_feedback(
 async def create_template(
     template_data: CreateTemplateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new reply template."""
     service = ReplyAssistantService(db)
@@ -290,7 +289,7 @@ async def list_templates(
     intent: Optional[ReplyIntent] = None,
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List reply templates for workspace."""
     service = ReplyAssistantService(db)
@@ -324,7 +323,7 @@ async def update_template(
     template_id: UUID,
     updates: Dict,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Update a reply template."""
     from ..models.reply_assistant import ReplyTemplate
@@ -352,7 +351,7 @@ async def update_template(
 async def delete_template(
     template_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Delete a reply template."""
     from ..models.reply_assistant import ReplyTemplate
@@ -376,7 +375,7 @@ async def delete_template(
 async def apply_workflow(
     request: WorkflowRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Apply an automated workflow to a reply."""
     service = ReplyAssistantService(db)
@@ -400,7 +399,7 @@ async def list_workflows(
     intent: Optional[ReplyIntent] = None,
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List available workflows."""
     from sqlalchemy import select, and_
@@ -438,7 +437,7 @@ async def list_workflows(
 async def optimize_performance(
     request: OptimizationRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Analyze and optimize reply performance."""
     service = ReplyAssistantService(db)
@@ -457,7 +456,7 @@ async def get_conversation_context(
     lead_id: UUID,
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get conversation context for a lead and campaign."""
     from sqlalchemy import select, and_
@@ -500,7 +499,7 @@ async def get_conversation_context(
 async def get_intent_distribution(
     days: int = Query(30, ge=1, le=90),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get distribution of reply intents."""
     from sqlalchemy import select, func
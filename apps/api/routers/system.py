@@ -6,10 +6,11 @@ from typing import Any, Dict
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
-from core.security import require_permissions
-from models.user import User
+from core.security import Principal, require_permissions
+from utils.cache_manager import get_cache
 from utils.redis_manager import health_check_redis, redis_monitor, redis_pool
 from workers.celery_app import celery_app
 
@@ -106,7 +107,7 @@ async def health_check():
 
 @router.get("/stats", response_model=SystemStatsResponse)
 async def get_system_stats(
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ):
     """Get detailed system statistics (admin only)."""
     
@@ -189,7 +190,7 @@ async def get_system_stats(
 
 @router.get("/redis/info")
 async def get_redis_info(
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ):
     """Get detailed Redis information."""
     
@@ -213,7 +214,7 @@ async def get_redis_info(
 
 @router.post("/redis/cleanup")
 async def cleanup_redis_keys(
-    current_user: User = Depends(require_permissions({"admin:write"}))
+    current_user: Principal = Depends(require_permissions({"admin:write"}))
 ):
     """Clean up expired Redis keys (admin only)."""
     
@@ -238,7 +239,7 @@ async def cleanup_redis_keys(
 
 @router.get("/celery/workers")
 async def get_celery_workers(
-    current_user: User = Depends(require_permissions({"analytics:read"}))
+    current_user: Principal = Depends(require_permissions({"analytics:read"}))
 ):
     """Get Celery worker information."""
     
@@ -265,7 +266,7 @@ async def get_celery_workers(
 @router.post("/celery/purge")
 async def purge_celery_queue(
     queue_name: str,
-    current_user: User = Depends(require_permissions({"admin:write"}))
+    current_user: Principal = Depends(require_permissions({"admin:write"}))
 ):
     """Purge a Celery queue (admin only)."""
     
@@ -290,7 +291,7 @@ async def purge_celery_queue(
         )
 
 
-@router.get("/metrics")
+@router.get("/metrics", response_class=PlainTextResponse)
 async def get_system_metrics():
     """Get system metrics in Prometheus format."""
     
@@ -314,6 +315,14 @@ async def get_system_metrics():
         except Exception as e:
             logger.error(f"Error collecting Redis metrics: {str(e)}")
         
+        # Cache metrics per namespace, from this process
+        try:
+            cache = await get_cache()
+            metrics.extend(cache.prometheus_metrics())
+        
+        except Exception as e:
+            logger.error(f"Error collecting cache metrics: {str(e)}")
+        
         # Celery metrics
         try:
             celery_inspect = celery_app.control.inspect()
@@ -349,7 +358,10 @@ async def get_system_metrics():
             logger.error(f"Error collecting system metrics: {str(e)}")
         
         # Return metrics in Prometheus format
-        return "\n".join(metrics)
+        return PlainTextResponse(
+            "\n".join(metrics) + "\n",
+            media_type="text/plain; version=0.0.4"
+        )
         
     except Exception as e:
         logger.error(f"Error generating metrics: {str(e)}")
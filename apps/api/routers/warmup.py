@@ -9,7 +9,7 @@ from datetime import datetime, date
 from uuid import UUID
 
 from ..core.database import get_db
-from ..core.security import get_current_user
+from ..core.security import Principal, get_current_principal, get_current_user
 from ..models.user import User
 from ..models.email_warmup import (
     WarmupStatus, WarmupStrategy, EmailProvider
@@ -128,7 +128,7 @@ class DailyStatResponse(BaseModel):
 async def create_pool(
     request: CreatePoolRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new warm-up pool."""
     service = WarmupService(db)
@@ -168,7 +168,7 @@ async def create_pool(
 async def list_pools(
     active_only: bool = True,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List warm-up pools for workspace."""
     service = WarmupService(db)
@@ -200,7 +200,7 @@ async def add_account_to_pool(
     pool_id: UUID,
     request: AddAccountRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Add an email account to a warm-up pool."""
     service = WarmupService(db)
@@ -266,7 +266,7 @@ async def add_account_to_pool(
 async def get_pool_accounts(
     pool_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get accounts in a warm-up pool."""
     from sqlalchemy import select
@@ -311,7 +311,7 @@ async def get_pool_accounts(
 async def create_campaign(
     request: CreateCampaignRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Create a new warm-up campaign."""
     service = WarmupService(db)
@@ -359,7 +359,7 @@ async def create_campaign(
 async def list_campaigns(
     status: Optional[WarmupStatus] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List warm-up campaigns for workspace."""
     service = WarmupService(db)
@@ -399,7 +399,7 @@ async def list_campaigns(
 async def start_campaign(
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Start a warm-up campaign."""
     service = WarmupService(db)
@@ -434,7 +434,7 @@ async def start_campaign(
 async def pause_campaign(
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Pause a warm-up campaign."""
     from ..models.email_warmup import WarmupCampaign
@@ -463,7 +463,7 @@ async def pause_campaign(
 async def execute_daily_warmup(
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Manually execute daily warm-up for a campaign."""
     service = WarmupService(db)
@@ -488,7 +488,7 @@ async def get_campaign_stats(
     campaign_id: UUID,
     days: int = Query(30, ge=1, le=90),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get daily statistics for a campaign."""
     from sqlalchemy import select
@@ -536,7 +536,7 @@ async def get_campaign_stats(
 async def get_campaign_schedule(
     campaign_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get ramp-up schedule for a campaign."""
     from ..models.email_warmup import WarmupCampaign
@@ -582,7 +582,7 @@ async def simulate_engagement(
 @router.get("/analytics/overview")
 async def get_warmup_analytics(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get warm-up system analytics overview."""
     from sqlalchemy import select, func
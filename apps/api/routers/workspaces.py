@@ -8,8 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
-from core.security import get_current_active_user, require_role
-from models.user import User
+from core.security import Principal, get_current_active_user, require_role
 from models.workspace import WorkspaceCreate, WorkspaceResponse, WorkspaceUpdate
 from services.workspace_service import WorkspaceService
 
@@ -18,7 +17,7 @@ router = APIRouter()
 
 @router.get("/current", response_model=WorkspaceResponse)
 async def get_current_workspace(
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get the current user's workspace."""
@@ -37,7 +36,7 @@ async def get_current_workspace(
 @router.put("/current", response_model=WorkspaceResponse)
 async def update_current_workspace(
     workspace_update: WorkspaceUpdate,
-    current_user: User = Depends(require_role("admin")),
+    current_user: Principal = Depends(require_role("admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Update the current user's workspace."""
@@ -57,7 +56,7 @@ async def update_current_workspace(
 async def get_workspaces(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(require_role("super_admin")),
+    current_user: Principal = Depends(require_role("super_admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all workspaces (super admin only)."""
@@ -68,7 +67,7 @@ async def get_workspaces(
 @router.post("/", response_model=WorkspaceResponse)
 async def create_workspace(
     workspace: WorkspaceCreate,
-    current_user: User = Depends(require_role("super_admin")),
+    current_user: Principal = Depends(require_role("super_admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new workspace (super admin only)."""
@@ -79,7 +78,7 @@ async def create_workspace(
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
 async def get_workspace(
     workspace_id: UUID,
-    current_user: User = Depends(require_role("super_admin")),
+    current_user: Principal = Depends(require_role("super_admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific workspace (super admin only)."""
@@ -99,7 +98,7 @@ async def get_workspace(
 async def update_workspace(
     workspace_id: UUID,
     workspace_update: WorkspaceUpdate,
-    current_user: User = Depends(require_role("super_admin")),
+    current_user: Principal = Depends(require_role("super_admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Update a workspace (super admin only)."""
@@ -118,7 +117,7 @@ async def update_workspace(
 @router.delete("/{workspace_id}")
 async def delete_workspace(
     workspace_id: UUID,
-    current_user: User = Depends(require_role("super_admin")),
+    current_user: Principal = Depends(require_role("super_admin")),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a workspace (super admin only)."""
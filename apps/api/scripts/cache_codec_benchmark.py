@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""
+Cache codec micro-benchmark for ColdCopy.
+
+Compares the serializers and compressors in utils.cache_codecs on payloads
+shaped like what the cache actually holds: AI responses, lead enrichment
+results, campaign analytics and paginated API list responses. Run from
+apps/api: python scripts/cache_codec_benchmark.py
+"""
+
+import json
+import os
+import random
+import string
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.cache_codecs import CODECS, CODEC_BYTES, COMPRESSORS  # noqa: E402
+
+
+def _words(count: int) -> str:
+    """Generate filler text with a natural word length distribution."""
+    return " ".join(
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10)))
+        for _ in range(count)
+    )
+
+
+def ai_response_payload() -> Dict[str, Any]:
+    """A cached AIResponse, mostly generated email copy."""
+    return {
+        "content": "\n\n".join(_words(random.randint(40, 90)) for _ in range(6)),
+        "model": "gpt-4",
+        "tokens_used": 1260,
+        "tokens_prompt": 410,
+        "tokens_completion": 850,
+        "cost": 0.0378,
+        "cached": False,
+        "processing_time_ms": 2840,
+        "provider": "openai",
+        "cache_key": "ai:" + "".join(random.choices(string.hexdigits, k=32)),
+    }
+
+
+def enrichment_payload() -> Dict[str, Any]:
+    """A cached EnrichmentResult for one lead."""
+    return {
+        "success": True,
+        "source": "hunter",
+        "data": {
+            "email": "jane.doe@example.com",
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "title": "VP Marketing",
+            "company": {
+                "name": "Example Corp",
+                "domain": "example.com",
+                "industry": "Software",
+                "size": "201-500",
+                "technologies": [_words(1) for _ in range(25)],
+                "description": _words(60),
+            },
+            "social": {
+                "linkedin": "https://linkedin.com/in/janedoe",
+                "twitter": "@janedoe",
+            },
+            "employment_history": [
+                {
+                    "company": _words(2),
+                    "title": _words(3),
+                    "start": (datetime(2015, 1, 1) + timedelta(days=400 * i)).isoformat(),
+                }
+                for i in range(5)
+            ],
+            "confidence": 0.92,
+        },
+        "cached": False,
+        "cost": 0.01,
+        "processing_time_ms": 640,
+        "error": None,
+    }
+
+
+def analytics_payload() -> Dict[str, Any]:
+    """Campaign stats with an hourly time series."""
+    start = datetime(2024, 1, 1)
+    return {
+        "campaign_id": "campaign_123",
+        "sent": 15000,
+        "delivered": 14710,
+        "opened": 6120,
+        "clicked": 1480,
+        "replied": 310,
+        "bounced": 290,
+        "timeseries": [
+            {
+                "hour": (start + timedelta(hours=h)).isoformat(),
+                "sent": random.randint(0, 400),
+                "opened": random.randint(0, 200),
+                "clicked": random.randint(0, 60),
+            }
+            for h in range(24 * 14)
+        ],
+    }
+
+
+def lead_list_payload() -> Dict[str, Any]:
+    """A page of /api/leads."""
+    return {
+        "items": [
+            {
+                "id": f"lead_{i}",
+                "email": f"lead{i}@example.com",
+                "first_name": _words(1).title(),
+                "last_name": _words(1).title(),
+                "company": _words(2).title(),
+                "title": _words(2).title(),
+                "status": random.choice(["new", "contacted", "replied", "bounced"]),
+                "score": random.randint(0, 100),
+                "tags": [_words(1) for _ in range(3)],
+                "created_at": (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat(),
+            }
+            for i in range(100)
+        ],
+        "total": 5000,
+        "page": 1,
+        "page_size": 100,
+    }
+
+
+PAYLOADS = {
+    "ai_response": ai_response_payload,
+    "enrichment": enrichment_payload,
+    "analytics": analytics_payload,
+    "lead_list": lead_list_payload,
+}
+
+
+def _best_of(func, number: int) -> float:
+    """Best per-call time in microseconds over a few repeats."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1_000_000
+
+
+def benchmark_payload(name: str, value: Any, number: int) -> List[Dict[str, Any]]:
+    """Time every installed codec and compression on one payload."""
+    results = []
+    codecs = [codec for codec in CODECS.values() if codec.codec_id != CODEC_BYTES]
+    compressors = [None] + list(COMPRESSORS.values())
+    
+    for codec in codecs:
+        encoded = codec.dumps(value)
+        encode_us = _best_of(lambda: codec.dumps(value), number)
+        decode_us = _best_of(lambda: codec.loads(encoded), number)
+        
+        for compressor in compressors:
+            if compressor is None:
+                stored, compress_us, decompress_us = encoded, 0.0, 0.0
+            else:
+                stored = compressor.compress(encoded)
+                compress_us = _best_of(lambda: compressor.compress(encoded), number)
+                decompress_us = _best_of(lambda: compressor.decompress(stored), number)
+            
+            results.append({
+                "payload": name,
+                "codec": codec.name,
+                "compression": compressor.name if compressor else "none",
+                "bytes": len(stored),
+                "write_us": encode_us + compress_us,
+                "read_us": decode_us + decompress_us,
+            })
+    
+    return results
+
+
+def print_results(results: List[Dict[str, Any]]):
+    """Print a table per payload, relative to plain json."""
+    for name in PAYLOADS:
+        rows = [r for r in results if r["payload"] == name]
+        baseline = next(r for r in rows if r["codec"] == "json" and r["compression"] == "none")
+        
+        print(f"\n{name} ({baseline['bytes']} bytes as json)")
+        print(f"{'codec':<10}{'compression':<13}{'bytes':>9}{'size':>8}{'write us':>11}{'read us':>11}{'speedup':>9}")
+        
+        for r in sorted(rows, key=lambda r: r["write_us"] + r["read_us"]):
+            speedup = (baseline["write_us"] + baseline["read_us"]) / (r["write_us"] + r["read_us"])
+            print(
+                f"{r['codec']:<10}{r['compression']:<13}{r['bytes']:>9}"
+                f"{r['bytes'] / baseline['bytes']:>7.0%} {r['write_us']:>10.1f}"
+                f"{r['read_us']:>11.1f}{speedup:>8.1f}x"
+            )
+
+
+def main():
+    """Main function."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Cache codec benchmark for ColdCopy")
+    parser.add_argument("--number", type=int, default=200,
+                       help="Calls per timing run")
+    parser.add_argument("--output", help="Output file for results (JSON)")
+    
+    args = parser.parse_args()
+    random.seed(42)
+    
+    results = []
+    for name, factory in PAYLOADS.items():
+        results.extend(benchmark_payload(name, factory(), args.number))
+    
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,9 @@ in cache, reducing latency and database load.
 """
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Set
-from datetime import datetime, timedelta
+import uuid
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
@@ -18,7 +19,9 @@ from models.workspace import Workspace
 from models.campaign import Campaign
 from models.lead import Lead
 from models.user import User
-from utils.cache_manager import CacheManager, CacheNamespace, get_cache
+from utils.cache_access_patterns import AccessPatternModel
+from utils.cache_manager import CacheManager, CacheNamespace, get_cache, workspace_tag
+from utils.redis_manager import get_redis_pool
 from services.analytics_service import AnalyticsService
 from services.campaign_service import CampaignService
 from services.lead_service import LeadService
@@ -61,15 +64,23 @@ class CacheWarmingService:
         self.cache = cache_manager
         self.db = db_session
         self.warming_tasks: List[WarmingTask] = []
-        self.access_patterns: Dict[str, List[datetime]] = {}
+        self.access_patterns: Optional[AccessPatternModel] = None
         self.is_running = False
         self._background_task = None
-        
+        self._flush_task = None
+    
     async def initialize(self):
         """Initialize the warming service"""
         if not self.cache:
             self.cache = await get_cache()
-            
+        
+        # Reads are counted in Redis so every replica warms from the same model
+        self.access_patterns = AccessPatternModel(
+            await get_redis_pool("default"),
+            prefix=self.cache.prefix
+        )
+        self.cache.access_tracker = self.access_patterns
+        
         # Register warming tasks
         self._register_warming_tasks()
         
@@ -133,7 +144,7 @@ class CacheWarmingService:
             batch_size=100
         ))
     
-    async def start_background_warming(self, interval_seconds: int = 300):
+    async def start_background_warming(self, interval_seconds: int = 300, flush_interval: int = 30):
         """Start background cache warming process"""
         if self.is_running:
             logger.warning("Cache warming already running")
@@ -143,17 +154,24 @@ class CacheWarmingService:
         self._background_task = asyncio.create_task(
             self._background_warming_loop(interval_seconds)
         )
+        self._flush_task = asyncio.create_task(
+            self._access_flush_loop(flush_interval)
+        )
         logger.info(f"Started background cache warming with {interval_seconds}s interval")
     
     async def stop_background_warming(self):
         """Stop background cache warming"""
         self.is_running = False
-        if self._background_task:
-            self._background_task.cancel()
-            try:
-                await self._background_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._background_task, self._flush_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        if self.access_patterns:
+            await self.access_patterns.flush()
         logger.info("Stopped background cache warming")
     
     async def _background_warming_loop(self, interval: int):
@@ -166,10 +184,19 @@ class CacheWarmingService:
                 logger.error(f"Error in cache warming loop: {e}")
                 await asyncio.sleep(60)  # Wait before retry
     
+    async def _access_flush_loop(self, interval: int):
+        """Publish this process's access counts so other replicas see them"""
+        while self.is_running:
+            await asyncio.sleep(interval)
+            await self.access_patterns.flush()
+    
     async def warm_all_caches(self):
         """Execute all cache warming tasks"""
         logger.info("Starting cache warming cycle")
         
+        if self.access_patterns:
+            await self.access_patterns.flush()
+        
         # Sort tasks by priority
         sorted_tasks = sorted(self.warming_tasks, key=lambda t: t.priority, reverse=True)
         
@@ -226,7 +253,8 @@ class CacheWarmingService:
             f"dashboard:{workspace_id}",
             analytics_data,
             ttl=300,
-            namespace=CacheNamespace.ANALYTICS
+            namespace=CacheNamespace.ANALYTICS,
+            tags=[workspace_tag(workspace_id)]
         )
         
         # Warm recent campaigns
@@ -238,7 +266,8 @@ class CacheWarmingService:
                 f"campaign_stats:{workspace_id}:{campaign.id}",
                 campaign.dict(),
                 ttl=600,
-                namespace=CacheNamespace.CAMPAIGN_STATS
+                namespace=CacheNamespace.CAMPAIGN_STATS,
+                tags=[workspace_tag(workspace_id)]
             )
         
         logger.info(f"Completed cache warming for workspace {workspace_id}")
@@ -257,16 +286,11 @@ class CacheWarmingService:
         if user and user.workspace_id:
             await self.warm_workspace_cache(user.workspace_id)
     
-    def track_access_pattern(self, key: str):
+    def track_access_pattern(self, key: str, namespace: CacheNamespace = CacheNamespace.API_RESPONSES):
         """Track access patterns for predictive warming"""
-        if key not in self.access_patterns:
-            self.access_patterns[key] = []
-        
-        self.access_patterns[key].append(datetime.utcnow())
-        
-        # Keep only last 100 accesses
-        if len(self.access_patterns[key]) > 100:
-            self.access_patterns[key] = self.access_patterns[key][-100:]
+        # Cache reads are tracked by CacheManager, this covers anything else
+        if self.access_patterns:
+            self.access_patterns.record(namespace.value, key)
     
     async def _fetch_popular_analytics(self, limit: int) -> List[Dict[str, Any]]:
         """Fetch most popular analytics data"""
@@ -309,13 +333,32 @@ class CacheWarmingService:
         if not self.db:
             return []
         
-        # Analyze access patterns
-        predicted_keys = self._predict_next_accesses()
+        # Leads the fleet is predicted to read next, keyed "{workspace_id}:{lead_id}"
+        predicted_keys = await self._predict_next_accesses(CacheNamespace.LEAD_ENRICHMENT, limit)
+        lead_ids = []
+        for key in predicted_keys:
+            # The namespace is shared, e.g. Pipedrive caches "person:{workspace_id}:{person_id}"
+            try:
+                lead_ids.append(str(uuid.UUID(key.rsplit(":", 1)[-1])))
+            except ValueError:
+                continue
         
-        # For now, just get recently created leads
-        query = select(Lead).order_by(Lead.created_at.desc()).limit(limit)
-        result = await self.db.execute(query)
-        leads = result.scalars().all()
+        leads = []
+        if lead_ids:
+            result = await self.db.execute(select(Lead).where(Lead.id.in_(lead_ids)))
+            by_id = {str(lead.id): lead for lead in result.scalars().all()}
+            leads = [by_id[lead_id] for lead_id in lead_ids if lead_id in by_id]
+        
+        # Fill the rest of the batch with recently created leads
+        if len(leads) < limit:
+            seen = {lead.id for lead in leads}
+            query = select(Lead).order_by(Lead.created_at.desc()).limit(limit)
+            result = await self.db.execute(query)
+            for lead in result.scalars().all():
+                if len(leads) >= limit:
+                    break
+                if lead.id not in seen:
+                    leads.append(lead)
         
         return [lead.dict() for lead in leads]
     
@@ -377,33 +420,13 @@ class CacheWarmingService:
         content = f"{item['prompt']}:{item['model']}:{item['temperature']}"
         return hashlib.sha256(content.encode()).hexdigest()[:16]
     
-    def _predict_next_accesses(self) -> Set[str]:
+    async def _predict_next_accesses(self, namespace: CacheNamespace, limit: int) -> List[str]:
         """Predict which keys will be accessed next based on patterns"""
-        predicted = set()
-        
-        now = datetime.utcnow()
-        
-        for key, accesses in self.access_patterns.items():
-            if len(accesses) < 3:
-                continue
-                
-            # Calculate average time between accesses
-            deltas = []
-            for i in range(1, len(accesses)):
-                delta = (accesses[i] - accesses[i-1]).total_seconds()
-                deltas.append(delta)
-            
-            avg_delta = sum(deltas) / len(deltas)
-            
-            # Predict next access time
-            last_access = accesses[-1]
-            predicted_next = last_access + timedelta(seconds=avg_delta)
-            
-            # If predicted time is within next 5 minutes, warm it
-            if predicted_next <= now + timedelta(minutes=5):
-                predicted.add(key)
+        if not self.access_patterns:
+            return []
         
-        return predicted
+        predicted = await self.access_patterns.predict(namespace.value, limit)
+        return [key for key, _ in predicted]
     
     async def get_warming_stats(self) -> Dict[str, Any]:
         """Get statistics about cache warming"""
@@ -411,10 +434,19 @@ class CacheWarmingService:
             "is_running": self.is_running,
             "total_tasks": len(self.warming_tasks),
             "tasks_by_strategy": {},
-            "access_patterns_tracked": len(self.access_patterns),
+            "access_patterns_tracked": 0,
+            "access_patterns_pending": 0,
             "timestamp": datetime.utcnow().isoformat()
         }
         
+        # Distinct keys read across the fleet recently, per warmed namespace
+        if self.access_patterns:
+            for task in self.warming_tasks:
+                stats["access_patterns_tracked"] += await self.access_patterns.working_set_size(
+                    task.namespace.value
+                )
+            stats["access_patterns_pending"] = self.access_patterns.pending
+        
         # Count tasks by strategy
         for task in self.warming_tasks:
             strategy = task.strategy.value
@@ -12,7 +12,7 @@ import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from utils.cache_manager import AIResponseCache, get_cache
+from utils.cache_manager import AIResponseCache, get_cache, workspace_tag
 from services.ai_providers import OpenAIProvider, AnthropicProvider, AIProvider
 from models.ai_generation import AIGeneration
 from models.token_usage import TokenUsage
@@ -416,7 +416,9 @@ class CachedAIService:
             Number of cache entries cleared
         """
         if workspace_id:
-            return await self._cache.cache.delete_by_tag(workspace_id)
+            return await self._cache.cache.delete_by_tag(
+                workspace_tag(workspace_id), namespace=self._cache.namespace
+            )
         elif model:
             return await self._cache.cache.delete_by_tag(model)
         else:
@@ -3,7 +3,9 @@ Email template service for ColdCopy
 """
 import logging
 import re
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, and_, or_, func
@@ -16,10 +18,94 @@ from models.email_template import (
 from models.user import User
 from models.workspace import Workspace
 from models.lead import Lead
-from utils.cache_manager import CacheManager, CacheNamespace
+from utils.cache_manager import CacheManager, CacheNamespace, workspace_tag
 
 logger = logging.getLogger(__name__)
 
+VARIABLE_PATTERN = re.compile(r'\{\{\s*([^}]+)\s*\}\}')
+
+
+class CompiledContent:
+    """Content pre-split into static chunks and {{variable}} slots"""
+    
+    __slots__ = ('chunks', 'names')
+    
+    def __init__(self, content: str):
+        self.chunks: List[str] = []
+        self.names: List[str] = []
+        
+        last_end = 0
+        for match in VARIABLE_PATTERN.finditer(content):
+            self.chunks.append(content[last_end:match.start()])
+            self.names.append(match.group(1).strip())
+            last_end = match.end()
+        self.chunks.append(content[last_end:])
+    
+    def render(self, variables: Dict[str, Any]) -> str:
+        """Fill the slots; unknown variables are left as {{variable}}"""
+        if not self.names:
+            return self.chunks[0]
+        
+        parts = [self.chunks[0]]
+        for name, chunk in zip(self.names, self.chunks[1:]):
+            parts.append(str(variables[name]) if name in variables else f"{{{{{name}}}}}")
+            parts.append(chunk)
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=1024)
+def compile_content(content: str) -> CompiledContent:
+    """Compile content once per distinct string"""
+    return CompiledContent(content)
+
+
+class CompiledTemplate:
+    """Subject, HTML and text of a template compiled for repeated rendering"""
+    
+    def __init__(self, subject: Optional[str], html_content: Optional[str], text_content: Optional[str]):
+        self.subject = compile_content(subject or '')
+        self.html_content = compile_content(html_content or '')
+        self.text_content = compile_content(text_content or '')
+    
+    @property
+    def variables(self) -> set:
+        """Names of all variables used in the template"""
+        return set(self.subject.names + self.html_content.names + self.text_content.names)
+    
+    def render(self, variables: Dict[str, Any]) -> Dict[str, str]:
+        """Render the template for one set of variables"""
+        return {
+            'subject': self.subject.render(variables),
+            'html_content': self.html_content.render(variables),
+            'text_content': self.text_content.render(variables)
+        }
+    
+    def render_many(self, variables_list: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Render the template for each set of variables"""
+        return [self.render(variables) for variables in variables_list]
+
+
+# Compiled templates keyed by (template id, version); a new version gets a new entry
+_compiled_templates: "OrderedDict[Tuple[str, int], CompiledTemplate]" = OrderedDict()
+COMPILED_TEMPLATE_CACHE_SIZE = 512
+
+
+def get_compiled_template(template: EmailTemplate) -> CompiledTemplate:
+    """Get the compiled form of a template, compiling it on first use"""
+    cache_key = (str(template.id), template.version or 1)
+    compiled = _compiled_templates.get(cache_key)
+    
+    if compiled is not None:
+        _compiled_templates.move_to_end(cache_key)
+        return compiled
+    
+    compiled = CompiledTemplate(template.subject, template.html_content, template.text_content)
+    _compiled_templates[cache_key] = compiled
+    if len(_compiled_templates) > COMPILED_TEMPLATE_CACHE_SIZE:
+        _compiled_templates.popitem(last=False)
+    
+    return compiled
+
 
 class EmailTemplateService:
     """Service for managing email templates"""
@@ -71,10 +157,7 @@ class EmailTemplateService:
         
         # Clear cache
         if self.cache:
-            await self.cache.delete_pattern(
-                f"templates:{workspace_id}:*",
-                namespace=CacheNamespace.EMAIL_TEMPLATES
-            )
+            await self.cache.delete_by_tag(f"workspace:{workspace_id}:templates")
         
         logger.info(f"Created template {template.id} for workspace {workspace_id}")
         return template
@@ -113,7 +196,11 @@ class EmailTemplateService:
                 cache_key,
                 template.__dict__,
                 ttl=1800,  # 30 minutes
-                namespace=CacheNamespace.EMAIL_TEMPLATES
+                namespace=CacheNamespace.EMAIL_TEMPLATES,
+                tags=[
+                    workspace_tag(template.workspace_id),
+                    f"workspace:{template.workspace_id}:templates"
+                ]
             )
         
         return template
@@ -244,31 +331,31 @@ class EmailTemplateService:
             raise ValueError(f"Template {template_id} not found")
         
         # Merge lead data with provided variables
-        all_variables = {}
-        
-        if lead:
-            all_variables.update({
-                'first_name': lead.first_name or '',
-                'last_name': lead.last_name or '',
-                'email': lead.email,
-                'company': lead.company or '',
-                'job_title': lead.job_title or '',
-                'phone': lead.phone or '',
-                'linkedin_url': getattr(lead.enrichment_data, 'linkedin_url', '') if lead.enrichment_data else ''
-            })
-        
+        all_variables = self._lead_variables(lead) if lead else {}
         all_variables.update(variables)
         
-        # Render subject and content
-        rendered_subject = self._substitute_variables(template.subject, all_variables)
-        rendered_html = self._substitute_variables(template.html_content or '', all_variables)
-        rendered_text = self._substitute_variables(template.text_content or '', all_variables)
+        return get_compiled_template(template).render(all_variables)
+    
+    async def render_template_many(
+        self,
+        template_id: str,
+        variables_list: List[Dict[str, Any]],
+        leads: Optional[List[Lead]] = None,
+        workspace_id: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Render template once per variables dict (merged with the matching lead, if given, one to one)"""
         
-        return {
-            'subject': rendered_subject,
-            'html_content': rendered_html,
-            'text_content': rendered_text
-        }
+        template = await self.get_template(template_id, workspace_id)
+        if not template:
+            raise ValueError(f"Template {template_id} not found")
+        
+        if leads:
+            variables_list = [
+                {**self._lead_variables(lead), **variables}
+                for lead, variables in zip(leads, variables_list, strict=True)
+            ]
+        
+        return get_compiled_template(template).render_many(variables_list)
     
     async def preview_template(
         self,
@@ -506,34 +593,31 @@ class EmailTemplateService:
     
     # Helper methods
     
+    def _lead_variables(self, lead: Lead) -> Dict[str, Any]:
+        """Template variables provided by a lead"""
+        
+        return {
+            'first_name': lead.first_name or '',
+            'last_name': lead.last_name or '',
+            'email': lead.email,
+            'company': lead.company or '',
+            'job_title': lead.job_title or '',
+            'phone': lead.phone or '',
+            'linkedin_url': getattr(lead.enrichment_data, 'linkedin_url', '') if lead.enrichment_data else ''
+        }
+    
     def _substitute_variables(self, content: str, variables: Dict[str, Any]) -> str:
         """Substitute variables in content using {{variable}} syntax"""
         
         if not content:
             return ''
         
-        def replace_var(match):
-            var_name = match.group(1).strip()
-            return str(variables.get(var_name, f"{{{{{var_name}}}}}"))
-        
-        # Replace {{variable}} patterns
-        return re.sub(r'\{\{\s*([^}]+)\s*\}\}', replace_var, content)
+        return compile_content(content).render(variables)
     
     async def _extract_template_variables(self, template: EmailTemplate):
         """Extract variables from template content and update template.variables"""
         
-        content_to_scan = [
-            template.subject or '',
-            template.html_content or '',
-            template.text_content or ''
-        ]
-        
-        variables = set()
-        
-        for content in content_to_scan:
-            # Find all {{variable}} patterns
-            matches = re.findall(r'\{\{\s*([^}]+)\s*\}\}', content)
-            variables.update(match.strip() for match in matches)
+        variables = get_compiled_template(template).variables
         
         # Update template variables
         existing_vars = template.variables or {}
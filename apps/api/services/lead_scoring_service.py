@@ -3,23 +3,46 @@ Lead scoring and segmentation service.
 """
 import json
 import statistics
+import uuid
 from typing import List, Dict, Optional, Any, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, and_, or_, func, case, text
+from sqlalchemy import select, insert, update, delete, and_, or_, func, case, text
 from sqlalchemy.orm import selectinload
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 
-from ..models.lead_scoring import (
+from models.lead_scoring import (
     LeadScore, LeadScoreHistory, ScoringRule, Segment, 
     SegmentMember, LeadActivity, ScoringModel, SegmentType,
     SegmentStatus, RuleOperator
 )
-from ..models.lead import Lead
-from ..models.campaign import CampaignEmail
-from ..models.email_events import EmailEvent
-from ..utils.cache_decorators import cache_result, cache_invalidate
+from models.lead import Lead
+from models.email_event import EmailEvent
+
+
+ENGAGEMENT_EVENT_TYPES = ('opened', 'clicked', 'replied')
+
+# Engagement counter advanced by each incremental event
+ENGAGEMENT_COUNTERS = {
+    'opened': 'opens',
+    'clicked': 'clicks',
+    'replied': 'replies'
+}
+
+EMPTY_ENGAGEMENT = {
+    'opens': 0,
+    'clicks': 0,
+    'replies': 0,
+    'open_points': 0,
+    'last_engagement': None
+}
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize event timestamps to naive UTC to compare with utcnow()."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 
 class LeadScoringService:
@@ -27,20 +50,32 @@ class LeadScoringService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._engagement_cache: Dict[str, Dict[str, Any]] = {}
         
     async def calculate_lead_score(
         self, 
         lead_id: str, 
         workspace_id: str,
-        trigger_event: Optional[str] = None
+        trigger_event: Optional[str] = None,
+        engagement: Optional[Dict[str, Any]] = None
     ) -> LeadScore:
-        """Calculate or recalculate a lead's score."""
+        """Calculate or recalculate a lead's score.
+        
+        Engagement aggregates are queried once per calculation unless they are
+        passed in, as the incremental event path does. Changes are flushed but
+        not committed, so the caller's transaction stays whole.
+        """
         
         # Get lead with all related data
         lead = await self._get_lead_with_data(lead_id)
         if not lead:
             raise ValueError(f"Lead {lead_id} not found")
             
+        if engagement is not None:
+            self._engagement_cache[str(lead.id)] = engagement
+        else:
+            self._engagement_cache.pop(str(lead.id), None)
+            
         # Get scoring rules for workspace
         scoring_rule = await self._get_scoring_rules(workspace_id)
         
@@ -82,7 +117,8 @@ class LeadScoringService:
                 'email_opens': await self._count_email_opens(lead),
                 'email_clicks': await self._count_email_clicks(lead),
                 'email_replies': await self._count_email_replies(lead),
-                'last_engagement': await self._get_last_engagement_date(lead)
+                'open_points': (await self._get_engagement(lead))['open_points'],
+                'last_engagement': self._isoformat(await self._get_last_engagement_date(lead))
             },
             'quality_factors': {
                 'profile_completeness': self._calculate_profile_completeness_percentage(lead),
@@ -112,13 +148,439 @@ class LeadScoringService:
             )
             self.db.add(history)
         
-        await self.db.commit()
+        await self.db.flush()
         
         # Check segment membership after score update
         await self._update_segment_memberships(lead_id, workspace_id)
         
         return lead_score
     
+    async def apply_engagement_event(
+        self,
+        lead_id: str,
+        workspace_id: str,
+        event_type: str,
+        occurred_at: Optional[datetime] = None
+    ) -> Optional[LeadScore]:
+        """Apply a single email event to a lead's stored score.
+        
+        The engagement counters kept in scoring_factors are advanced by the
+        event and the score is recalculated from them without scanning
+        EmailEvent. Bounces leave the counters alone and only re-score profile
+        quality. Repeated opens of one email are not known per event, so
+        their points are carried over from the breakdown until the next
+        reconciliation.
+        """
+        if event_type not in ENGAGEMENT_COUNTERS and event_type != 'bounced':
+            return None
+            
+        result = await self.db.execute(
+            select(LeadScore)
+            .where(LeadScore.lead_id == lead_id)
+            .with_for_update()
+        )
+        lead_score = result.scalar_one_or_none()
+        trigger_event = f"email_{event_type}"
+        
+        breakdown = (lead_score.scoring_factors or {}).get('engagement_breakdown') if lead_score else None
+        if not breakdown or 'open_points' not in breakdown:
+            # Nothing to apply a delta to yet, or a breakdown without open points
+            return await self.calculate_lead_score(lead_id, workspace_id, trigger_event)
+            
+        last_engagement = breakdown.get('last_engagement')
+        engagement = {
+            'opens': breakdown.get('email_opens', 0),
+            'clicks': breakdown.get('email_clicks', 0),
+            'replies': breakdown.get('email_replies', 0),
+            'open_points': breakdown['open_points'],
+            'last_engagement': datetime.fromisoformat(last_engagement) if last_engagement else None
+        }
+        
+        if event_type in ENGAGEMENT_COUNTERS:
+            engagement[ENGAGEMENT_COUNTERS[event_type]] += 1
+            occurred_at = _to_naive_utc(occurred_at) or datetime.utcnow()
+            if engagement['last_engagement'] is None or occurred_at > engagement['last_engagement']:
+                engagement['last_engagement'] = occurred_at
+                
+        return await self.calculate_lead_score(
+            lead_id,
+            workspace_id,
+            trigger_event,
+            engagement=engagement
+        )
+    
+    async def reconcile_scores(
+        self,
+        workspace_id: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> Dict[str, int]:
+        """Fully recalculate stored scores to correct incremental drift.
+        
+        Each chunk is committed as soon as it is scored. Webhook tasks lock
+        LeadScore rows to apply events, so holding the locks until every
+        workspace is done would stall them for the whole reconciliation. A
+        reconciled chunk is correct on its own, so a failure only leaves the
+        remaining chunks for the next run.
+        """
+        if workspace_id:
+            workspace_ids = [workspace_id]
+        else:
+            result = await self.db.execute(select(LeadScore.workspace_id).distinct())
+            workspace_ids = [str(row[0]) for row in result]
+            
+        processed = {
+            workspace: await self._rescore_chunks(
+                workspace,
+                trigger_event='reconciliation',
+                chunk_size=chunk_size,
+                commit_chunks=True
+            )
+            for workspace in workspace_ids
+        }
+        
+        return processed
+    
+    async def calculate_lead_scores_bulk(
+        self,
+        lead_ids: List[str],
+        workspace_id: str,
+        trigger_event: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> Dict[str, Any]:
+        """Calculate scores for many leads with set-based queries.
+        
+        Each chunk costs a fixed number of round trips regardless of its size:
+        leads, engagement aggregates, recent activity counts and existing scores
+        are fetched with one query each, the scores are computed with NumPy and
+        LeadScore/LeadScoreHistory rows are written in bulk. Changes are
+        flushed but not committed, so the caller's transaction stays whole.
+        """
+        scoring_rule = await self._get_scoring_rules(workspace_id)
+        
+        results = []
+        missing = []
+        lead_ids = [str(lead_id) for lead_id in lead_ids]
+        
+        for start in range(0, len(lead_ids), chunk_size):
+            chunk = lead_ids[start:start + chunk_size]
+            chunk_results = await self._score_chunk(
+                chunk, workspace_id, scoring_rule, trigger_event
+            )
+            
+            scored = {result['lead_id'] for result in chunk_results}
+            missing.extend(lead_id for lead_id in chunk if lead_id not in scored)
+            results.extend(chunk_results)
+            
+        return {'results': results, 'missing': missing}
+    
+    async def rescore_workspace(
+        self,
+        workspace_id: str,
+        trigger_event: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> int:
+        """Recalculate every lead score in a workspace, one chunk at a time.
+        
+        The chunks are committed together once the whole workspace is scored.
+        """
+        processed = await self._rescore_chunks(workspace_id, trigger_event, chunk_size)
+        await self.db.commit()
+        
+        return processed
+    
+    async def _rescore_chunks(
+        self,
+        workspace_id: str,
+        trigger_event: Optional[str],
+        chunk_size: int,
+        commit_chunks: bool = False
+    ) -> int:
+        """Score a workspace's leads chunk by chunk, committing each one if asked."""
+        scoring_rule = await self._get_scoring_rules(workspace_id)
+        
+        processed = 0
+        last_id = None
+        
+        while True:
+            query = select(Lead.id).where(Lead.workspace_id == workspace_id)
+            if last_id is not None:
+                query = query.where(Lead.id > last_id)
+            query = query.order_by(Lead.id).limit(chunk_size)
+            
+            result = await self.db.execute(query)
+            chunk = [row[0] for row in result]
+            if not chunk:
+                break
+                
+            await self._score_chunk(
+                [str(lead_id) for lead_id in chunk],
+                workspace_id,
+                scoring_rule,
+                trigger_event
+            )
+            if commit_chunks:
+                await self.db.commit()
+            processed += len(chunk)
+            last_id = chunk[-1]
+            
+        return processed
+    
+    async def _score_chunk(
+        self,
+        lead_ids: List[str],
+        workspace_id: str,
+        scoring_rule: ScoringRule,
+        trigger_event: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Score one chunk of leads and persist the results in bulk."""
+        result = await self.db.execute(
+            select(Lead).where(
+                and_(
+                    Lead.workspace_id == workspace_id,
+                    Lead.id.in_(lead_ids)
+                )
+            )
+        )
+        leads = result.scalars().all()
+        if not leads:
+            return []
+            
+        ids = [lead.id for lead in leads]
+        engagement = await self._fetch_engagement_aggregates(ids)
+        recent_activities = await self._count_recent_activities_bulk(ids, days=7)
+        
+        result = await self.db.execute(
+            select(LeadScore.id, LeadScore.lead_id, LeadScore.total_score)
+            .where(LeadScore.lead_id.in_(ids))
+        )
+        existing = {str(row.lead_id): (row.id, row.total_score) for row in result}
+        
+        now = datetime.utcnow()
+        features = self._build_score_features(
+            leads, engagement, recent_activities, scoring_rule, now
+        )
+        scores = self._compute_scores(features, scoring_rule)
+        
+        new_scores = []
+        updated_scores = []
+        history = []
+        results = []
+        timestamp = now.isoformat()
+        
+        for i, lead in enumerate(leads):
+            lead_id = str(lead.id)
+            aggregates = engagement.get(lead_id, EMPTY_ENGAGEMENT)
+            total_score = int(scores['total_score'][i])
+            
+            row = {
+                'engagement_score': int(scores['engagement_score'][i]),
+                'quality_score': int(scores['quality_score'][i]),
+                'intent_score': int(scores['intent_score'][i]),
+                'total_score': total_score,
+                'email_engagement_points': int(scores['email_engagement_points'][i]),
+                'profile_completeness_points': int(scores['profile_completeness_points'][i]),
+                'company_fit_points': int(features['company_fit'][i]),
+                'behavior_points': int(scores['behavior_points'][i]),
+                'recency_points': int(scores['recency_points'][i]),
+                'grade': scores['grade'][i],
+                'temperature': scores['temperature'][i],
+                'scoring_factors': {
+                    'engagement_breakdown': {
+                        'email_opens': aggregates['opens'],
+                        'email_clicks': aggregates['clicks'],
+                        'email_replies': aggregates['replies'],
+                        'open_points': aggregates['open_points'],
+                        'last_engagement': self._isoformat(aggregates['last_engagement'])
+                    },
+                    'quality_factors': {
+                        'profile_completeness': float(features['completeness'][i]),
+                        'email_validity': lead.email_status == 'valid',
+                        'enrichment_confidence': lead.enrichment_confidence or 0
+                    },
+                    'scoring_weights': {
+                        'email_open': scoring_rule.email_open_weight,
+                        'email_click': scoring_rule.email_click_weight,
+                        'email_reply': scoring_rule.email_reply_weight
+                    }
+                },
+                'last_calculated_at': now
+            }
+            
+            score_id, previous_score = existing.get(lead_id, (None, None))
+            previous_score = previous_score or 0
+            
+            if score_id is None:
+                score_id = uuid.uuid4()
+                row.update(id=score_id, lead_id=lead.id, workspace_id=workspace_id, score_changed_at=now)
+                new_scores.append(row)
+            else:
+                row['id'] = score_id
+                if previous_score != total_score:
+                    row['score_changed_at'] = now
+                updated_scores.append(row)
+                
+            if previous_score != total_score:
+                history.append({
+                    'id': uuid.uuid4(),
+                    'lead_score_id': score_id,
+                    'previous_total_score': previous_score,
+                    'new_total_score': total_score,
+                    'score_change': total_score - previous_score,
+                    'trigger_event': trigger_event,
+                    'trigger_details': {'timestamp': timestamp}
+                })
+                
+            results.append({
+                'lead_id': lead_id,
+                'total_score': total_score,
+                'grade': row['grade']
+            })
+            
+        if new_scores:
+            await self.db.execute(insert(LeadScore), new_scores)
+        if updated_scores:
+            await self.db.execute(update(LeadScore), updated_scores)
+        if history:
+            await self.db.execute(insert(LeadScoreHistory), history)
+            
+        await self.db.flush()
+        
+        await self._update_segment_memberships_bulk(ids, workspace_id)
+        
+        return results
+    
+    def _build_score_features(
+        self,
+        leads: List[Lead],
+        engagement: Dict[str, Dict[str, Any]],
+        recent_activities: Dict[str, int],
+        scoring_rule: ScoringRule,
+        now: datetime
+    ) -> Dict[str, np.ndarray]:
+        """Collect the per-lead inputs of the scoring model into arrays."""
+        size = len(leads)
+        features = {
+            name: np.zeros(size)
+            for name in (
+                'opens', 'clicks', 'replies', 'open_points', 'recent_activities',
+                'completeness', 'email_status_points', 'company_fit', 'enrichment_points'
+            )
+        }
+        features['days_since'] = np.full(size, np.nan)
+        
+        for i, lead in enumerate(leads):
+            lead_id = str(lead.id)
+            aggregates = engagement.get(lead_id, EMPTY_ENGAGEMENT)
+            
+            features['opens'][i] = aggregates['opens']
+            features['clicks'][i] = aggregates['clicks']
+            features['replies'][i] = aggregates['replies']
+            features['open_points'][i] = aggregates['open_points']
+            if aggregates['last_engagement']:
+                features['days_since'][i] = (now - aggregates['last_engagement']).days
+                
+            features['recent_activities'][i] = recent_activities.get(lead_id, 0)
+            features['completeness'][i] = self._calculate_profile_completeness_percentage(lead)
+            
+            if lead.email_status == 'valid':
+                features['email_status_points'][i] = 20
+            elif lead.email_status == 'catch_all':
+                features['email_status_points'][i] = 10
+                
+            features['company_fit'][i] = self._score_company_fit(lead, scoring_rule)
+            if lead.enrichment_confidence:
+                features['enrichment_points'][i] = int(lead.enrichment_confidence * 20)
+                
+        return features
+    
+    def _compute_scores(
+        self,
+        features: Dict[str, np.ndarray],
+        scoring_rule: ScoringRule
+    ) -> Dict[str, np.ndarray]:
+        """Vectorized equivalent of the per-lead score calculations."""
+        max_score = 100
+        opens = features['opens']
+        clicks = features['clicks']
+        replies = features['replies']
+        days_since = features['days_since']
+        engaged = ~np.isnan(days_since)
+        
+        # Engagement score
+        engagement = (
+            np.minimum(opens * scoring_rule.email_open_weight, max_score * 0.3) +
+            np.minimum(clicks * scoring_rule.email_click_weight, max_score * 0.3) +
+            np.minimum(replies * scoring_rule.email_reply_weight, max_score * 0.4)
+        )
+        if scoring_rule.enable_time_decay:
+            decay = np.power(0.5, np.where(engaged, days_since, 0) / scoring_rule.decay_half_life_days)
+            engagement = engagement * decay
+        engagement = np.minimum(np.trunc(engagement), max_score)
+        
+        # Quality score
+        quality = np.minimum(
+            np.trunc(features['completeness'] * 0.4) +
+            features['email_status_points'] +
+            np.minimum(features['company_fit'], 20) +
+            features['enrichment_points'],
+            100
+        )
+        
+        # Intent score
+        recent = features['recent_activities']
+        intent = np.minimum(
+            np.select([recent >= 3, recent >= 1], [40, 20], 0) +
+            np.select([opens >= 5, opens >= 3], [30, 15], 0) +
+            np.where(clicks > 0, 30, 0),
+            100
+        )
+        
+        total = np.trunc(engagement * 0.4 + quality * 0.3 + intent * 0.3)
+        
+        email_points = np.trunc(np.minimum(
+            opens * scoring_rule.email_open_weight +
+            clicks * scoring_rule.email_click_weight +
+            replies * scoring_rule.email_reply_weight,
+            100
+        ))
+        recency = np.where(
+            engaged,
+            np.select(
+                [days_since <= 1, days_since <= 7, days_since <= 14, days_since <= 30, days_since <= 60],
+                [100, 80, 60, 40, 20],
+                0
+            ),
+            0
+        )
+        
+        thresholds = scoring_rule.grade_thresholds
+        grades = np.select(
+            [total >= thresholds.get(grade, default) for grade, default in (
+                ('A+', 90), ('A', 80), ('B+', 70), ('B', 60), ('C', 50), ('D', 40)
+            )],
+            ['A+', 'A', 'B+', 'B', 'C', 'D'],
+            'F'
+        )
+        combined = (total + engagement) / 2
+        temperatures = np.select(
+            [combined >= 75, combined >= 50, combined >= 25],
+            ['hot', 'warm', 'cool'],
+            'cold'
+        )
+        
+        return {
+            'engagement_score': engagement.astype(int),
+            'quality_score': quality.astype(int),
+            'intent_score': intent.astype(int),
+            'total_score': total.astype(int),
+            'email_engagement_points': email_points.astype(int),
+            'profile_completeness_points': np.trunc(features['completeness']).astype(int),
+            'behavior_points': np.minimum(features['open_points'], 100).astype(int),
+            'recency_points': recency.astype(int),
+            'grade': grades.tolist(),
+            'temperature': temperatures.tolist()
+        }
+    
     async def _calculate_engagement_score(
         self, 
         lead: Lead, 
@@ -348,7 +810,6 @@ class LeadScoringService:
         await self.db.commit()
         return removed_count
     
-    @cache_result(ttl=300, namespace="segments")
     async def get_workspace_segments(
         self,
         workspace_id: str,
@@ -366,7 +827,6 @@ class LeadScoringService:
         result = await self.db.execute(query)
         return result.scalars().all()
     
-    @cache_result(ttl=300, namespace="lead_segments")
     async def get_lead_segments(
         self,
         lead_id: str
@@ -527,17 +987,69 @@ class LeadScoringService:
                 # Remove from segment (only if added by system)
                 await self.db.delete(member)
                 
-        await self.db.commit()
+        await self.db.flush()
+    
+    async def _update_segment_memberships_bulk(
+        self,
+        lead_ids: List[Any],
+        workspace_id: str
+    ):
+        """Update dynamic segment memberships for many leads at once."""
+        segments = await self.get_workspace_segments(
+            workspace_id,
+            status=SegmentStatus.ACTIVE
+        )
+        
+        for segment in segments:
+            if segment.type != SegmentType.DYNAMIC:
+                continue
+                
+            query = await self._build_segment_query(segment)
+            result = await self.db.execute(
+                query.with_only_columns(Lead.id).where(Lead.id.in_(lead_ids))
+            )
+            qualifying = {str(lead_id) for lead_id in result.scalars()}
+            
+            result = await self.db.execute(
+                select(SegmentMember.lead_id, SegmentMember.added_by).where(
+                    and_(
+                        SegmentMember.segment_id == segment.id,
+                        SegmentMember.lead_id.in_(lead_ids)
+                    )
+                )
+            )
+            current = {str(lead_id): added_by for lead_id, added_by in result}
+            
+            to_add = [
+                {'segment_id': segment.id, 'lead_id': lead_id, 'added_by': 'system'}
+                for lead_id in lead_ids
+                if str(lead_id) in qualifying and str(lead_id) not in current
+            ]
+            to_remove = [
+                lead_id for lead_id, added_by in current.items()
+                if lead_id not in qualifying and added_by == 'system'
+            ]
+            
+            if to_add:
+                await self.db.execute(insert(SegmentMember), to_add)
+            if to_remove:
+                await self.db.execute(
+                    delete(SegmentMember).where(
+                        and_(
+                            SegmentMember.segment_id == segment.id,
+                            SegmentMember.lead_id.in_(to_remove)
+                        )
+                    )
+                )
+                
+        await self.db.flush()
     
     # Helper methods for score calculation
     async def _get_lead_with_data(self, lead_id: str) -> Optional[Lead]:
         """Get lead with all related data."""
         result = await self.db.execute(
             select(Lead)
-            .options(
-                selectinload(Lead.campaign_emails),
-                selectinload(Lead.enrichment_data)
-            )
+            .options(selectinload(Lead.campaign_emails))
             .where(Lead.id == lead_id)
         )
         return result.scalar_one_or_none()
@@ -562,7 +1074,7 @@ class LeadScoringService:
                 model_type=ScoringModel.ENGAGEMENT
             )
             self.db.add(rule)
-            await self.db.commit()
+            await self.db.flush()
             
         return rule
     
@@ -583,64 +1095,114 @@ class LeadScoringService:
                 workspace_id=workspace_id
             )
             self.db.add(score)
+            # History rows reference the score's id
+            await self.db.flush()
             
         return score
     
-    async def _count_email_opens(self, lead: Lead) -> int:
-        """Count email opens for a lead."""
-        result = await self.db.execute(
-            select(func.count(EmailEvent.id))
-            .join(CampaignEmail)
+    async def _fetch_engagement_aggregates(
+        self,
+        lead_ids: List[Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get engagement aggregates for many leads in one grouped query.
+        
+        The inner query counts events per (lead, email) so that repeated opens
+        of the same email can be scored, the outer one rolls them up per lead.
+        """
+        per_email = (
+            select(
+                EmailEvent.lead_id.label('lead_id'),
+                func.count(EmailEvent.id).filter(EmailEvent.event_type == 'opened').label('opens'),
+                func.count(EmailEvent.id).filter(EmailEvent.event_type == 'clicked').label('clicks'),
+                func.count(EmailEvent.id).filter(EmailEvent.event_type == 'replied').label('replies'),
+                func.max(EmailEvent.created_at).label('last_engagement')
+            )
             .where(
                 and_(
-                    CampaignEmail.lead_id == lead.id,
-                    EmailEvent.event_type == 'opened'
+                    EmailEvent.lead_id.in_(lead_ids),
+                    EmailEvent.event_type.in_(ENGAGEMENT_EVENT_TYPES)
                 )
             )
+            .group_by(EmailEvent.lead_id, EmailEvent.campaign_email_id)
+            .subquery()
         )
-        return result.scalar() or 0
-    
-    async def _count_email_clicks(self, lead: Lead) -> int:
-        """Count email clicks for a lead."""
+        
         result = await self.db.execute(
-            select(func.count(EmailEvent.id))
-            .join(CampaignEmail)
-            .where(
-                and_(
-                    CampaignEmail.lead_id == lead.id,
-                    EmailEvent.event_type == 'clicked'
-                )
+            select(
+                per_email.c.lead_id,
+                func.sum(per_email.c.opens),
+                func.sum(per_email.c.clicks),
+                func.sum(per_email.c.replies),
+                func.sum(
+                    case(
+                        (per_email.c.opens >= 3, 10),
+                        (per_email.c.opens >= 2, 5),
+                        else_=0
+                    )
+                ),
+                func.max(per_email.c.last_engagement)
             )
+            .group_by(per_email.c.lead_id)
         )
-        return result.scalar() or 0
+        
+        return {
+            str(lead_id): {
+                'opens': int(opens or 0),
+                'clicks': int(clicks or 0),
+                'replies': int(replies or 0),
+                'open_points': int(open_points or 0),
+                'last_engagement': _to_naive_utc(last_engagement)
+            }
+            for lead_id, opens, clicks, replies, open_points, last_engagement in result
+        }
+    
+    async def _get_engagement(self, lead: Lead) -> Dict[str, Any]:
+        """Get engagement aggregates for a lead, querying at most once."""
+        key = str(lead.id)
+        if key not in self._engagement_cache:
+            aggregates = await self._fetch_engagement_aggregates([lead.id])
+            self._engagement_cache[key] = aggregates.get(key, EMPTY_ENGAGEMENT)
+        return self._engagement_cache[key]
+    
+    async def _count_email_opens(self, lead: Lead) -> int:
+        """Count email opens for a lead."""
+        return (await self._get_engagement(lead))['opens']
+    
+    async def _count_email_clicks(self, lead: Lead) -> int:
+        """Count email clicks for a lead."""
+        return (await self._get_engagement(lead))['clicks']
     
     async def _count_email_replies(self, lead: Lead) -> int:
         """Count email replies for a lead."""
-        result = await self.db.execute(
-            select(func.count(EmailEvent.id))
-            .join(CampaignEmail)
-            .where(
-                and_(
-                    CampaignEmail.lead_id == lead.id,
-                    EmailEvent.event_type == 'replied'
-                )
-            )
-        )
-        return result.scalar() or 0
+        return (await self._get_engagement(lead))['replies']
     
     async def _get_last_engagement_date(self, lead: Lead) -> Optional[datetime]:
         """Get date of last engagement."""
+        return (await self._get_engagement(lead))['last_engagement']
+    
+    async def _count_recent_activities_bulk(
+        self,
+        lead_ids: List[Any],
+        days: int = 7
+    ) -> Dict[str, int]:
+        """Count recent activities for many leads in one grouped query."""
+        since = datetime.utcnow() - timedelta(days=days)
         result = await self.db.execute(
-            select(func.max(EmailEvent.created_at))
-            .join(CampaignEmail)
+            select(LeadActivity.lead_id, func.count(LeadActivity.id))
             .where(
                 and_(
-                    CampaignEmail.lead_id == lead.id,
-                    EmailEvent.event_type.in_(['opened', 'clicked', 'replied'])
+                    LeadActivity.lead_id.in_(lead_ids),
+                    LeadActivity.occurred_at >= since
                 )
             )
+            .group_by(LeadActivity.lead_id)
         )
-        return result.scalar()
+        return {str(lead_id): count for lead_id, count in result}
+    
+    @staticmethod
+    def _isoformat(value: Optional[datetime]) -> Optional[str]:
+        """Serialize an optional datetime for JSON columns."""
+        return value.isoformat() if value else None
     
     async def _get_recent_activities(
         self, 
@@ -705,6 +1267,10 @@ class LeadScoringService:
         scoring_rule: ScoringRule
     ) -> int:
         """Calculate company fit points based on rules."""
+        return self._score_company_fit(lead, scoring_rule)
+    
+    def _score_company_fit(self, lead: Lead, scoring_rule: ScoringRule) -> int:
+        """Score how well a lead's company matches the workspace fit rules."""
         if not scoring_rule.company_fit_rules:
             return 50  # Default middle score
             
@@ -740,12 +1306,7 @@ class LeadScoringService:
         points = 0
         
         # Multiple opens of same email (shows interest)
-        email_open_counts = await self._get_email_open_counts(lead.id)
-        for count in email_open_counts.values():
-            if count >= 3:
-                points += 10
-            elif count >= 2:
-                points += 5
+        points += (await self._get_engagement(lead))['open_points']
                 
         # Quick response time
         response_times = await self._get_response_times(lead.id)
@@ -783,25 +1344,6 @@ class LeadScoringService:
         else:
             return 0
     
-    async def _get_email_open_counts(self, lead_id: str) -> Dict[str, int]:
-        """Get count of opens per email."""
-        result = await self.db.execute(
-            select(
-                CampaignEmail.id,
-                func.count(EmailEvent.id).label('open_count')
-            )
-            .join(EmailEvent)
-            .where(
-                and_(
-                    CampaignEmail.lead_id == lead_id,
-                    EmailEvent.event_type == 'opened'
-                )
-            )
-            .group_by(CampaignEmail.id)
-        )
-        
-        return {str(row[0]): row[1] for row in result}
-    
     async def _get_response_times(self, lead_id: str) -> List[float]:
         """Get response times in seconds."""
         # This would calculate time between email sent and reply
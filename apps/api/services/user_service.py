@@ -8,7 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User, UserCreate, UserUpdate
-from core.security import get_password_hash
+from core.security import get_password_hash, invalidate_user_principals
 
 
 class UserService:
@@ -81,6 +81,9 @@ class UserService:
         await self.db.commit()
         await self.db.refresh(db_user)
         
+        # Role or status may have changed, re-resolve on the next request
+        await invalidate_user_principals(user_id)
+        
         return db_user
     
     async def delete_user(self, user_id: UUID) -> bool:
@@ -95,5 +98,6 @@ class UserService:
         
         await self.db.delete(db_user)
         await self.db.commit()
+        await invalidate_user_principals(user_id)
         
         return True
\ No newline at end of file
@@ -5,8 +5,9 @@ import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
-from config.redis import get_redis_config, get_redis_connection, close_redis_connection
-from utils.cache_manager import CacheManager, get_cache, close_cache
+from config.redis import get_redis_config
+from utils.cache_manager import CacheManager, get_cache
+from utils.redis_manager import initialize_redis, shutdown_redis
 from middleware.cache_middleware import CacheMiddleware
 from routers import cache_management
 
@@ -28,19 +29,11 @@ async def initialize_cache_system(app: FastAPI):
         redis_config = get_redis_config()
         logger.info(f"Initializing cache system with prefix: {redis_config.cache_prefix}")
         
-        # Initialize Redis connection
-        redis_conn = await get_redis_connection()
+        # Open the shared Redis pools and the global cache on them
+        await initialize_redis()
+        cache_manager = await get_cache()
         logger.info("Redis connection established")
         
-        # Initialize cache manager
-        cache_manager = CacheManager(
-            redis_url=redis_config.url,
-            prefix=redis_config.cache_prefix,
-            default_ttl=redis_config.default_ttl,
-            max_connections=redis_config.max_connections
-        )
-        await cache_manager.initialize()
-        
         # Store cache manager for global access
         app.state.cache_manager = cache_manager
         
@@ -101,15 +94,9 @@ async def shutdown_cache_system(app: FastAPI):
             # Log final stats
             stats = await cache_manager.get_stats()
             logger.info(f"Final cache statistics: {stats}")
-            
-            # Close cache manager
-            await cache_manager.close()
-        
-        # Close global cache instance
-        await close_cache()
         
-        # Close Redis connection
-        await close_redis_connection()
+        # Close the global cache, then the shared Redis pools
+        await shutdown_redis()
         
         logger.info("Cache system shutdown complete")
         
@@ -4,8 +4,11 @@ Comprehensive tests for the Redis caching system.
 import pytest
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, patch, MagicMock
+from uuid import UUID
+from fastapi import HTTPException
 import redis.asyncio as redis
 
 from utils.cache_manager import (
@@ -13,15 +16,21 @@ from utils.cache_manager import (
     CacheNamespace,
     CacheConfig,
     CacheStats,
+    LocalCacheConfig,
     LeadEnrichmentCache,
     AIResponseCache,
     AnalyticsCache,
     get_cache,
-    close_cache
+    close_cache,
+    workspace_tag
 )
+from utils.cache_access_patterns import AccessPatternModel
+from utils.cache_codecs import CODECS, COMPRESSION_NONE, COMPRESSION_ZLIB, SerializationConfig
+from core.security import Principal
 from middleware.cache_middleware import CacheMiddleware, cache_endpoint, invalidate_cache
 from services.cached_ai_service import CachedAIService, AIModel, AIResponse
 from services.cached_enrichment_service import CachedEnrichmentService, EnrichmentSource, EnrichmentResult
+from services.cache_warming_service import CacheWarmingService
 
 
 class TestCacheManager:
@@ -95,6 +104,121 @@ class TestCacheManager:
         assert len(value["items"]) == 1000
         assert value["metadata"]["size"] == "large"
     
+    async def test_value_envelope(self, cache_manager):
+        """Test that values carry their own metadata."""
+        await cache_manager.set("envelope_key", {"data": 1}, compress=True)
+        
+        full_key = cache_manager._make_key("envelope_key", CacheNamespace.API_RESPONSES)
+        raw = await cache_manager._redis.get(full_key)
+        
+        assert cache_manager._is_envelope(raw)
+        assert await cache_manager._redis.exists(f"{full_key}:meta") == 0
+        assert await cache_manager.get("envelope_key") == {"data": 1}
+        
+        # Raw bytes are stored without a JSON round trip
+        await cache_manager.set("bytes_key", b'{"raw": true}', compress=True)
+        assert await cache_manager.get("bytes_key") == b'{"raw": true}'
+    
+    async def test_codecs(self, cache_manager):
+        """Test per-namespace codecs recorded in the envelope."""
+        value = {"text": "x" * 2000, "count": 3, "nested": [1, 2, {"a": None}]}
+        
+        for namespace in CacheNamespace:
+            data = cache_manager._serialize(value, namespace=namespace)
+            expected = cache_manager._serialization[namespace].codec
+            
+            assert CODECS[data[0] & 0x07] is expected
+            assert cache_manager._deserialize(data) == value
+        
+        # Size threshold compresses without being asked
+        manager = CacheManager(
+            serialization={
+                CacheNamespace.ANALYTICS: SerializationConfig("json", "zlib", compress_threshold=100)
+            }
+        )
+        large = manager._serialize(value, namespace=CacheNamespace.ANALYTICS)
+        small = manager._serialize({"a": 1}, namespace=CacheNamespace.ANALYTICS)
+        
+        assert (large[0] >> 3) & 0x07 == COMPRESSION_ZLIB
+        assert (small[0] >> 3) & 0x07 == COMPRESSION_NONE
+        assert len(large) < 200
+        
+        # Missing libraries fall back to the standard library
+        resolved = SerializationConfig("missing", "missing", compress_threshold=10).resolve()
+        assert resolved.codec.name == "json"
+        assert resolved.compressor.name == "zlib"
+        assert resolved.compress_threshold is None
+        
+        # Values written with an unknown codec are misses
+        full_key = cache_manager._make_key("unknown_codec", CacheNamespace.API_RESPONSES)
+        await cache_manager._redis.setex(full_key, 60, bytes((0x87,)) + b"data")
+        assert await cache_manager.get("unknown_codec") is None
+    
+    async def test_legacy_meta_entries(self, cache_manager):
+        """Test that entries with a :meta hash are read and upgraded."""
+        import zlib
+        
+        full_key = cache_manager._make_key("legacy_key", CacheNamespace.API_RESPONSES)
+        await cache_manager._redis.setex(full_key, 60, zlib.compress(b'{"data": "old"}'))
+        await cache_manager._redis.hset(f"{full_key}:meta", mapping={"compress": "true"})
+        
+        value = await cache_manager.get("legacy_key")
+        assert value == {"data": "old"}
+        
+        # Rewritten in place with its TTL, metadata dropped
+        raw = await cache_manager._redis.get(full_key)
+        assert cache_manager._is_envelope(raw)
+        assert await cache_manager._redis.ttl(full_key) > 0
+        assert await cache_manager._redis.exists(f"{full_key}:meta") == 0
+        assert await cache_manager.get("legacy_key") == {"data": "old"}
+    
+    async def test_local_tier(self):
+        """Test the in-process tier and its cross-process invalidation."""
+        local_cache = {CacheNamespace.FEATURE_FLAGS: LocalCacheConfig(max_entries=10, ttl=30)}
+        writer = CacheManager(redis_url="redis://localhost:6379/15", prefix="test", local_cache=local_cache)
+        reader = CacheManager(redis_url="redis://localhost:6379/15", prefix="test", local_cache=local_cache)
+        await writer.initialize()
+        await reader.initialize()
+        await asyncio.sleep(0.1)  # Let both listeners subscribe
+        
+        try:
+            await writer.set("flags", {"beta": True}, namespace=CacheNamespace.FEATURE_FLAGS)
+            assert await reader.get("flags", namespace=CacheNamespace.FEATURE_FLAGS) == {"beta": True}
+            
+            # Served from memory on the next read
+            assert await reader.get("flags", namespace=CacheNamespace.FEATURE_FLAGS) == {"beta": True}
+            assert reader._get_stats(CacheNamespace.FEATURE_FLAGS).local_hits == 1
+            
+            # A write elsewhere evicts the local copy
+            await writer.set("flags", {"beta": False}, namespace=CacheNamespace.FEATURE_FLAGS)
+            await asyncio.sleep(0.1)
+            assert await reader.get("flags", namespace=CacheNamespace.FEATURE_FLAGS) == {"beta": False}
+            
+            await writer.delete("flags", namespace=CacheNamespace.FEATURE_FLAGS)
+            await asyncio.sleep(0.1)
+            assert await reader.get("flags", namespace=CacheNamespace.FEATURE_FLAGS) is None
+        finally:
+            await writer.clear_namespace(CacheNamespace.FEATURE_FLAGS)
+            await writer.close()
+            await reader.close()
+    
+    async def test_shared_client(self):
+        """Test that a client borrowed from a shared pool outlives the cache."""
+        client = redis.Redis.from_url("redis://localhost:6379/15")
+        cache = CacheManager(prefix="test", redis_client=client)
+        await cache.initialize()
+        
+        try:
+            await cache.set("shared_key", {"data": 1})
+            assert await cache.get("shared_key") == {"data": 1}
+            await cache.delete("shared_key")
+            await cache.close()
+            
+            # The pool belongs to its owner, so the client still works
+            assert await client.ping() is True
+        finally:
+            await client.close()
+    
     async def test_namespaces(self, cache_manager):
         """Test namespace isolation."""
         # Set values in different namespaces
@@ -151,6 +275,51 @@ class TestCacheManager:
         assert await cache_manager.get("item2") is None
         assert await cache_manager.get("item3") is not None
     
+    async def test_tag_index(self, cache_manager):
+        """Test that invalidation reads the tag index in bounded chunks."""
+        cache_manager.invalidation_batch_size = 2
+        
+        for i in range(5):
+            await cache_manager.set(f"indexed:{i}", {"id": i}, tags=["workspace:abc"])
+        await cache_manager.set("other", {"id": "other"}, tags=["workspace:xyz"])
+        
+        # Members are scored by expiry and the index outlives them
+        tag_key = cache_manager._tag_key("workspace:abc")
+        assert await cache_manager._redis.zcard(tag_key) == 5
+        assert await cache_manager._redis.ttl(tag_key) > 0
+        
+        # Invalidation never scans the keyspace
+        with patch.object(cache_manager._redis, "scan", side_effect=AssertionError("scan")):
+            assert await cache_manager.delete_by_tag("workspace:abc") == 5
+        
+        assert await cache_manager._redis.exists(tag_key) == 0
+        assert await cache_manager.get("indexed:0") is None
+        assert await cache_manager.get("other") == {"id": "other"}
+        
+        # Indexes written as plain sets are converted on the next write
+        legacy_key = cache_manager._tag_key("legacy")
+        old_key = cache_manager._make_key("old", CacheNamespace.API_RESPONSES)
+        await cache_manager._redis.setex(old_key, 60, cache_manager._serialize("old"))
+        await cache_manager._redis.sadd(legacy_key, old_key)
+        await cache_manager.set("new", "new", tags=["legacy"])
+        
+        assert await cache_manager._redis.type(legacy_key) == b"zset"
+        assert await cache_manager.delete_by_tag("legacy") == 2
+    
+    async def test_workspace_tag_by_namespace(self, cache_manager):
+        """Test that a workspace's tag can be invalidated one namespace at a time."""
+        tag = workspace_tag("abc")
+        await cache_manager.set("response", {"id": 1}, namespace=CacheNamespace.API_RESPONSES, tags=[tag])
+        await cache_manager.set("dashboard", {"id": 2}, namespace=CacheNamespace.ANALYTICS, tags=[tag])
+        
+        assert await cache_manager.delete_by_tag(tag, namespace=CacheNamespace.ANALYTICS) == 1
+        assert await cache_manager.get("dashboard", namespace=CacheNamespace.ANALYTICS) is None
+        assert await cache_manager.get("response", namespace=CacheNamespace.API_RESPONSES) == {"id": 1}
+        
+        # The rest stays indexed under the tag
+        assert await cache_manager.delete_by_tag(tag) == 1
+        assert await cache_manager.get("response", namespace=CacheNamespace.API_RESPONSES) is None
+    
     async def test_pattern_deletion(self, cache_manager):
         """Test pattern-based deletion."""
         # Set multiple values
@@ -195,6 +364,61 @@ class TestCacheManager:
         assert value is not None
         assert refresh_count == 1  # Should not refresh
     
+    async def test_single_flight(self, cache_manager):
+        """Test that concurrent misses compute the value once."""
+        compute_count = 0
+        
+        async def compute():
+            nonlocal compute_count
+            compute_count += 1
+            await asyncio.sleep(0.05)
+            return {"computed": compute_count}
+        
+        results = await asyncio.gather(*[
+            cache_manager.get_or_compute("flight_test", compute, ttl=60)
+            for _ in range(20)
+        ])
+        
+        assert compute_count == 1
+        assert all(r == {"computed": 1} for r in results)
+        
+        # Another process holding the lock is waited for, not raced
+        other = CacheManager(redis_url=cache_manager.redis_url, prefix=cache_manager.prefix)
+        other._redis = cache_manager._redis
+        await cache_manager.delete("flight_test")
+        
+        results = await asyncio.gather(
+            cache_manager.get_or_compute("flight_test", compute, ttl=60),
+            other.get_or_compute("flight_test", compute, ttl=60)
+        )
+        
+        assert compute_count == 2
+        assert results[0] == results[1]
+    
+    async def test_early_refresh(self, cache_manager):
+        """Test XFetch early refresh decisions."""
+        # Plenty of time left relative to compute time
+        assert not CacheManager._should_refresh_early(3600.0, 0.01, 1.0)
+        # About to expire after an expensive computation
+        assert CacheManager._should_refresh_early(0.0001, 5.0, 1.0)
+        # No recorded compute time or disabled
+        assert not CacheManager._should_refresh_early(0.0001, 0, 1.0)
+        assert not CacheManager._should_refresh_early(0.0001, 5.0, 0)
+        
+        # Compute time is recorded with the value
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "value"
+        
+        await cache_manager.get_or_compute("xfetch_test", compute, ttl=60)
+        data, _ = await cache_manager._read_entry(
+            cache_manager._make_key("xfetch_test", CacheNamespace.API_RESPONSES)
+        )
+        value, compute_time = cache_manager._unpack(data)
+        
+        assert value == "value"
+        assert compute_time >= 0.02
+    
     async def test_cache_stats(self, cache_manager):
         """Test cache statistics tracking."""
         # Perform some operations
@@ -209,6 +433,28 @@ class TestCacheManager:
         assert stats["hits"] >= 2
         assert stats["misses"] >= 1
         assert stats["hit_rate"] > 0
+        assert stats["get_latency_ms"]["count"] == 3
+        assert stats["value_size_bytes"]["count"] >= 1
+    
+    async def test_latency_histograms(self, cache_manager):
+        """Test histogram percentiles and the Prometheus export."""
+        stats = CacheStats()
+        for sample in range(1, 101):
+            stats.get_latency_ms.observe(sample / 10)
+        
+        # True mean rather than a decaying average
+        assert stats.avg_get_time_ms == pytest.approx(5.05)
+        assert stats.get_latency_ms.percentile(0.50) == pytest.approx(5.0, abs=0.5)
+        assert stats.get_latency_ms.percentile(0.99) <= 10.0
+        assert stats.get_latency_ms.percentile(1.0) == 10.0
+        
+        await cache_manager.set("metrics_key", {"data": 1}, namespace=CacheNamespace.ANALYTICS)
+        await cache_manager.get("metrics_key", namespace=CacheNamespace.ANALYTICS)
+        
+        lines = cache_manager.prometheus_metrics()
+        assert 'coldcopy_cache_hits_total{namespace="analytics"} 1' in lines
+        assert 'coldcopy_cache_get_duration_seconds_count{namespace="analytics"} 1' in lines
+        assert 'coldcopy_cache_value_size_bytes_bucket{namespace="analytics",le="+Inf"} 1' in lines
     
     async def test_decorator(self, cache_manager):
         """Test cache decorator."""
@@ -372,72 +618,290 @@ class TestSpecializedCaches:
         assert cached_dashboard["total_campaigns"] == 10
 
 
+class TestAccessPatterns:
+    """Test the fleet-wide access model behind predictive warming."""
+    
+    @pytest.fixture
+    async def model(self):
+        """Create a model on the test database."""
+        client = redis.Redis.from_url("redis://localhost:6379/15", decode_responses=True)
+        model = AccessPatternModel(client, prefix="test", max_keys_per_bucket=3, max_pending=5)
+        yield model
+        keys = [key async for key in client.scan_iter("test:warming:*")]
+        if keys:
+            await client.delete(*keys)
+        await client.close()
+    
+    async def test_flush_and_predict(self, model):
+        """Test that predictions rank recent and seasonal reads."""
+        now = time.time()
+        for _ in range(5):
+            model.record("lead_enrichment", "w1:hot", now)
+        model.record("lead_enrichment", "w1:warm", now - 600)
+        model.record("lead_enrichment", "w1:stale", now - 7200)
+        model.record("lead_enrichment", "w1:daily", now - 86400 + 300)
+        
+        assert model.pending == 4
+        assert await model.flush() == 4
+        assert model.pending == 0
+        
+        predicted = [key for key, _ in await model.predict("lead_enrichment", 10, now=now)]
+        assert predicted[0] == "w1:hot"
+        assert set(predicted) == {"w1:hot", "w1:warm", "w1:daily"}
+        
+        assert await model.working_set_size("lead_enrichment", now=now) == 2
+    
+    async def test_bounded_memory(self, model):
+        """Test that buckets keep their hottest keys and pending reads are capped."""
+        now = time.time()
+        for index in range(6):
+            for _ in range(index + 1):
+                model.record("analytics", f"key{index}", now)
+        
+        # The sixth distinct key does not fit in max_pending
+        assert model.pending == 5
+        assert model.dropped == 6
+        await model.flush()
+        
+        bucket_key = model._hits_key("analytics", model._bucket(now))
+        assert await model.redis.zcard(bucket_key) == 3
+        assert await model.redis.ttl(bucket_key) > 0
+        assert [key for key, _ in await model.predict("analytics", 2, now=now)] == ["key4", "key3"]
+    
+    async def test_predicted_leads_skip_foreign_keys(self):
+        """Test that keys other writers put in the namespace are not read as lead ids."""
+        lead_id = "0b7c4d4e-8f0a-4c1e-9d0c-5b3a2f1e6d7c"
+        lead = MagicMock(id=lead_id)
+        lead.dict.return_value = {"id": lead_id}
+        
+        db = AsyncMock()
+        db.execute.return_value = MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[lead]))))
+        service = CacheWarmingService(db_session=db)
+        service.access_patterns = MagicMock()
+        service.access_patterns.predict = AsyncMock(return_value=[
+            ("person:w1:42", 9.0),
+            (f"w1:{lead_id}", 5.0),
+            ("w1:not-a-lead", 1.0)
+        ])
+        
+        leads = await service._fetch_predictive_leads(1)
+        
+        assert leads == [{"id": lead_id}]
+        statement = db.execute.await_args_list[0].args[0]
+        assert statement.whereclause.right.value == [lead_id]
+
+
 class TestCacheMiddleware:
     """Test cache middleware for FastAPI."""
     
     @pytest.fixture
-    def mock_request(self):
-        """Create mock request."""
-        request = MagicMock()
-        request.method = "GET"
-        request.url.path = "/api/campaigns"
-        request.query_params = {"page": "1", "limit": "10"}
-        request.headers = {"accept": "application/json"}
-        request.state = MagicMock(workspace_id="workspace_123")
-        return request
+    def scope(self):
+        """Create ASGI scope for a GET request."""
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/campaigns",
+            "query_string": b"page=1&limit=10",
+            "headers": [(b"accept", b"application/json")],
+            "state": {}
+        }
+    
+    @pytest.fixture(autouse=True)
+    def principal(self):
+        """Authenticate every request as a member of workspace_123."""
+        principal = Principal(
+            id=UUID("00000000-0000-0000-0000-000000000001"),
+            email="user@example.com",
+            role="member",
+            is_active=True,
+            workspace_id="workspace_123"
+        )
+        with patch(
+            "middleware.cache_middleware.get_current_user_from_request",
+            AsyncMock(return_value=principal)
+        ) as resolve:
+            resolve.principal = principal
+            yield resolve
     
     @pytest.fixture
     def mock_cache_manager(self):
-        """Create mock cache manager."""
+        """Create mock cache manager backed by a dict."""
+        store = {}
+        
+        async def get(key, namespace=None, **kwargs):
+            return store.get(key)
+        
+        async def set(key, value, namespace=None, **kwargs):
+            store[key] = value
+            return True
+        
         cache = AsyncMock()
-        cache.get = AsyncMock(return_value=None)
-        cache.set = AsyncMock(return_value=True)
+        cache.store = store
+        cache.get = AsyncMock(side_effect=get)
+        cache.set = AsyncMock(side_effect=set)
         return cache
     
-    async def test_cache_middleware_miss(self, mock_request, mock_cache_manager):
+    def _make_app(self, content_type=b"application/json"):
+        """Create an ASGI app that streams a response in two chunks."""
+        calls = []
+        
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type)]
+            })
+            await send({"type": "http.response.body", "body": b'{"data": ', "more_body": True})
+            await send({"type": "http.response.body", "body": b'"fresh"}'})
+        
+        return app, calls
+    
+    async def _call(self, middleware, scope):
+        """Run a request through the middleware and collect sent messages."""
+        messages = []
+        
+        async def receive():
+            return {"type": "http.request", "body": b""}
+        
+        async def send(message):
+            messages.append(message)
+        
+        await middleware(scope, receive, send)
+        
+        headers = dict(messages[0]["headers"])
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        return messages[0]["status"], headers, body
+    
+    async def test_cache_middleware_miss(self, scope, mock_cache_manager):
         """Test cache middleware on cache miss."""
         # Create middleware
-        app = MagicMock()
+        app, calls = self._make_app()
         middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
         
-        # Mock call_next
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.body_iterator = AsyncMock()
+        # Process request
+        status, headers, body = await self._call(middleware, scope)
         
-        async def mock_call_next(request):
-            return mock_response
+        # Verify cache was checked and the streamed body stored as bytes
+        mock_cache_manager.get.assert_called_once()
+        entry = mock_cache_manager.set.call_args_list[0][0][1]
+        assert isinstance(entry, bytes)
+        assert entry.endswith(b'{"data": "fresh"}')
+        assert mock_cache_manager.set.call_args_list[0][1]["tags"] == [
+            "workspace:workspace_123",
+            "workspace:workspace_123:campaigns"
+        ]
+        
+        # Verify response, a streamed body is not tagged until it is cached
+        assert status == 200
+        assert body == b'{"data": "fresh"}'
+        assert headers[b"x-cache"] == b"MISS"
+        assert b"etag" not in headers
+    
+    async def test_cache_middleware_hit(self, scope, mock_cache_manager):
+        """Test cache middleware on cache hit."""
+        # Populate the cache through a miss
+        app, calls = self._make_app()
+        middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
+        await self._call(middleware, scope)
         
         # Process request
-        response = await middleware.dispatch(mock_request, mock_call_next)
+        status, headers, body = await self._call(middleware, scope)
         
-        # Verify cache was checked
+        # Verify response is replayed without calling the endpoint
+        assert len(calls) == 1
+        assert status == 200
+        assert body == b'{"data": "fresh"}'
+        assert headers[b"x-cache"] == b"HIT"
+        assert headers[b"content-type"] == b"application/json"
+        assert headers[b"content-length"] == str(len(body)).encode()
+        assert headers[b"etag"] == CacheMiddleware._compute_etag(body).encode()
+    
+    async def test_cache_middleware_not_modified(self, scope, mock_cache_manager):
+        """Test conditional requests answered from the entity tag."""
+        async def app(scope, receive, send):
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")]
+            })
+            await send({"type": "http.response.body", "body": b'{"data": "fresh"}'})
+        
+        middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
+        
+        # A single-message body is tagged on the miss
+        status, headers, body = await self._call(middleware, scope)
+        etag = headers[b"etag"]
+        assert status == 200
+        assert etag == CacheMiddleware._compute_etag(body).encode()
+        
+        # Matching tag gets a 304 without reading the cached body
+        mock_cache_manager.get.reset_mock()
+        scope["headers"].append((b"if-none-match", b"W/" + etag))
+        status, headers, body = await self._call(middleware, scope)
+        
+        assert status == 304
+        assert body == b""
+        assert headers[b"etag"] == etag
+        assert headers[b"x-cache"] == b"HIT"
         mock_cache_manager.get.assert_called_once()
+        assert mock_cache_manager.get.call_args[0][0].endswith(":etag")
+        
+        # Stale tag gets the full cached response
+        scope["headers"][-1] = (b"if-none-match", b'"stale"')
+        status, headers, body = await self._call(middleware, scope)
         
-        # Verify response headers
-        assert response.headers["X-Cache"] == "MISS"
+        assert status == 200
+        assert body == b'{"data": "fresh"}'
+        assert headers[b"x-cache"] == b"HIT"
     
-    async def test_cache_middleware_hit(self, mock_request, mock_cache_manager):
-        """Test cache middleware on cache hit."""
-        # Mock cache hit
-        cached_data = {
-            "content": {"data": "cached"},
-            "status_code": 200,
-            "headers": {}
-        }
-        mock_cache_manager.get.return_value = cached_data
+    async def test_cache_middleware_skips_non_json(self, scope, mock_cache_manager):
+        """Test that non-JSON responses are not cached."""
+        app, calls = self._make_app(content_type=b"text/csv")
+        middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
         
-        # Create middleware
-        app = MagicMock()
+        status, headers, body = await self._call(middleware, scope)
+        
+        assert body == b'{"data": "fresh"}'
+        mock_cache_manager.set.assert_not_called()
+    
+    async def test_cache_middleware_requires_principal(self, scope, mock_cache_manager, principal):
+        """Test that requests without a valid principal bypass the cache."""
+        app, calls = self._make_app()
         middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
         
-        # Process request
-        response = await middleware.dispatch(mock_request, lambda r: None)
+        principal.return_value = None
+        await self._call(middleware, scope)
         
-        # Verify response
-        assert response.status_code == 200
-        assert response.headers["X-Cache"] == "HIT"
+        principal.side_effect = HTTPException(status_code=401, detail="Token has expired")
+        scope["headers"].append((b"if-none-match", b"*"))
+        status, headers, body = await self._call(middleware, scope)
+        
+        # Both reached the endpoint, nothing was read from or written to the cache
+        assert len(calls) == 2
+        assert status == 200
+        assert b"x-cache" not in headers
+        mock_cache_manager.get.assert_not_called()
+        mock_cache_manager.set.assert_not_called()
+    
+    async def test_cache_middleware_per_workspace(self, scope, mock_cache_manager, principal):
+        """Test that workspaces never share cached responses."""
+        app, calls = self._make_app()
+        middleware = CacheMiddleware(app, cache_manager=mock_cache_manager)
+        await self._call(middleware, scope)
+        
+        principal.return_value = Principal(
+            id=UUID("00000000-0000-0000-0000-000000000002"),
+            email="other@example.com",
+            role="member",
+            is_active=True,
+            workspace_id="workspace_456"
+        )
+        status, headers, body = await self._call(middleware, scope)
+        
+        assert len(calls) == 2
+        assert headers[b"x-cache"] == b"MISS"
+        assert mock_cache_manager.set.call_args_list[-1][1]["tags"][0] == "workspace:workspace_456"
     
     async def test_cache_endpoint_decorator(self):
         """Test cache endpoint decorator."""
@@ -457,22 +921,90 @@ class TestCacheMiddleware:
         
         # Mock cache
         with patch('middleware.cache_middleware.get_cache') as mock_get_cache:
+            cached = {}
+            
+            async def get_or_compute(key, compute, **kwargs):
+                if key not in cached:
+                    cached[key] = await compute()
+                return cached[key]
+            
             mock_cache = AsyncMock()
-            mock_cache.get = AsyncMock(return_value=None)
-            mock_cache.set = AsyncMock(return_value=True)
+            mock_cache.get_or_compute = AsyncMock(side_effect=get_or_compute)
             mock_get_cache.return_value = mock_cache
             
             # First call
             result1 = await test_endpoint(request=request)
             assert result1["calls"] == 1
             
-            # Mock cache hit for second call
-            mock_cache.get.return_value = {"data": "test", "calls": 1}
-            
             # Second call (cached)
             result2 = await test_endpoint(request=request)
             assert result2["calls"] == 1  # Should be cached
 
+    
+    async def test_invalidate_cache_evicts_cached_endpoint(self):
+        """Test that a refresh evicts the cached GET of the same campaign."""
+        call_count = 0
+        
+        @cache_endpoint(ttl=60)
+        async def get_analytics(request, campaign_id, workspace_id):
+            nonlocal call_count
+            call_count += 1
+            return {"campaign_id": campaign_id, "calls": call_count}
+        
+        @invalidate_cache(tags=["workspace:{workspace_id}:cache:campaigns:{campaign_id}"])
+        async def refresh_analytics(request, campaign_id, workspace_id):
+            return {"refreshed": True}
+        
+        def make_request(path):
+            request = MagicMock()
+            request.state.workspace_id = None
+            request.url.path = path
+            request.query_params = {"workspace_id": "workspace_123"}
+            return request
+        
+        # A cache that indexes entries by tag
+        cached, tagged = {}, {}
+        
+        async def get_or_compute(key, compute, tags=(), **kwargs):
+            if key not in cached:
+                cached[key] = await compute()
+                for tag in tags:
+                    tagged.setdefault(tag, set()).add(key)
+            return cached[key]
+        
+        async def delete_by_tag(tag):
+            keys = tagged.pop(tag, set())
+            for key in keys:
+                cached.pop(key, None)
+            return len(keys)
+        
+        mock_cache = AsyncMock()
+        mock_cache.get_or_compute = AsyncMock(side_effect=get_or_compute)
+        mock_cache.delete_by_tag = AsyncMock(side_effect=delete_by_tag)
+        
+        with patch('middleware.cache_middleware.get_cache', AsyncMock(return_value=mock_cache)):
+            get_request = make_request("/api/cache/campaigns/42/analytics")
+            other_request = make_request("/api/cache/campaigns/7/analytics")
+            await get_analytics(request=get_request, campaign_id="42", workspace_id="workspace_123")
+            await get_analytics(request=other_request, campaign_id="7", workspace_id="workspace_123")
+            assert (await get_analytics(
+                request=get_request, campaign_id="42", workspace_id="workspace_123"
+            ))["calls"] == 1
+            
+            await refresh_analytics(
+                request=make_request("/api/cache/campaigns/42/analytics/refresh"),
+                campaign_id="42",
+                workspace_id="workspace_123"
+            )
+            
+            mock_cache.delete_by_tag.assert_awaited_once_with("workspace:workspace_123:cache:campaigns:42")
+            assert (await get_analytics(
+                request=get_request, campaign_id="42", workspace_id="workspace_123"
+            ))["calls"] == 3
+            assert (await get_analytics(
+                request=other_request, campaign_id="7", workspace_id="workspace_123"
+            ))["calls"] == 2
+
 
 class TestCachedServices:
     """Test cached service implementations."""
@@ -0,0 +1,658 @@
+"""
+Tests for the advanced email client, queue and dispatcher.
+"""
+import pytest
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+import redis.asyncio as redis
+from botocore.exceptions import ClientError
+
+from utils.email_client import (
+    AdvancedEmailClient,
+    EmailDeliverabilityMonitor,
+    EmailQueue,
+    EmailTracker,
+    SendRateLimiter
+)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the email client uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.expires_at = {}
+
+    def _alive(self, key):
+        expires_at = self.expires_at.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            self.expires_at.pop(key, None)
+        return key in self.values
+
+    async def get(self, key):
+        return self.values.get(key) if self._alive(key) else None
+
+    async def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires_at = self.expires_at.get(key)
+        return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and self._alive(key):
+            return None
+        self.values[key] = value
+        if ex:
+            self.expires_at[key] = time.monotonic() + ex
+        return True
+
+    async def setex(self, key, ttl, value):
+        return await self.set(key, value, ex=ttl)
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+    async def expire(self, key, ttl):
+        if not self._alive(key):
+            return False
+        self.expires_at[key] = time.monotonic() + ttl
+        return True
+
+    async def zadd(self, key, mapping, gt=False):
+        if not self._alive(key):
+            self.values[key] = {}
+        members = self.values[key]
+        added = sum(1 for member in mapping if member not in members)
+        for member, score in mapping.items():
+            if not gt or score > members.get(member, float("-inf")):
+                members[member] = score
+        return added
+
+    async def zrangebyscore(self, key, min_score, max_score):
+        if not self._alive(key):
+            return []
+        return [member for member, score in sorted(self.values[key].items(), key=lambda item: item[1])
+                if min_score <= score <= max_score]
+
+    async def zrem(self, key, *members):
+        if not self._alive(key):
+            return 0
+        return sum(1 for member in members if self.values[key].pop(member, None) is not None)
+
+    async def zremrangebyscore(self, key, min_score, max_score):
+        if not self._alive(key):
+            return 0
+        members = self.values[key]
+        stale = [member for member, score in members.items() if min_score <= score <= max_score]
+        for member in stale:
+            del members[member]
+        return len(stale)
+
+    async def zcard(self, key):
+        return len(self.values[key]) if self._alive(key) else 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Buffers commands and runs them against FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        def queue_command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue_command
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+def _make_job(index: int) -> dict:
+    """Build a queued email job as EmailQueue.dequeue returns it."""
+    email_id = f"email-{index}"
+    return {
+        "id": email_id,
+        "data": {
+            "id": email_id,
+            "to_email": f"lead{index}@example.com",
+            "from_email": "sender@coldcopy.cc",
+            "subject": "Hello",
+            "html_content": "<p>Hi</p>",
+        },
+    }
+
+
+class TestEmailQueue:
+    """Test the scripted Redis email queue."""
+
+    @pytest.fixture
+    async def queue(self):
+        """Create an email queue on the test Redis database."""
+        client = redis.from_url("redis://localhost:6379/15", decode_responses=True)
+        email_queue = EmailQueue(client)
+        yield email_queue
+        await client.flushdb()
+        await client.close()
+
+    async def test_dequeue_batch_by_priority(self, queue):
+        """Test that a batch pops the highest priorities first."""
+        for priority in [1, 9, 5, 7]:
+            await queue.enqueue({"to_email": "lead@example.com"}, priority=priority)
+
+        email_jobs = await queue.dequeue_batch(3)
+
+        assert [job["priority"] for job in email_jobs] == [9, 7, 5]
+        assert all(job["status"] == "processing" for job in email_jobs)
+        assert (await queue.get_queue_stats())["processing"] == 3
+
+    async def test_due_scheduled_jobs_are_promoted(self, queue):
+        """Test that scheduled jobs become dequeueable once due."""
+        await queue.enqueue(
+            {"to_email": "lead@example.com"},
+            priority=8,
+            scheduled_at=datetime.utcnow() + timedelta(milliseconds=200)
+        )
+        assert await queue.dequeue() is None
+
+        await asyncio.sleep(0.3)
+        email_job = await queue.dequeue()
+
+        assert email_job is not None
+        assert email_job["priority"] == 8
+        assert (await queue.get_queue_stats())["scheduled"] == 0
+
+    async def test_concurrent_workers_never_double_claim(self, queue):
+        """Test that racing dequeues claim each scheduled job exactly once."""
+        scheduled_at = datetime.utcnow() + timedelta(milliseconds=200)
+        for index in range(100):
+            await queue.enqueue({"index": index}, scheduled_at=scheduled_at)
+        await asyncio.sleep(0.3)
+
+        batches = await asyncio.gather(*(queue.dequeue_batch(7) for _ in range(20)))
+        claimed_ids = [job["id"] for batch in batches for job in batch]
+
+        assert len(claimed_ids) == 100
+        assert len(set(claimed_ids)) == 100
+
+    async def test_enqueue_many(self, queue):
+        """Test that a batch of emails is queued in one write."""
+        email_ids = await queue.enqueue_many(
+            [{"to_email": f"lead{i}@example.com"} for i in range(50)],
+            priority=7
+        )
+
+        assert len(set(email_ids)) == 50
+        assert (await queue.get_queue_stats())["queued"] == 50
+
+        email_jobs = await queue.dequeue_batch(50)
+        assert {job["id"] for job in email_jobs} == set(email_ids)
+
+
+class TestEmailTracker:
+    """Test compiled open/click tracking."""
+
+    @pytest.fixture
+    def tracker(self):
+        """Tracker with a small template cache."""
+        return EmailTracker("https://api.coldcopy.cc/", MagicMock(), template_cache_size=2)
+
+    def test_renders_pixel_and_links(self, tracker):
+        """Test that tracking is rendered with the recipient's email id."""
+        html = '<body><a href="https://coldcopy.cc/pricing">Pricing</a></body>'
+
+        tracked = tracker.add_tracking("email-1", html)
+
+        assert tracked == (
+            '<body><a href="https://api.coldcopy.cc/api/track/click/email-1?url=https://coldcopy.cc/pricing">'
+            'Pricing</a><img src="https://api.coldcopy.cc/api/track/open/email-1" width="1" height="1" '
+            'style="display:none;" /></body>'
+        )
+
+    def test_pixel_appended_without_body_tag(self, tracker):
+        """Test that the pixel is appended when there is no closing body tag."""
+        tracked = tracker.add_tracking_pixel("email-1", "<p>Hi</p>")
+
+        assert tracked.startswith("<p>Hi</p><img src=")
+        assert "href" not in tracked
+
+    def test_template_compiled_once(self, tracker):
+        """Test that recipients of one body reuse its compiled segments."""
+        html = '<body><a href="https://coldcopy.cc">Hi</a></body>'
+
+        with patch.object(tracker, "_compile", wraps=tracker._compile) as compile_spy:
+            first = tracker.add_tracking("email-1", html)
+            second = tracker.add_tracking("email-2", html)
+
+        assert compile_spy.call_count == 1
+        assert first.replace("email-1", "email-2") == second
+
+    def test_cache_is_bounded(self, tracker):
+        """Test that the least recently used template is evicted."""
+        for i in range(3):
+            tracker.add_tracking("email-1", f"<p>{i}</p>")
+
+        assert len(tracker._segment_cache) == 2
+
+
+class TestBulkEnqueue:
+    """Test the batched enqueue path used by send_bulk_email."""
+
+    @pytest.fixture
+    def email_client(self):
+        """Email client with a mock queue and a real tracker."""
+        client = AdvancedEmailClient()
+        client.queue = MagicMock()
+        client.queue.enqueue_many = AsyncMock(
+            side_effect=lambda email_data_list, **kwargs: [f"job-{i}" for i in range(len(email_data_list))]
+        )
+        client.tracker = EmailTracker("https://api.coldcopy.cc", MagicMock())
+        return client
+
+    async def test_one_queue_write_per_batch(self, email_client):
+        """Test that recipients are written in batch-sized chunks."""
+        recipients = [f"lead{i}@example.com" for i in range(250)]
+
+        email_ids = await email_client.send_bulk_email(
+            recipients=recipients,
+            subject="Hello",
+            html_content='<a href="https://coldcopy.cc">Hi</a>',
+            batch_size=100
+        )
+
+        assert len(email_ids) == 250
+        assert len(set(email_ids)) == 250
+        batch_sizes = [len(call.args[0]) for call in email_client.queue.enqueue_many.call_args_list]
+        assert batch_sizes == [100, 100, 50]
+
+    async def test_tracking_uses_each_email_id(self, email_client):
+        """Test that each recipient's tracking links carry its own email id."""
+        email_ids = await email_client.send_bulk_email(
+            recipients=["a@example.com", "b@example.com"],
+            subject="Hello",
+            html_content='<body><a href="https://coldcopy.cc">Hi</a></body>'
+        )
+
+        email_data_list = email_client.queue.enqueue_many.call_args.args[0]
+        for email_id, email_data in zip(email_ids, email_data_list):
+            assert f"/api/track/open/{email_id}" in email_data["html_content"]
+            assert f"/api/track/click/{email_id}" in email_data["html_content"]
+
+
+class TestSendRateLimiter:
+    """Test the SES send-rate token bucket."""
+
+    async def test_burst_up_to_capacity(self):
+        """Test that a full bucket hands out tokens without waiting."""
+        limiter = SendRateLimiter(rate=50)
+
+        start = time.monotonic()
+        for _ in range(50):
+            await limiter.acquire()
+
+        assert time.monotonic() - start < 0.1
+
+    async def test_paces_to_rate(self):
+        """Test that an empty bucket refills at the configured rate."""
+        limiter = SendRateLimiter(rate=20, capacity=1)
+
+        start = time.monotonic()
+        for _ in range(11):
+            await limiter.acquire()
+
+        # First token is free, the next 10 take 10 / 20 = 0.5s
+        assert time.monotonic() - start >= 0.45
+
+    async def test_set_rate_keeps_tokens(self):
+        """Test that changing the rate does not refill the bucket."""
+        limiter = SendRateLimiter(rate=20)
+        await limiter.acquire(20)
+
+        limiter.set_rate(40)
+
+        start = time.monotonic()
+        await limiter.acquire(10)
+        assert time.monotonic() - start >= 0.2
+        assert limiter.capacity == 40
+
+
+class TestQueueDispatcher:
+    """Test concurrent dispatching in AdvancedEmailClient.process_queue."""
+
+    @pytest.fixture
+    def ses_client(self):
+        """Mock SES client that tracks in-flight sends."""
+        client = MagicMock()
+        client.in_flight = 0
+        client.peak_in_flight = 0
+
+        async def send_email(**params):
+            client.in_flight += 1
+            client.peak_in_flight = max(client.peak_in_flight, client.in_flight)
+            await asyncio.sleep(0.01)
+            client.in_flight -= 1
+            return {"MessageId": "msg-id"}
+
+        client.send_email = send_email
+        client.get_send_quota = AsyncMock(return_value={"MaxSendRate": 1000.0})
+        return client
+
+    @pytest.fixture
+    def email_client(self, ses_client):
+        """Email client wired to mock queue, monitor and SES client."""
+        client = AdvancedEmailClient()
+        jobs = [_make_job(i) for i in range(30)]
+
+        client.queue = MagicMock()
+        client.queue.dequeue_batch = AsyncMock(
+            side_effect=lambda count: [jobs.pop() for _ in range(min(count, len(jobs)))]
+        )
+        client.queue.mark_completed_many = AsyncMock()
+        client.queue.mark_failed = AsyncMock()
+
+        client.deliverability_monitor = MagicMock()
+        client.deliverability_monitor.check_reputation = AsyncMock(return_value={"status": "good"})
+
+        client._ses_client = ses_client
+
+        client.settings.EMAIL_ACK_BATCH_SIZE = 10
+        return client
+
+    async def test_keeps_sends_in_flight(self, email_client, ses_client):
+        """Test that up to `concurrency` sends run at once."""
+        results = await email_client.process_queue(max_emails=20, concurrency=5)
+
+        assert results == {"sent": 20, "failed": 0, "skipped": 0}
+        assert ses_client.peak_in_flight == 5
+
+    async def test_acknowledges_in_batches(self, email_client):
+        """Test that completions are flushed in ack-sized batches."""
+        await email_client.process_queue(max_emails=25, concurrency=4)
+
+        batch_sizes = [len(call.args[0]) for call in email_client.queue.mark_completed_many.call_args_list]
+        assert sum(batch_sizes) == 25
+        assert max(batch_sizes) <= 10
+
+    async def test_rate_limiter_shared_across_calls(self, email_client, ses_client):
+        """Test that a second process_queue call does not start with a full bucket."""
+        ses_client.get_send_quota.return_value = {"MaxSendRate": 20.0}
+
+        start = time.monotonic()
+        await email_client.process_queue(max_emails=20, concurrency=5)
+        assert time.monotonic() - start < 0.3
+        limiter = email_client._rate_limiter
+
+        start = time.monotonic()
+        results = await email_client.process_queue(max_emails=10, concurrency=5)
+
+        # The first call drained the bucket, 10 more sends take 10 / 20 = 0.5s
+        assert results["sent"] == 10
+        assert email_client._rate_limiter is limiter
+        assert time.monotonic() - start >= 0.45
+
+    async def test_poor_reputation_is_skipped(self, email_client):
+        """Test that jobs for poor-reputation domains are not sent."""
+        email_client.deliverability_monitor.check_reputation.return_value = {"status": "poor"}
+
+        results = await email_client.process_queue(max_emails=3, concurrency=2)
+
+        assert results["skipped"] == 3
+        assert email_client.queue.mark_failed.await_count == 3
+
+
+class TestSendRateShare:
+    """Test splitting the SES send rate across queue workers."""
+
+    @pytest.fixture
+    def ses_client(self):
+        """Mock SES client with a 100 emails/second quota."""
+        client = MagicMock()
+        client.get_send_quota = AsyncMock(return_value={"MaxSendRate": 100.0})
+        return client
+
+    def _worker(self, redis, worker_id):
+        client = AdvancedEmailClient()
+        client._redis_client = redis
+        client._worker_id = worker_id
+        return client
+
+    async def test_rate_split_across_live_workers(self, ses_client):
+        """Test that each worker gets an even share of the account rate."""
+        redis = FakeRedis()
+        workers = [self._worker(redis, f"worker-{i}") for i in range(4)]
+
+        for worker in workers:
+            await worker._get_send_rate(ses_client)
+
+        rates = [await worker._get_send_rate(ses_client) for worker in workers]
+        assert rates == [25.0] * 4
+
+    async def test_stale_workers_are_dropped(self, ses_client):
+        """Test that workers that stopped heartbeating no longer take a share."""
+        redis = FakeRedis()
+        await redis.zadd("email:workers", {"gone": time.time() - 3600})
+
+        rate = await self._worker(redis, "worker-0")._get_send_rate(ses_client)
+
+        assert rate == 100.0
+
+    async def test_fixed_share_overrides_coordination(self, ses_client):
+        """Test that EMAIL_SEND_RATE_SHARE pins the share."""
+        worker = self._worker(FakeRedis(), "worker-0")
+
+        with patch.object(worker.settings, "EMAIL_SEND_RATE_SHARE", 0.1):
+            assert await worker._get_send_rate(ses_client) == 10.0
+
+
+class TestBulkTemplatedDispatch:
+    """Test SendBulkTemplatedEmail dispatch for jobs sharing an SES template."""
+
+    @pytest.fixture
+    def ses_client(self):
+        """Mock SES client failing every tenth bulk destination."""
+        client = MagicMock()
+        client.get_send_quota = AsyncMock(return_value={"MaxSendRate": 1000.0})
+        client.create_template = AsyncMock()
+        client.delete_template = AsyncMock()
+
+        async def send_bulk_templated_email(**params):
+            return {"Status": [
+                {"Status": "Failed", "Error": "Bad address"} if i % 10 == 9
+                else {"Status": "Success", "MessageId": f"msg-{i}"}
+                for i, _ in enumerate(params["Destinations"])
+            ]}
+
+        client.send_bulk_templated_email = AsyncMock(side_effect=send_bulk_templated_email)
+        return client
+
+    @pytest.fixture
+    def email_client(self, ses_client):
+        """Email client with templated jobs waiting in a mock queue."""
+        client = AdvancedEmailClient()
+        jobs = []
+        for i in range(120):
+            job = _make_job(i)
+            job["data"]["ses_template"] = "coldcopy-bulk-test"
+            jobs.append(job)
+
+        client.queue = MagicMock()
+        client.queue.dequeue_batch = AsyncMock(
+            side_effect=lambda count: [jobs.pop() for _ in range(min(count, len(jobs)))]
+        )
+        client.queue.mark_completed_many = AsyncMock()
+        client.queue.mark_failed = AsyncMock()
+
+        client.deliverability_monitor = MagicMock()
+        client.deliverability_monitor.check_reputation = AsyncMock(return_value={"status": "good"})
+        client.tracker = EmailTracker("https://api.coldcopy.cc", MagicMock())
+        client._ses_client = ses_client
+        client._redis_client = FakeRedis()
+        return client
+
+    async def test_sends_up_to_50_destinations_per_call(self, email_client, ses_client):
+        """Test that templated jobs are grouped into bulk calls."""
+        await email_client.process_queue(max_emails=120, concurrency=4)
+
+        destination_counts = [
+            len(call.kwargs["Destinations"]) for call in ses_client.send_bulk_templated_email.call_args_list
+        ]
+        assert sum(destination_counts) == 120
+        assert max(destination_counts) <= 50
+        assert len(destination_counts) <= 4
+
+    async def test_maps_results_per_destination(self, email_client):
+        """Test that each destination's status is acked or failed individually."""
+        results = await email_client.process_queue(max_emails=50, concurrency=1)
+
+        assert results == {"sent": 45, "failed": 5, "skipped": 0}
+        acked = [email_id for call in email_client.queue.mark_completed_many.call_args_list
+                 for email_id in call.args[0]]
+        failed = [call.args[0] for call in email_client.queue.mark_failed.call_args_list]
+        assert len(acked) == 45
+        assert not set(acked) & set(failed)
+
+    async def test_template_registered_once(self, email_client, ses_client):
+        """Test that shared content becomes one SES template with an email id slot."""
+        html = '<body><a href="https://coldcopy.cc">Hi {{name}}</a></body>'
+
+        first = await email_client._ensure_ses_template("Hello", html, None)
+        second = await email_client._ensure_ses_template("Hello", html, None)
+
+        assert first == second
+        ses_client.create_template.assert_awaited_once()
+        template = ses_client.create_template.call_args.kwargs["Template"]
+        assert "/api/track/open/{{email_id}}" in template["HtmlPart"]
+        assert "\\{{name}}" in template["HtmlPart"]
+
+    async def test_bulk_error_fails_whole_chunk(self, email_client, ses_client):
+        """Test that an exception in a bulk call sends every job in it back for retry."""
+        ses_client.send_bulk_templated_email.side_effect = ClientError(
+            {"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "SendBulkTemplatedEmail"
+        )
+
+        results = await email_client.process_queue(max_emails=50, concurrency=1)
+
+        assert results == {"sent": 0, "failed": 50, "skipped": 0}
+        assert email_client.queue.mark_failed.await_count == 50
+
+    async def test_unused_templates_deleted(self, email_client, ses_client):
+        """Test that only templates no email needs any more are deleted."""
+        stale = await email_client._ensure_ses_template("Old", "<p>Old</p>", None)
+        scheduled = await email_client._ensure_ses_template(
+            "Later", "<p>Later</p>", None, needed_until=datetime.utcnow() + timedelta(days=30)
+        )
+        await email_client._redis_client.zadd("email:ses_templates", {stale: time.time() - 8 * 86400})
+
+        deleted = await email_client.cleanup_ses_templates(max_age=timedelta(days=7))
+
+        assert deleted == 1
+        ses_client.delete_template.assert_awaited_once_with(TemplateName=stale)
+        assert await email_client._redis_client.zrangebyscore("email:ses_templates", 0, float("inf")) == [scheduled]
+
+        await email_client._ensure_ses_template("Old", "<p>Old</p>", None)
+        assert ses_client.create_template.await_count == 3
+
+
+class TestEmailClientLifecycle:
+    """Test that the email client stays warm between tasks."""
+
+    @pytest.fixture
+    def ses_context(self):
+        """Mock aioboto3 client context manager."""
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=MagicMock())
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    async def test_initialize_is_idempotent(self, ses_context):
+        """Test that repeated initialize() calls reuse the open clients."""
+        with patch("utils.email_client.aioboto3.Session") as session_cls, \
+                patch("utils.email_client.get_redis_pool", AsyncMock(return_value=MagicMock())) as get_redis_pool:
+            session_cls.return_value.client.return_value = ses_context
+
+            client = AdvancedEmailClient()
+            await client.initialize()
+            await client.initialize()
+
+            assert session_cls.call_count == 1
+            get_redis_pool.assert_awaited_once_with("queue")
+            assert client.deliverability_monitor.ses is client._ses_client
+
+    async def test_cleanup_closes_clients(self, ses_context):
+        """Test that cleanup() closes SES, keeps the shared Redis pool and allows re-initialization."""
+        redis_client = MagicMock(close=AsyncMock())
+        with patch("utils.email_client.aioboto3.Session") as session_cls, \
+                patch("utils.email_client.get_redis_pool", AsyncMock(return_value=redis_client)):
+            session_cls.return_value.client.return_value = ses_context
+
+            client = AdvancedEmailClient()
+            await client.initialize()
+            await client.cleanup()
+
+            ses_context.__aexit__.assert_awaited_once()
+            redis_client.close.assert_not_awaited()
+            assert client.queue is None
+
+            await client.initialize()
+            assert session_cls.call_count == 2
+
+
+class TestReputationVerdictCache:
+    """Test caching of SES reputation verdicts."""
+
+    @pytest.fixture
+    def ses_client(self):
+        """Mock SES client with healthy statistics."""
+        client = MagicMock()
+        client.get_account_sending_enabled = AsyncMock(return_value={"Enabled": True})
+        client.get_send_statistics = AsyncMock(return_value={
+            "SendDataPoints": [{"DeliveryAttempts": 1000, "Bounces": 5, "Complaints": 0}]
+        })
+        return client
+
+    async def test_concurrent_checks_make_one_ses_call(self, ses_client):
+        """Test single-flight refresh within a process."""
+        monitor = EmailDeliverabilityMonitor(ses_client, FakeRedis())
+
+        verdicts = await asyncio.gather(
+            *(monitor.check_reputation(f"domain{i}.com") for i in range(50))
+        )
+
+        assert all(verdict["status"] == "good" for verdict in verdicts)
+        assert verdicts[7]["domain"] == "domain7.com"
+        assert ses_client.get_send_statistics.await_count == 1
+
+    async def test_verdict_shared_across_workers(self, ses_client):
+        """Test that a second worker reuses the verdict stored in Redis."""
+        redis = FakeRedis()
+        first_worker = EmailDeliverabilityMonitor(ses_client, redis)
+        second_worker = EmailDeliverabilityMonitor(ses_client, redis)
+
+        await first_worker.check_reputation("example.com")
+        verdict = await second_worker.check_reputation("example.com")
+
+        assert verdict["status"] == "good"
+        assert ses_client.get_account_sending_enabled.await_count == 1
+
+    async def test_verdict_refreshed_after_ttl(self, ses_client):
+        """Test that an expired verdict is recomputed from SES."""
+        monitor = EmailDeliverabilityMonitor(ses_client, FakeRedis(), verdict_ttl=1)
+
+        await monitor.check_reputation("example.com")
+        await asyncio.sleep(1.1)
+        await monitor.check_reputation("example.com")
+
+        assert ses_client.get_send_statistics.await_count == 2
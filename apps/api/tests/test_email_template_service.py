@@ -0,0 +1,117 @@
+"""
+Tests for compiled email template rendering.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.email_template_service import (
+    CompiledTemplate,
+    EmailTemplateService,
+    compile_content,
+    get_compiled_template
+)
+from utils.email_client import EmailTemplate
+
+
+class TestCompiledTemplate:
+    """Test the {{variable}} template engine."""
+
+    def test_substitutes_variables(self):
+        """Test substitution, including whitespace inside braces."""
+        compiled = compile_content("Hi {{first_name}}, how is {{ company }}?")
+
+        assert compiled.render({"first_name": "Ada", "company": "Acme"}) == "Hi Ada, how is Acme?"
+
+    def test_unknown_variables_are_kept(self):
+        """Test that missing variables stay as placeholders."""
+        compiled = compile_content("Hi {{ first_name }}")
+
+        assert compiled.render({}) == "Hi {{first_name}}"
+
+    def test_render_many(self):
+        """Test rendering one template for several leads."""
+        compiled = CompiledTemplate("Hi {{first_name}}", "<p>{{company}}</p>", None)
+
+        rendered = compiled.render_many([
+            {"first_name": "Ada", "company": "Acme"},
+            {"first_name": "Alan", "company": "Bletchley"},
+        ])
+
+        assert [r["subject"] for r in rendered] == ["Hi Ada", "Hi Alan"]
+        assert rendered[1]["html_content"] == "<p>Bletchley</p>"
+        assert rendered[0]["text_content"] == ""
+
+    def test_variables(self):
+        """Test that variable names are collected from all parts."""
+        compiled = CompiledTemplate("{{a}}", "{{ b }} {{a}}", "{{c}}")
+
+        assert compiled.variables == {"a", "b", "c"}
+
+    def test_cached_by_id_and_version(self):
+        """Test that a new template version is recompiled."""
+        template = MagicMock(id="tpl-1", version=1, subject="v1 {{x}}", html_content="", text_content="")
+
+        first = get_compiled_template(template)
+        assert get_compiled_template(template) is first
+
+        template.version = 2
+        template.subject = "v2 {{x}}"
+        second = get_compiled_template(template)
+
+        assert second is not first
+        assert second.render({"x": 1})["subject"] == "v2 1"
+
+
+class TestRenderTemplateMany:
+    """Test rendering a stored template for several leads."""
+
+    @pytest.fixture
+    def service(self):
+        """Template service returning one stored template."""
+        service = EmailTemplateService(MagicMock())
+        service.get_template = AsyncMock(return_value=MagicMock(
+            id="tpl-many", version=1, subject="Hi {{first_name}}", html_content="{{company}}", text_content=""
+        ))
+        return service
+
+    @staticmethod
+    def _lead(first_name):
+        return MagicMock(
+            first_name=first_name, last_name="", email=f"{first_name}@example.com", company="Acme",
+            job_title="", phone="", enrichment_data=None
+        )
+
+    async def test_merges_matching_lead(self, service):
+        """Test that each variables dict is merged with its lead, variables winning."""
+        rendered = await service.render_template_many(
+            "tpl-many",
+            [{}, {"company": "Bletchley"}],
+            leads=[self._lead("Ada"), self._lead("Alan")]
+        )
+
+        assert [r["subject"] for r in rendered] == ["Hi Ada", "Hi Alan"]
+        assert [r["html_content"] for r in rendered] == ["Acme", "Bletchley"]
+
+    async def test_mismatched_leads_rejected(self, service):
+        """Test that leads and variables of different lengths are not silently truncated."""
+        with pytest.raises(ValueError):
+            await service.render_template_many("tpl-many", [{}, {}], leads=[self._lead("Ada")])
+
+
+class TestJinjaEmailTemplate:
+    """Test the Jinja2 email template used for direct sends."""
+
+    def test_sources_compiled_once(self):
+        """Test that identical sources share a compiled template."""
+        first = EmailTemplate("Hi {{ name }}", "<p>{{ name }}</p>")
+        second = EmailTemplate("Hi {{ name }}", "<p>{{ name }}</p>")
+
+        assert first.subject_template is second.subject_template
+
+    def test_render_many(self):
+        """Test rendering for several variable sets."""
+        template = EmailTemplate("Hi {{ name }}", "<p>{{ name }}</p>", "{{ name }}")
+
+        rendered = template.render_many([{"name": "Ada"}, {"name": "Alan"}])
+
+        assert [r["html"] for r in rendered] == ["<p>Ada</p>", "<p>Alan</p>"]
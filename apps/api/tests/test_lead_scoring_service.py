@@ -0,0 +1,299 @@
+"""
+Tests for bulk lead scoring against the single-lead calculation.
+"""
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BindParameter
+
+from services.lead_scoring_service import EMPTY_ENGAGEMENT, LeadScoringService
+
+WORKSPACE_ID = "workspace-1"
+
+SCORE_FIELDS = (
+    "engagement_score", "quality_score", "intent_score", "total_score",
+    "email_engagement_points", "profile_completeness_points", "company_fit_points",
+    "behavior_points", "recency_points", "grade", "temperature"
+)
+
+
+class FakeSession:
+    """Answers the two queries _score_chunk sends and records bulk writes."""
+
+    def __init__(self, leads):
+        self.leads = {lead.id: lead for lead in leads}
+        self.writes = []
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.writes.append((statement.table.name, params))
+            return MagicMock()
+
+        binds = [bind.value for bind in visitors.iterate(statement.whereclause) if isinstance(bind, BindParameter)]
+        lead_ids = next(value for value in binds if isinstance(value, list))
+        if WORKSPACE_ID in binds:
+            leads = [self.leads[lead_id] for lead_id in lead_ids if lead_id in self.leads]
+            return MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=leads))))
+        # No stored scores yet
+        return []
+
+    def add(self, instance):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+
+def _lead(index, **fields):
+    """Lead stand-in with every field the scoring model reads."""
+    lead = {
+        "id": f"lead-{index}",
+        "email": f"lead{index}@example.com",
+        "first_name": None,
+        "last_name": None,
+        "company": None,
+        "job_title": None,
+        "phone": None,
+        "linkedin_url": None,
+        "company_website": None,
+        "email_status": None,
+        "enrichment_confidence": None,
+        "company_size": None,
+        "industry": None,
+        "company_revenue": None,
+    }
+    lead.update(fields)
+    return SimpleNamespace(**lead)
+
+
+def _engagement(opens=0, clicks=0, replies=0, open_points=0, days_ago=None):
+    last_engagement = datetime.utcnow() - timedelta(days=days_ago, hours=1) if days_ago is not None else None
+    return {
+        "opens": opens,
+        "clicks": clicks,
+        "replies": replies,
+        "open_points": open_points,
+        "last_engagement": last_engagement
+    }
+
+
+class TestBulkLeadScoring:
+    """Test that calculate_lead_scores_bulk agrees with calculate_lead_score."""
+
+    @pytest.fixture
+    def scoring_rule(self):
+        """Workspace scoring rules with time decay and company fit rules."""
+        return SimpleNamespace(
+            email_open_weight=5,
+            email_click_weight=10,
+            email_reply_weight=20,
+            enable_time_decay=True,
+            decay_half_life_days=30,
+            grade_thresholds={},
+            company_fit_rules={
+                "ideal_company_sizes": ["51-200"],
+                "acceptable_company_sizes": ["11-50"],
+                "target_industries": ["SaaS"],
+                "revenue_range": {"min": 1_000_000, "max": 50_000_000}
+            }
+        )
+
+    @pytest.fixture
+    def leads(self):
+        """Leads from an empty profile to a fully enriched, engaged one."""
+        return [
+            _lead(0),
+            _lead(1, first_name="Ada", company="Acme", email_status="valid", company_size="51-200"),
+            _lead(
+                2, first_name="Alan", last_name="Turing", company="Bletchley", job_title="CTO",
+                phone="+44", linkedin_url="https://linkedin.com/in/alan", company_website="https://b.uk",
+                email_status="valid", enrichment_confidence=0.9, company_size="51-200",
+                industry="SaaS", company_revenue=5_000_000
+            ),
+            _lead(3, company="Initech", email_status="catch_all", company_size="11-50", enrichment_confidence=0.4),
+            _lead(4, first_name="Grace", industry="SaaS"),
+            _lead(5, email_status="valid"),
+            _lead(6, first_name="Linus", company="Kernel", company_size="11-50"),
+        ]
+
+    @pytest.fixture
+    def engagement(self):
+        """Engagement aggregates, leads 0 and 5 have no email events."""
+        return {
+            "lead-1": _engagement(opens=3, open_points=5, days_ago=0),
+            "lead-2": _engagement(opens=12, clicks=4, replies=2, open_points=25, days_ago=3),
+            "lead-3": _engagement(opens=1, days_ago=45),
+            "lead-4": _engagement(opens=6, clicks=1, open_points=10, days_ago=10),
+            "lead-6": _engagement(opens=2, replies=1, days_ago=120),
+        }
+
+    @pytest.fixture
+    def recent_activities(self):
+        """Activity counts for the last week."""
+        return {"lead-1": 1, "lead-2": 4, "lead-4": 3}
+
+    @pytest.fixture
+    def service(self, leads, engagement, recent_activities, scoring_rule):
+        """Scoring service over fake leads, events and activities."""
+        service = LeadScoringService(FakeSession(leads))
+        service._get_scoring_rules = AsyncMock(return_value=scoring_rule)
+        service._fetch_engagement_aggregates = AsyncMock(
+            side_effect=lambda lead_ids: {
+                str(lead_id): engagement[str(lead_id)] for lead_id in lead_ids if str(lead_id) in engagement
+            }
+        )
+        service._count_recent_activities_bulk = AsyncMock(
+            side_effect=lambda lead_ids, days=7: {
+                str(lead_id): recent_activities[str(lead_id)]
+                for lead_id in lead_ids if str(lead_id) in recent_activities
+            }
+        )
+        service._get_recent_activities = AsyncMock(
+            side_effect=lambda lead_id, days=7: [MagicMock()] * recent_activities.get(str(lead_id), 0)
+        )
+        service._update_segment_memberships = AsyncMock()
+        service._update_segment_memberships_bulk = AsyncMock()
+        return service
+
+    async def _score_one(self, service, lead):
+        """Score a lead through calculate_lead_score."""
+        service._get_lead_with_data = AsyncMock(return_value=lead)
+        service._get_or_create_lead_score = AsyncMock(
+            return_value=SimpleNamespace(id=f"score-{lead.id}", total_score=0)
+        )
+        with patch("services.lead_scoring_service.LeadScoreHistory", MagicMock()):
+            return await service.calculate_lead_score(lead.id, WORKSPACE_ID)
+
+    async def test_bulk_matches_single(self, service, leads):
+        """Test that every stored field matches the single-lead calculation."""
+        singles = {lead.id: await self._score_one(service, lead) for lead in leads}
+
+        scored = await service.calculate_lead_scores_bulk([lead.id for lead in leads], WORKSPACE_ID)
+
+        rows = {row["lead_id"]: row for table, params in service.db.writes if table == "lead_scores" for row in params}
+        assert set(rows) == set(singles)
+        for lead_id, single in singles.items():
+            for field in SCORE_FIELDS:
+                assert rows[lead_id][field] == getattr(single, field), (lead_id, field)
+            assert rows[lead_id]["scoring_factors"] == single.scoring_factors
+        assert {result["lead_id"]: result["total_score"] for result in scored["results"]} == {
+            lead_id: single.total_score for lead_id, single in singles.items()
+        }
+
+    async def test_leads_without_events(self, service, leads):
+        """Test that leads with no email events get the same zero engagement both ways."""
+        no_events = [leads[0], leads[5]]
+        singles = [await self._score_one(service, lead) for lead in no_events]
+
+        await service.calculate_lead_scores_bulk([lead.id for lead in no_events], WORKSPACE_ID)
+
+        rows = [row for table, params in service.db.writes if table == "lead_scores" for row in params]
+        for row, single in zip(rows, singles, strict=True):
+            assert row["engagement_score"] == single.engagement_score == 0
+            assert row["recency_points"] == single.recency_points == 0
+            assert row["total_score"] == single.total_score
+            assert row["scoring_factors"]["engagement_breakdown"] == {
+                "email_opens": EMPTY_ENGAGEMENT["opens"],
+                "email_clicks": EMPTY_ENGAGEMENT["clicks"],
+                "email_replies": EMPTY_ENGAGEMENT["replies"],
+                "open_points": EMPTY_ENGAGEMENT["open_points"],
+                "last_engagement": None
+            }
+
+    async def test_bulk_leaves_commit_to_caller(self, service, leads):
+        """Test that scored chunks are flushed, not committed one by one."""
+        service.db.commit = AsyncMock()
+        service.db.flush = AsyncMock()
+
+        await service.calculate_lead_scores_bulk([lead.id for lead in leads], WORKSPACE_ID, chunk_size=3)
+
+        service.db.commit.assert_not_awaited()
+        assert service.db.flush.await_count == 3
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 8])
+    async def test_chunk_boundaries(self, service, leads, chunk_size):
+        """Test that chunking scores every lead once, whatever the chunk size."""
+        lead_ids = [lead.id for lead in leads] + ["lead-missing"]
+        single_totals = {lead.id: (await self._score_one(service, lead)).total_score for lead in leads}
+        service._fetch_engagement_aggregates.reset_mock()
+
+        scored = await service.calculate_lead_scores_bulk(lead_ids, WORKSPACE_ID, chunk_size=chunk_size)
+
+        assert [result["lead_id"] for result in scored["results"]] == [lead.id for lead in leads]
+        assert {result["lead_id"]: result["total_score"] for result in scored["results"]} == single_totals
+        assert scored["missing"] == ["lead-missing"]
+
+        chunks = [call.args[0] for call in service._fetch_engagement_aggregates.call_args_list]
+        assert sum(len(chunk) for chunk in chunks) == len(leads)
+        assert all(len(chunk) <= chunk_size for chunk in chunks)
+
+
+class TestIncrementalScoring:
+    """Test apply_engagement_event against the stored breakdown."""
+
+    @pytest.fixture
+    def lead_score(self):
+        """Stored score whose behavior points include response-time points."""
+        return SimpleNamespace(
+            behavior_points=25,
+            scoring_factors={
+                "engagement_breakdown": {
+                    "email_opens": 4,
+                    "email_clicks": 1,
+                    "email_replies": 0,
+                    "open_points": 5,
+                    "last_engagement": "2026-10-01T12:00:00"
+                }
+            }
+        )
+
+    @pytest.fixture
+    def service(self, lead_score):
+        """Scoring service over a session holding the stored score."""
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=lead_score)))
+        service = LeadScoringService(db)
+        service.calculate_lead_score = AsyncMock(return_value=lead_score)
+        return service
+
+    async def test_open_points_read_from_breakdown(self, service):
+        """Test that only the stored open points are carried into the recalculation."""
+        await service.apply_engagement_event("lead-1", WORKSPACE_ID, "opened", datetime(2026, 10, 2))
+
+        engagement = service.calculate_lead_score.call_args.kwargs["engagement"]
+        assert engagement["open_points"] == 5
+        assert engagement["opens"] == 5
+        assert engagement["last_engagement"] == datetime(2026, 10, 2)
+
+    async def test_breakdown_without_open_points_recalculated(self, service, lead_score):
+        """Test that a breakdown stored without open points gets a full recalculation."""
+        del lead_score.scoring_factors["engagement_breakdown"]["open_points"]
+
+        await service.apply_engagement_event("lead-1", WORKSPACE_ID, "clicked")
+
+        assert "engagement" not in service.calculate_lead_score.call_args.kwargs
+
+
+class TestReconciliation:
+    """Test reconcile_scores transaction boundaries."""
+
+    async def test_each_chunk_committed(self):
+        """Test that reconciled chunks are committed one by one, releasing their row locks."""
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[[("lead-1",), ("lead-2",)], [("lead-3",)], []])
+        db.commit = AsyncMock()
+        service = LeadScoringService(db)
+        service._get_scoring_rules = AsyncMock()
+        service._score_chunk = AsyncMock()
+
+        processed = await service.reconcile_scores(WORKSPACE_ID, chunk_size=2)
+
+        assert processed == {WORKSPACE_ID: 3}
+        assert service._score_chunk.await_count == 2
+        assert db.commit.await_count == 2
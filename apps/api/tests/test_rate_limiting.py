@@ -3,13 +3,19 @@ Tests for rate limiting functionality.
 """
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from fastapi import Request, HTTPException
 from fastapi.testclient import TestClient
+import redis.asyncio as redis
 
+from core.redis import CacheManager, RateLimitCache
 from middleware.rate_limiting import RateLimitMiddleware, TokenBucketRateLimit
+from utils.rate_limit_leases import LeasedRateLimiter
+from utils.route_patterns import RouteTrie
 from utils.advanced_rate_limiting import (
     AdaptiveRateLimiter,
     DistributedRateLimiter,
@@ -18,6 +24,9 @@ from utils.advanced_rate_limiting import (
     RateLimitMonitor
 )
 from utils.rate_limit_decorators import (
+    _build_identifiers,
+    _check_endpoint_rate_limits,
+    _compile_windows,
     rate_limit,
     adaptive_rate_limit,
     circuit_breaker_rate_limit,
@@ -26,6 +35,17 @@ from utils.rate_limit_decorators import (
 )
 
 
+@pytest.fixture
+async def rate_cache():
+    """Create a rate limit cache on the test database."""
+    client = redis.Redis.from_url("redis://localhost:6379/15", decode_responses=True)
+    yield RateLimitCache(CacheManager(client, prefix="test"))
+    keys = [key async for key in client.scan_iter("test:*")]
+    if keys:
+        await client.delete(*keys)
+    await client.close()
+
+
 class TestRateLimitMiddleware:
     """Test the main rate limiting middleware."""
     
@@ -126,6 +146,25 @@ class TestRateLimitMiddleware:
             assert limits["rpm"] == 20  # IP default limit
             assert limits["rph"] == 200
     
+    @pytest.mark.asyncio
+    async def test_get_identifier_and_limits_parameterized_endpoint(self, rate_limit_middleware):
+        """Test that endpoint rules with path parameters match."""
+        mock_request = MagicMock()
+        mock_request.method = "POST"
+        mock_request.url.path = "/api/campaigns/campaign_123/action"
+        mock_request.headers = {}
+        mock_request.client.host = "192.168.1.100"
+        
+        identifier, limits = await rate_limit_middleware._get_identifier_and_limits(mock_request)
+        
+        # One limit for the route, whichever campaign is targeted
+        assert identifier == "ip:192.168.1.100:endpoint:POST:/api/campaigns/{campaign_id}/action"
+        assert limits["rpm"] == 5
+        
+        mock_request.method = "GET"
+        identifier, limits = await rate_limit_middleware._get_identifier_and_limits(mock_request)
+        assert identifier == "ip:192.168.1.100"
+    
     @pytest.mark.asyncio
     async def test_rate_limit_exceeded_response(self, rate_limit_middleware):
         """Test rate limit exceeded response creation."""
@@ -154,6 +193,156 @@ class TestRateLimitMiddleware:
         assert response.headers["Retry-After"] == "60"
 
 
+class TestRouteTrie:
+    """Test route pattern matching for endpoint rules."""
+    
+    @pytest.fixture
+    def trie(self):
+        """Create a trie of endpoint rules."""
+        return RouteTrie.from_rules({
+            "GET:/api/campaigns/{campaign_id}": "campaign",
+            "GET:/api/campaigns/stats": "stats",
+            "POST:/api/campaigns/{campaign_id}/action": "action",
+            "GET:/api/leads/{lead_id}/notes/{note_id}": "note",
+            "user_type:free": "ignored",
+        })
+    
+    def test_match_parameters(self, trie):
+        """Test that parameters match any segment and are captured."""
+        match = trie.match("GET", "/api/leads/lead_1/notes/note_2")
+        assert match.value == "note"
+        assert match.pattern == "GET:/api/leads/{lead_id}/notes/{note_id}"
+        assert match.params == {"lead_id": "lead_1", "note_id": "note_2"}
+        
+        assert trie.match("post", "/api/campaigns/abc/action/").value == "action"
+    
+    def test_static_segments_win(self, trie):
+        """Test that static segments take precedence over parameters."""
+        assert trie.match("GET", "/api/campaigns/stats").value == "stats"
+        assert trie.match("GET", "/api/campaigns/abc").value == "campaign"
+    
+    def test_no_match(self, trie):
+        """Test paths, methods and partial paths without a rule."""
+        assert trie.match("DELETE", "/api/campaigns/abc") is None
+        assert trie.match("GET", "/api/campaigns") is None
+        assert trie.match("GET", "/api/campaigns/abc/action") is None
+        assert trie.match("GET", "user_type:free") is None
+
+
+class TestRateLimitCache:
+    """Test the Lua sliding window limiter."""
+    
+    @pytest.mark.asyncio
+    async def test_limit_enforced(self, rate_cache):
+        """Test that requests are allowed up to the limit, then denied."""
+        for expected_usage in range(3):
+            result = await rate_cache.check_rate_limit("user:1:minute", 3, 60)
+            assert result["allowed"] is True
+            assert result["current_usage"] == expected_usage
+            assert result["retry_after"] == 0
+        
+        result = await rate_cache.check_rate_limit("user:1:minute", 3, 60)
+        assert result["allowed"] is False
+        assert result["current_usage"] == 3
+        assert 0 < result["retry_after"] <= 120
+        
+        status = await rate_cache.get_rate_limit_status("user:1:minute", 3, 60)
+        assert status["current_usage"] == 3
+        assert status["remaining"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_windows_checked_together(self, rate_cache):
+        """Test that a request denied by one window consumes nothing."""
+        windows = [("user:2:minute", 10, 60), ("user:2:hour", 2, 3600)]
+        
+        for _ in range(2):
+            minute, hour = await rate_cache.check_rate_limits(windows)
+            assert minute["allowed"] and hour["allowed"]
+        
+        minute, hour = await rate_cache.check_rate_limits(windows)
+        assert not minute["allowed"] and not hour["allowed"]
+        assert minute["retry_after"] == 0
+        assert hour["retry_after"] > 0
+        
+        # The denied request did not count against the minute window
+        status = await rate_cache.get_rate_limit_status("user:2:minute", 10, 60)
+        assert status["current_usage"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_legacy_list_replaced(self, rate_cache):
+        """Test that counters stored as JSON lists are replaced."""
+        await rate_cache.cache.set("rate_limit:user:3:minute", [{"timestamp": "2024-01-15T10:30:00", "cost": 1}])
+        
+        result = await rate_cache.check_rate_limit("user:3:minute", 5, 60)
+        assert result["allowed"] is True
+        assert result["current_usage"] == 0
+
+
+class TestLeasedRateLimiter:
+    """Test approximate rate limiting from leased quota."""
+    
+    @pytest.fixture
+    def limiter(self, rate_cache):
+        """Create a leased limiter over the test cache."""
+        async def get_rate_cache():
+            return rate_cache
+        return LeasedRateLimiter(get_rate_cache, max_error=0.05, lease_seconds=60)
+    
+    @pytest.mark.asyncio
+    async def test_admits_locally(self, limiter, rate_cache):
+        """Test that most requests are admitted without a Redis check."""
+        windows = [("user:4:minute", 1000, 60), ("user:4:hour", 10000, 3600)]
+        
+        for _ in range(200):
+            minute, hour = await limiter.check_rate_limits("user:4", windows)
+            assert minute["allowed"] and hour["allowed"]
+            await asyncio.sleep(0)
+        
+        assert limiter.local_admissions > 150
+        assert limiter.remote_checks < 50
+        
+        # Quota is paid for before it is used
+        status = await rate_cache.get_rate_limit_status("user:4:minute", 1000, 60)
+        assert 200 <= status["current_usage"] <= 200 + 2 * 50
+    
+    @pytest.mark.asyncio
+    async def test_strict_near_limit(self, limiter, rate_cache):
+        """Test that the limit is enforced exactly once quota runs low."""
+        windows = [("user:5:minute", 100, 60), ("user:5:hour", 1000, 3600)]
+        admitted = 0
+        
+        for _ in range(120):
+            minute, hour = await limiter.check_rate_limits("user:5", windows)
+            admitted += minute["allowed"]
+            await asyncio.sleep(0)
+        
+        assert admitted == 100
+        status = await rate_cache.get_rate_limit_status("user:5:minute", 100, 60)
+        assert status["current_usage"] == 100
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_waiters_share_leases(self, limiter, rate_cache):
+        """Test that requests waiting on a lease never lease their own chunks."""
+        windows = [("user:6:minute", 1000, 60), ("user:6:hour", 10000, 3600)]
+        
+        results = await asyncio.gather(*[limiter.check_rate_limits("user:6", windows) for _ in range(3)])
+        
+        assert all(minute["allowed"] for minute, _ in results)
+        # One first chunk of two, then one refresh the third request waited on
+        assert limiter.remote_checks == 2
+        assert limiter.local_admissions == 2
+    
+    @pytest.mark.asyncio
+    async def test_small_limits_stay_strict(self, limiter):
+        """Test that limits too small to lease are checked on every request."""
+        windows = [("ip:1:minute", 5, 60), ("ip:1:hour", 20, 3600)]
+        
+        results = [await limiter.check_rate_limits("ip:1", windows) for _ in range(6)]
+        
+        assert [minute["allowed"] for minute, _ in results] == [True] * 5 + [False]
+        assert limiter.local_admissions == 0
+
+
 class TestTokenBucketRateLimit:
     """Test token bucket rate limiting."""
     
@@ -260,6 +449,52 @@ class TestAdaptiveRateLimiter:
         assert adaptive_config.limit >= 1  # At least 1 request allowed
 
 
+class TestDistributedRateLimiter:
+    """Test node-local counting with sharded global counters."""
+    
+    @pytest.fixture(autouse=True)
+    def limiter_cache(self, rate_cache):
+        """Point the distributed limiter at the test cache."""
+        with patch('utils.advanced_rate_limiting.get_rate_limit_cache', AsyncMock(return_value=rate_cache)):
+            yield
+    
+    @pytest.mark.asyncio
+    async def test_counts_flushed(self, rate_cache):
+        """Test that admissions are counted locally and flushed in bulk."""
+        limiter = DistributedRateLimiter(node_id="node-1", flush_interval=60, max_error=0.1)
+        
+        for _ in range(50):
+            status = await limiter.check_distributed_limit("user:6", 1000, 3600)
+            assert status.allowed
+        
+        assert await rate_cache.cache.redis.keys("test:distributed_limit:3600:*") == []
+        
+        await limiter.close()
+        index = int(time.time() // 3600)
+        hash_key = limiter._hash_key("test", "user:6", 3600, index)
+        assert await rate_cache.cache.redis.hget(hash_key, "user:6") == "50"
+    
+    @pytest.mark.asyncio
+    async def test_global_limit_shared(self, rate_cache):
+        """Test that nodes share one limit within the allowed error."""
+        nodes = [
+            DistributedRateLimiter(node_id=f"node-{i}", flush_interval=60, max_error=0.1)
+            for i in range(2)
+        ]
+        admitted = 0
+        
+        for i in range(60):
+            status = await nodes[i % 2].check_distributed_limit("user:7", 40, 3600)
+            admitted += status.allowed
+        
+        # Each node may admit 40 * 0.1 / 2 before it syncs
+        assert 40 <= admitted <= 44
+        assert [node._live_nodes for node in nodes] == [2, 2]
+        
+        for node in nodes:
+            await node.close()
+
+
 class TestCircuitBreakerRateLimit:
     """Test circuit breaker rate limiting."""
     
@@ -428,6 +663,45 @@ class TestRateLimitDecorators:
             
             assert exc_info.value.status_code == 429
     
+    @pytest.mark.asyncio
+    async def test_daily_window_is_a_calendar_day(self):
+        """Test that the daily window is keyed by UTC date and resets at midnight."""
+        windows = _compile_windows("send_email", 60, 1000, 500, 1.0)
+        denied = {"allowed": False, "current_usage": 500, "retry_after": 0}
+        
+        with patch('utils.rate_limit_decorators.get_rate_limit_cache') as mock_cache:
+            mock_cache.return_value.check_rate_limits = AsyncMock(return_value=[
+                denied, denied, dict(denied, retry_after=3600)
+            ])
+            
+            with pytest.raises(HTTPException) as exc_info:
+                await _check_endpoint_rate_limits("user:1", windows, "Rate limit exceeded")
+            
+            checked = mock_cache.return_value.check_rate_limits.call_args.args[0]
+        
+        now = datetime.utcnow()
+        assert checked[2] == (f"user:1:daily:send_email:{now:%Y-%m-%d}", 500, 86400)
+        detail = exc_info.value.detail
+        assert detail["limit_type"] == "daily"
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        assert abs(detail["retry_after"] - (midnight - now).total_seconds()) <= 2
+    
+    @pytest.mark.asyncio
+    async def test_identifiers_built_once_per_request(self):
+        """Test that stacked decorators reuse the identifiers on request.state."""
+        mock_request = MagicMock()
+        mock_request.headers = {}
+        mock_request.client.host = "127.0.0.1"
+        mock_request.state = SimpleNamespace()
+        
+        with patch('utils.rate_limit_decorators.get_current_user_from_request', AsyncMock(return_value=None)) as get_user:
+            first = await _build_identifiers(mock_request, True, True, False)
+            second = await _build_identifiers(mock_request, True, True, False)
+        
+        assert first is second
+        assert first == ["ip:127.0.0.1"]
+        get_user.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_daily_quota_decorator(self):
         """Test daily quota decorator."""
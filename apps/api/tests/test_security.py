@@ -3,10 +3,24 @@ Security-focused tests for ColdCopy API.
 """
 import pytest
 import time
-from unittest.mock import patch, AsyncMock
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
+from uuid import uuid4
 
 from httpx import AsyncClient
 
+from core.security import (
+    Principal,
+    create_access_token,
+    get_current_active_user,
+    get_current_principal,
+    get_current_user,
+    get_current_user_from_token,
+    invalidate_user_principals,
+)
+from utils.cache_manager import CacheNamespace
+
 
 class TestAuthenticationSecurity:
     """Test authentication security measures."""
@@ -54,6 +68,125 @@ class TestAuthenticationSecurity:
         assert response.status_code in [403, 404]  # Forbidden or Not Found
 
 
+class TestPrincipalCache:
+    """Test caching of verified principals."""
+    
+    @pytest.fixture
+    def user(self):
+        """A user as loaded from the database."""
+        return SimpleNamespace(
+            id=uuid4(),
+            email="test@example.com",
+            role="manager",
+            is_active=True,
+            workspace_id=uuid4()
+        )
+    
+    @pytest.fixture
+    def cache(self):
+        """A cache that misses, then serves what was set."""
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock(return_value=True)
+        cache.delete_by_tag = AsyncMock(return_value=1)
+        return cache
+    
+    @pytest.fixture
+    def user_service(self, user):
+        """UserService returning the user."""
+        with patch('core.security.UserService') as service:
+            service.return_value.get_user_by_id = AsyncMock(return_value=user)
+            yield service
+    
+    async def test_principal_cached_until_token_expiry(self, user, cache, user_service):
+        """Test that a verified user is cached by token hash, within the token lifetime."""
+        token = create_access_token({"sub": str(user.id)}, timedelta(seconds=120))
+        
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)):
+            resolved = await get_current_user_from_token(token, db=MagicMock())
+        
+        assert resolved == Principal(user.id, user.email, user.role, user.is_active, user.workspace_id)
+        key, principal = cache.set.call_args.args
+        assert token not in key
+        assert principal["role"] == "manager"
+        assert 0 < cache.set.call_args.kwargs["ttl"] <= 120
+        assert cache.set.call_args.kwargs["namespace"] == CacheNamespace.AUTH_PRINCIPALS
+        assert cache.set.call_args.kwargs["tags"] == [f"auth_user:{user.id}"]
+        
+        # The next request is served from the cache, without the database
+        cache.get.return_value = principal
+        user_service.reset_mock()
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)):
+            cached = await get_current_user_from_token(token, db=MagicMock())
+        
+        assert cached == resolved
+        user_service.assert_not_called()
+    
+    async def test_endpoint_user_loaded_on_cache_hit(self, user, cache, user_service):
+        """Test that get_current_user returns the full user row when the principal is cached."""
+        token = create_access_token({"sub": str(user.id)})
+        credentials = SimpleNamespace(credentials=token)
+        cache.get.return_value = {
+            "id": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "is_active": user.is_active,
+            "workspace_id": str(user.workspace_id)
+        }
+        
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)), \
+             patch('core.security.verify_token') as verify_token:
+            resolved = await get_current_user(credentials, db=MagicMock())
+        
+        assert resolved is user
+        user_service.return_value.get_user_by_id.assert_awaited_once_with(user.id)
+        verify_token.assert_not_called()
+    
+    async def test_endpoint_principal_served_without_database(self, user, cache, user_service):
+        """Test that a cached request reaches the endpoint without loading the user row."""
+        token = create_access_token({"sub": str(user.id)})
+        credentials = SimpleNamespace(credentials=token)
+        request = SimpleNamespace(state=SimpleNamespace())
+        cache.get.return_value = {
+            "id": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "is_active": user.is_active,
+            "workspace_id": str(user.workspace_id)
+        }
+        
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)):
+            # The middleware resolves the principal first, the endpoint reuses it
+            await get_current_user_from_token(token, request)
+            principal = await get_current_active_user(
+                await get_current_principal(credentials, db=MagicMock(), request=request)
+            )
+        
+        assert principal is request.state.principal
+        assert principal.workspace_id == user.workspace_id
+        assert cache.get.await_count == 1
+        user_service.return_value.get_user_by_id.assert_not_called()
+    
+    async def test_resolved_once_per_request(self, user, cache, user_service):
+        """Test that the user is kept on request.state for later lookups."""
+        token = create_access_token({"sub": str(user.id)})
+        request = SimpleNamespace(state=SimpleNamespace())
+        
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)):
+            first = await get_current_user_from_token(token, request, db=MagicMock())
+            second = await get_current_user_from_token(token, request, db=MagicMock())
+        
+        assert first is second is request.state.principal
+        assert cache.get.await_count == 1
+    
+    async def test_invalidate_user_principals(self, user, cache):
+        """Test that a user's cached principals are dropped by tag."""
+        with patch('core.security.get_cache', AsyncMock(return_value=cache)):
+            await invalidate_user_principals(user.id)
+        
+        cache.delete_by_tag.assert_awaited_once_with(f"auth_user:{user.id}")
+
+
 class TestInputValidation:
     """Test input validation security."""
     
@@ -153,7 +286,7 @@ class TestRateLimitingSecurity:
         # Simulate multiple requests from same IP
         for _ in range(5):
             response = await client.get("/health")
-            
+        
         # Eventually should hit rate limit (if configured)
         # This test depends on actual rate limiting configuration
         assert response.status_code in [200, 429]
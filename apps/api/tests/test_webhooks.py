@@ -6,8 +6,11 @@ import json
 import hmac
 import hashlib
 import base64
+from contextlib import asynccontextmanager
 from datetime import datetime
-from unittest.mock import patch, AsyncMock
+from types import SimpleNamespace
+from uuid import uuid4
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from httpx import AsyncClient
 
@@ -674,5 +677,149 @@ class TestWebhookHealth:
             assert "events_by_type" in data
 
 
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the webhook worker uses."""
+    
+    def __init__(self):
+        self.values = {}
+    
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+    
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+class TestWebhookEventProcessing:
+    """Test the webhook worker from provider event to lead score."""
+    
+    @pytest.fixture
+    def event_data(self):
+        """An SES open as the webhook routers queue it."""
+        return {
+            "provider": "ses",
+            "event_type": "Open",
+            "message_id": "ses_msg_123",
+            "recipient_email": "recipient@example.com",
+            "timestamp": "2024-01-15T10:30:00",
+            "event_data": {"eventType": "Open"}
+        }
+    
+    @pytest.fixture
+    def worker(self):
+        """Patch the worker's database, Redis and full score recalculation."""
+        email_event = MagicMock(id=uuid4(), lead_id=uuid4(), workspace_id=uuid4(), open_count=0)
+        lead_score = SimpleNamespace(scoring_factors={
+            "engagement_breakdown": {
+                "email_opens": 2,
+                "email_clicks": 1,
+                "email_replies": 0,
+                "open_points": 5,
+                "last_engagement": "2024-01-10T08:00:00"
+            }
+        })
+        
+        # The stored score is read by the scoring service, the event by the worker
+        async def execute(statement, *args, **kwargs):
+            row = lead_score if "lead_scores" in str(statement) else email_event
+            return MagicMock(scalar_one_or_none=MagicMock(return_value=row))
+        
+        db = AsyncMock()
+        db.execute.side_effect = execute
+        savepoint = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False))
+        db.begin_nested = MagicMock(return_value=savepoint)
+        
+        @asynccontextmanager
+        async def get_async_session():
+            yield db
+        
+        redis = FakeRedis()
+        
+        # The event lookup and status update are stubbed with the session
+        with patch("workers.webhook_tasks.get_async_session", get_async_session), \
+                patch("workers.webhook_tasks.get_redis", AsyncMock(return_value=redis)), \
+                patch("workers.webhook_tasks.EmailEvent", MagicMock()), \
+                patch("workers.webhook_tasks.select", MagicMock()), \
+                patch("workers.webhook_tasks._update_email_event", AsyncMock()), \
+                patch("workers.webhook_tasks._update_statistics", AsyncMock()), \
+                patch("workers.webhook_tasks._update_deliverability_cache", AsyncMock()), \
+                patch("workers.webhook_tasks._handle_special_events", AsyncMock()), \
+                patch("services.lead_scoring_service.LeadScoringService.calculate_lead_score",
+                      AsyncMock()) as score:
+            yield MagicMock(db=db, redis=redis, email_event=email_event, score=score)
+    
+    def test_event_updates_lead_score(self, worker, event_data):
+        """Test that a processed SES open is applied to the lead's score and committed."""
+        from workers.webhook_tasks import process_webhook_event
+        
+        process_webhook_event(event_data)
+        
+        worker.score.assert_awaited_once_with(
+            str(worker.email_event.lead_id),
+            str(worker.email_event.workspace_id),
+            "email_opened",
+            engagement={
+                "opens": 3,
+                "clicks": 1,
+                "replies": 0,
+                "open_points": 5,
+                "last_engagement": datetime(2024, 1, 15, 10, 30)
+            }
+        )
+        worker.db.commit.assert_awaited_once()
+    
+    @pytest.mark.parametrize("provider,event_type", [
+        ("ses", "Click"),
+        ("sendgrid", "click"),
+        ("postmark", "Click"),
+        ("mailgun", "clicked"),
+    ])
+    def test_provider_event_types_normalized(self, worker, event_data, provider, event_type):
+        """Test that each provider's click reaches the scoring service as a click."""
+        from workers.webhook_tasks import process_webhook_event
+        
+        process_webhook_event(dict(event_data, provider=provider, event_type=event_type))
+        
+        assert worker.score.call_args.args[2] == "email_clicked"
+        assert worker.score.call_args.kwargs["engagement"]["clicks"] == 2
+    
+    def test_redelivered_event_applied_once(self, worker, event_data):
+        """Test that a provider redelivering an event does not score it twice."""
+        from workers.webhook_tasks import process_webhook_event
+        
+        process_webhook_event(event_data)
+        process_webhook_event(dict(event_data))
+        
+        assert worker.score.await_count == 1
+        assert worker.db.commit.await_count == 1
+    
+    def test_failed_event_processed_on_retry(self, worker, event_data):
+        """Test that an event whose transaction failed is not marked processed."""
+        from workers.webhook_tasks import process_webhook_event
+        
+        worker.db.commit.side_effect = [RuntimeError("connection lost"), None]
+        
+        with pytest.raises(RuntimeError):
+            process_webhook_event(event_data)
+        process_webhook_event(event_data)
+        
+        assert worker.score.await_count == 2
+        assert worker.db.commit.await_count == 2
+    
+    def test_scoring_failure_keeps_event(self, worker, event_data):
+        """Test that a scoring error is contained in its savepoint."""
+        from workers.webhook_tasks import process_webhook_event
+        
+        worker.score.side_effect = ValueError("Lead not found")
+        
+        process_webhook_event(event_data)
+        
+        worker.db.begin_nested.assert_called_once()
+        worker.db.commit.assert_awaited_once()
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
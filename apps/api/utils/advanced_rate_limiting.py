@@ -3,6 +3,11 @@ Advanced rate limiting utilities for ColdCopy API.
 """
 import logging
 import asyncio
+import math
+import os
+import socket
+import time
+import zlib
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -146,124 +151,251 @@ class AdaptiveRateLimiter:
         )
 
 
+class _GlobalView:
+    """Last known fleet-wide usage of one identifier and window."""
+    
+    __slots__ = ("index", "current", "previous", "previous_final", "last_used")
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.current = 0
+        self.previous = 0
+        # The previous interval stops changing once every node has flushed
+        self.previous_final = False
+        self.last_used = time.time()
+
+
 class DistributedRateLimiter:
     """
     Distributed rate limiter for multi-instance deployments.
+    
+    Each node admits requests against its last known view of global usage
+    plus what it admitted itself since, without touching Redis. Every
+    flush_interval the node adds its counts to sharded Redis hashes, one hash
+    per shard, window and interval with one field per identifier, and reads
+    back the totals of the identifiers it serves with one HMGET per shard, all
+    in a single pipeline. Usage slides over the current and previous
+    intervals like RATE_LIMIT_SCRIPT in core.redis.
+    
+    A node that admits max_error / node_count of the limit between flushes
+    syncs right away, so other nodes can add at most max_error of the limit
+    to what a node sees and the global limit is exceeded by at most that
+    much. Unless node_count is given, nodes announce themselves in a Redis
+    sorted set on every sync and count the nodes seen in the last
+    node_timeout seconds. A node that just joined is counted from the
+    others' next sync. Interval boundaries come from each node's clock, so
+    nodes should run NTP.
     """
     
-    def __init__(self, node_id: str = "default"):
-        self.node_id = node_id
+    def __init__(
+        self,
+        node_id: Optional[str] = None,
+        shards: int = 64,
+        flush_interval: float = 1.0,
+        max_error: float = 0.05,
+        node_count: Optional[int] = None,
+        node_timeout: float = 30.0
+    ):
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}"
         self.coordination_key_prefix = "distributed_limit"
+        self.shards = shards
+        self.flush_interval = flush_interval
+        self.max_error = max_error
+        self.node_count = node_count
+        self.node_timeout = max(node_timeout, 2 * flush_interval)
+        
+        # Live nodes as of the last sync
+        self._live_nodes = node_count or 1
+        # Admissions not yet flushed, by (identifier, window) then interval
+        self._pending: Dict[Tuple[str, int], Dict[int, int]] = {}
+        self._views: Dict[Tuple[str, int], _GlobalView] = {}
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def check_distributed_limit(
         self,
         identifier: str,
         global_limit: int,
-        window_seconds: int,
-        node_count: int = 1
+        window_seconds: int
     ) -> RateLimitStatus:
         """Check rate limit across distributed nodes."""
+        key = (identifier, window_seconds)
+        self._ensure_flusher()
         
-        # Calculate per-node limit (with some overlap for burst handling)
-        per_node_limit = max(1, int(global_limit / node_count * 1.2))
+        # First request for this identifier on this node, read the global view
+        if key not in self._views:
+            await self._sync([key])
         
-        rate_cache = await get_rate_limit_cache()
-        
-        # Check local node limit first
-        local_result = await rate_cache.check_rate_limit(
-            f"local:{self.node_id}:{identifier}",
-            per_node_limit,
-            window_seconds,
-            1
-        )
+        # Share of the allowed error this node may admit between syncs
+        budget = max(1, int(global_limit * self.max_error / max(self._live_nodes, 1)))
+        if sum(self._pending.get(key, {}).values()) >= budget:
+            await self._sync([key])
         
-        if not local_result["allowed"]:
-            return RateLimitStatus(
-                allowed=False,
-                current_usage=local_result["current_usage"],
-                limit=per_node_limit,
-                window_seconds=window_seconds,
-                remaining=0,
-                reset_time=local_result["reset_time"],
-                retry_after=local_result.get("retry_after"),
-                error_message="Local node limit exceeded"
-            )
+        now = time.time()
+        index = int(now // window_seconds)
+        usage = self._estimate_usage(key, index, now)
+        reset_time = (datetime.utcnow() + timedelta(seconds=window_seconds)).isoformat()
         
-        # Check global limit across all nodes
-        global_usage = await self._get_global_usage(identifier, window_seconds)
+        view = self._views.get(key)
+        if view is not None:
+            view.last_used = now
         
-        if global_usage >= global_limit:
+        if usage + 1 > global_limit:
+            retry_after = math.ceil((index + 1) * window_seconds - now)
             return RateLimitStatus(
                 allowed=False,
-                current_usage=global_usage,
+                current_usage=int(usage),
                 limit=global_limit,
                 window_seconds=window_seconds,
                 remaining=0,
-                reset_time=local_result["reset_time"],
+                reset_time=reset_time,
+                retry_after=retry_after,
                 error_message="Global limit exceeded"
             )
         
-        # Update global usage
-        await self._update_global_usage(identifier, window_seconds)
+        counts = self._pending.setdefault(key, {})
+        counts[index] = counts.get(index, 0) + 1
         
         return RateLimitStatus(
             allowed=True,
-            current_usage=global_usage + 1,
+            current_usage=int(usage) + 1,
             limit=global_limit,
             window_seconds=window_seconds,
-            remaining=global_limit - global_usage - 1,
-            reset_time=local_result["reset_time"]
+            remaining=max(0, global_limit - int(usage) - 1),
+            reset_time=reset_time
         )
     
-    async def _get_global_usage(self, identifier: str, window_seconds: int) -> int:
-        """Get global usage across all nodes."""
-        rate_cache = await get_rate_limit_cache()
-        
-        # Use a sliding window approach
-        now = datetime.utcnow()
-        window_start = now - timedelta(seconds=window_seconds)
-        
-        # Get usage from all nodes in the time window
-        pattern = f"{self.coordination_key_prefix}:*:{identifier}"
-        keys = await rate_cache.cache.redis.keys(pattern)
-        
-        total_usage = 0
-        for key in keys:
-            usage_data = await rate_cache.cache.get(key, [])
-            if isinstance(usage_data, list):
-                # Filter timestamps within window
-                valid_timestamps = [
-                    ts for ts in usage_data 
-                    if datetime.fromisoformat(ts) > window_start
-                ]
-                total_usage += len(valid_timestamps)
-        
-        return total_usage
+    def _estimate_usage(self, key: Tuple[str, int], index: int, now: float) -> float:
+        """Sliding window usage from the global view and unflushed admissions."""
+        window_seconds = key[1]
+        current = previous = 0
+        
+        view = self._views.get(key)
+        if view is not None:
+            if view.index == index:
+                current, previous = view.current, view.previous
+            elif view.index == index - 1:
+                previous = view.current
+        
+        counts = self._pending.get(key, {})
+        current += counts.get(index, 0)
+        previous += counts.get(index - 1, 0)
+        
+        overlap = 1 - (now - index * window_seconds) / window_seconds
+        return previous * overlap + current
     
-    async def _update_global_usage(self, identifier: str, window_seconds: int):
-        """Update global usage tracking."""
-        rate_cache = await get_rate_limit_cache()
-        
-        key = f"{self.coordination_key_prefix}:{self.node_id}:{identifier}"
-        now = datetime.utcnow()
-        
-        # Get current usage list
-        usage_list = await rate_cache.cache.get(key, [])
-        if not isinstance(usage_list, list):
-            usage_list = []
-        
-        # Add current timestamp
-        usage_list.append(now.isoformat())
-        
-        # Clean old timestamps
-        window_start = now - timedelta(seconds=window_seconds)
-        usage_list = [
-            ts for ts in usage_list 
-            if datetime.fromisoformat(ts) > window_start
-        ]
+    def _hash_key(self, prefix: str, identifier: str, window_seconds: int, index: int) -> str:
+        shard = zlib.crc32(identifier.encode()) % self.shards
+        return f"{prefix}:{self.coordination_key_prefix}:{window_seconds}:{shard}:{index}"
+    
+    async def _sync(self, keys: List[Tuple[str, int]]):
+        """Flush pending counts for keys and refresh their global view, in one round trip."""
+        now = time.time()
+        taken = {key: self._pending.pop(key) for key in keys if key in self._pending}
         
-        # Store updated list
-        await rate_cache.cache.set(key, usage_list, window_seconds * 2)
+        try:
+            rate_cache = await get_rate_limit_cache()
+            prefix = rate_cache.cache.prefix
+            pipe = rate_cache.cache.redis.pipeline(transaction=False)
+            
+            if self.node_count is None:
+                nodes_key = f"{prefix}:{self.coordination_key_prefix}:nodes"
+                pipe.zadd(nodes_key, {self.node_id: now})
+                pipe.zremrangebyscore(nodes_key, 0, now - self.node_timeout)
+                pipe.expire(nodes_key, math.ceil(self.node_timeout))
+                pipe.zcard(nodes_key)
+            
+            for (identifier, window_seconds), counts in taken.items():
+                for index, count in counts.items():
+                    if index < int(now // window_seconds) - 1:
+                        continue  # Already slid out of the window
+                    hash_key = self._hash_key(prefix, identifier, window_seconds, index)
+                    pipe.hincrby(hash_key, identifier, count)
+                    pipe.expireat(hash_key, math.ceil((index + 2) * window_seconds + self.flush_interval))
+            
+            # Fields to read, grouped per hash so each hash is one HMGET
+            reads: Dict[str, List[Tuple[Tuple[str, int], str]]] = {}
+            for key in keys:
+                identifier, window_seconds = key
+                index = int(now // window_seconds)
+                view = self._views.get(key)
+                
+                reads.setdefault(
+                    self._hash_key(prefix, identifier, window_seconds, index), []
+                ).append((key, "current"))
+                if view is None or view.index != index or not view.previous_final:
+                    reads.setdefault(
+                        self._hash_key(prefix, identifier, window_seconds, index - 1), []
+                    ).append((key, "previous"))
+            
+            for hash_key, fields in reads.items():
+                pipe.hmget(hash_key, [identifier for (identifier, _), _ in fields])
+            
+            results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to sync distributed rate limits: {e}")
+            # Keep the counts for the next flush
+            for key, counts in taken.items():
+                pending = self._pending.setdefault(key, {})
+                for index, count in counts.items():
+                    pending[index] = pending.get(index, 0) + count
+            return
+        
+        if self.node_count is None:
+            self._live_nodes = max(1, results[3])
+        
+        fetched = results[len(results) - len(reads):]
+        for (_, fields), values in zip(reads.items(), fetched):
+            for (key, slot), value in zip(fields, values):
+                index = int(now // key[1])
+                view = self._views.get(key)
+                if view is None or view.index != index:
+                    view = _GlobalView(index)
+                    if key in self._views:
+                        view.last_used = self._views[key].last_used
+                    self._views[key] = view
+                
+                if slot == "current":
+                    view.current = int(value or 0)
+                else:
+                    view.previous = int(value or 0)
+                    view.previous_final = now - index * key[1] > 2 * self.flush_interval
+    
+    async def flush(self):
+        """Flush every pending count and refresh the views still in use."""
+        now = time.time()
+        
+        # Forget identifiers idle for a whole window
+        for key in [key for key, view in self._views.items() if now - view.last_used > key[1]]:
+            if key not in self._pending:
+                del self._views[key]
+        
+        keys = list(set(self._views) | set(self._pending))
+        if keys:
+            await self._sync(keys)
+    
+    def _ensure_flusher(self):
+        """Start the background flush on first use, inside the running loop."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Distributed rate limit flush error: {e}")
+    
+    async def close(self):
+        """Stop the background flush and flush what is left."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
 
 
 class CircuitBreakerRateLimit:
@@ -363,7 +495,7 @@ class CircuitBreakerRateLimit:
             # Update circuit state
             await rate_cache.cache.set(circuit_key, circuit_state, 3600)
             return result
-            
+        
         except Exception as e:
             # Exception during check - treat as failure
             circuit_state["failure_count"] += 1
@@ -0,0 +1,176 @@
+"""
+Fleet-wide cache access patterns for predictive warming.
+
+Every process counts cache reads in memory and periodically flushes them to
+Redis, one sorted set per namespace and time bucket (member: cache key,
+score: reads) plus a HyperLogLog of the distinct keys read in that bucket.
+Each sorted set is trimmed to its hottest keys and every bucket expires after
+the retention window, so the model's memory is bounded by namespaces x
+buckets x max_keys_per_bucket however many keys are read. Predictions merge a
+handful of buckets with ZUNIONSTORE, so their cost depends on the number of
+hot keys, not on the size of the keyspace.
+"""
+import logging
+import math
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+
+
+class AccessPatternModel:
+    """
+    Time-bucketed read counts shared by every API process.
+    
+    A prediction for the next bucket weighs the last recent_buckets with an
+    exponential decay (recency), plus the buckets around the same time one day
+    and one week ago (daily and weekly seasonality).
+    """
+    
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        prefix: str = "coldcopy",
+        bucket_seconds: int = 300,
+        retention_seconds: int = 8 * DAY_SECONDS,
+        max_keys_per_bucket: int = 1000,
+        max_pending: int = 10000,
+        recent_buckets: int = 12,
+        half_life_buckets: float = 3.0,
+        seasonal_weight: float = 0.5
+    ):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.max_keys_per_bucket = max_keys_per_bucket
+        self.max_pending = max_pending
+        self.recent_buckets = recent_buckets
+        self.half_life_buckets = half_life_buckets
+        self.seasonal_weight = seasonal_weight
+        
+        # Reads not yet flushed, by (namespace, bucket)
+        self._pending: Dict[Tuple[str, int], Counter] = {}
+        self._pending_keys = 0
+        self.dropped = 0
+    
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+    
+    def _hits_key(self, namespace: str, bucket: int) -> str:
+        return f"{self.prefix}:warming:hits:{namespace}:{bucket}"
+    
+    def _keys_key(self, namespace: str, bucket: int) -> str:
+        return f"{self.prefix}:warming:keys:{namespace}:{bucket}"
+    
+    @property
+    def pending(self) -> int:
+        """Distinct keys waiting to be flushed."""
+        return self._pending_keys
+    
+    def record(self, namespace: str, key: str, timestamp: Optional[float] = None):
+        """Count one read. Never touches Redis, so it is safe on the hot path."""
+        bucket = self._bucket(timestamp if timestamp is not None else time.time())
+        counts = self._pending.setdefault((namespace, bucket), Counter())
+        
+        if key not in counts:
+            # Bounded until the next flush, new keys are dropped once full
+            if self._pending_keys >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending_keys += 1
+        
+        counts[key] += 1
+    
+    async def flush(self) -> int:
+        """Write pending reads to Redis in one round trip."""
+        if not self._pending:
+            return 0
+        
+        pending, self._pending, self._pending_keys = self._pending, {}, 0
+        pipe = self.redis.pipeline(transaction=False)
+        
+        for (namespace, bucket), counts in pending.items():
+            hits_key = self._hits_key(namespace, bucket)
+            keys_key = self._keys_key(namespace, bucket)
+            expire_at = (bucket + 1) * self.bucket_seconds + self.retention_seconds
+            
+            for key, count in counts.items():
+                pipe.zincrby(hits_key, count, key)
+            # Keep only the hottest keys of the bucket
+            pipe.zremrangebyrank(hits_key, 0, -(self.max_keys_per_bucket + 1))
+            pipe.pfadd(keys_key, *counts.keys())
+            pipe.expireat(hits_key, expire_at)
+            pipe.expireat(keys_key, expire_at)
+        
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to flush cache access patterns: {e}")
+            return 0
+        
+        return sum(len(counts) for counts in pending.values())
+    
+    def _prediction_weights(self, now: float) -> Dict[int, float]:
+        """Bucket weights for predicting the bucket after now."""
+        current = self._bucket(now)
+        weights: Dict[int, float] = {}
+        
+        for age in range(self.recent_buckets):
+            weights[current - age] = math.pow(0.5, age / self.half_life_buckets)
+        
+        for period in (DAY_SECONDS, 7 * DAY_SECONDS):
+            seasonal = self._bucket(now - period)
+            for bucket in (seasonal, seasonal + 1):
+                weights[bucket] = weights.get(bucket, 0.0) + self.seasonal_weight
+        
+        return weights
+    
+    async def predict(
+        self,
+        namespace: str,
+        limit: int,
+        now: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """The keys most likely to be read in the next bucket, with scores."""
+        if limit <= 0:
+            return []
+        
+        weights = self._prediction_weights(now if now is not None else time.time())
+        sources = {
+            self._hits_key(namespace, bucket): weight
+            for bucket, weight in weights.items()
+        }
+        scratch_key = f"{self.prefix}:warming:predict:{uuid.uuid4().hex}"
+        
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zunionstore(scratch_key, sources)
+            pipe.zrevrange(scratch_key, 0, limit - 1, withscores=True)
+            pipe.delete(scratch_key)
+            _, ranked, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to predict cache accesses for {namespace}: {e}")
+            return []
+        
+        return [
+            (key.decode() if isinstance(key, bytes) else key, score)
+            for key, score in ranked
+        ]
+    
+    async def working_set_size(self, namespace: str, now: Optional[float] = None) -> int:
+        """Estimated distinct keys read across the fleet over the recent buckets."""
+        current = self._bucket(now if now is not None else time.time())
+        keys = [self._keys_key(namespace, current - age) for age in range(self.recent_buckets)]
+        
+        try:
+            return await self.redis.pfcount(*keys)
+        except Exception as e:
+            logger.error(f"Failed to count cache working set for {namespace}: {e}")
+            return 0
@@ -0,0 +1,197 @@
+"""
+Serialization codecs and compressors for cached values.
+
+Every codec and compressor has a small numeric id that CacheManager records
+in the value envelope, so readers always know how a value was written even
+when namespaces change their configuration. The fast codecs are optional
+dependencies: when one is not installed, writers fall back to the standard
+library and values already written with it fail to decode and count as misses.
+"""
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+# Codec ids, stored in the low three bits of the envelope header
+CODEC_JSON = 0
+CODEC_BYTES = 1
+CODEC_ORJSON = 2
+CODEC_MSGPACK = 3
+
+# Compression ids, stored in bits three to five of the envelope header
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Turns values into bytes and back."""
+    codec_id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    """Compresses serialized payloads."""
+    compression_id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[int, Codec] = {
+    CODEC_JSON: Codec(CODEC_JSON, "json", _json_dumps, _json_loads),
+    # Raw bytes are stored as is and come back as bytes
+    CODEC_BYTES: Codec(CODEC_BYTES, "bytes", bytes, bytes),
+}
+
+COMPRESSORS: Dict[int, Compressor] = {
+    COMPRESSION_ZLIB: Compressor(COMPRESSION_ZLIB, "zlib", zlib.compress, zlib.decompress),
+}
+
+if orjson is not None:
+    CODECS[CODEC_ORJSON] = Codec(CODEC_ORJSON, "orjson", _orjson_dumps, orjson.loads)
+else:
+    # orjson output is plain JSON, so it stays readable without the library
+    CODECS[CODEC_ORJSON] = Codec(CODEC_ORJSON, "orjson", _json_dumps, _json_loads)
+
+if msgpack is not None:
+    CODECS[CODEC_MSGPACK] = Codec(CODEC_MSGPACK, "msgpack", _msgpack_dumps, _msgpack_loads)
+
+if zstandard is not None:
+    COMPRESSORS[COMPRESSION_ZSTD] = Compressor(
+        COMPRESSION_ZSTD,
+        "zstd",
+        zstandard.ZstdCompressor(level=3).compress,
+        zstandard.ZstdDecompressor().decompress
+    )
+
+if lz4_frame is not None:
+    COMPRESSORS[COMPRESSION_LZ4] = Compressor(
+        COMPRESSION_LZ4,
+        "lz4",
+        lz4_frame.compress,
+        lz4_frame.decompress
+    )
+
+CODECS_BY_NAME: Dict[str, Codec] = {codec.name: codec for codec in CODECS.values()}
+COMPRESSORS_BY_NAME: Dict[str, Compressor] = {c.name: c for c in COMPRESSORS.values()}
+
+# Preference order when a configured codec is not installed
+CODEC_FALLBACKS = {"msgpack": "orjson", "orjson": "json"}
+COMPRESSION_FALLBACKS = {"zstd": "zlib", "lz4": "zlib"}
+
+
+@lru_cache(maxsize=None)
+def _warn_fallback(kind: str, name: str, fallback: str):
+    """Log a missing optional codec once per process."""
+    logger.warning(f"Cache {kind} {name} is not installed, using {fallback}")
+
+
+def fast_json_dumps(value: Any) -> bytes:
+    """Encode JSON with orjson when installed, the standard library otherwise."""
+    return CODECS[CODEC_ORJSON].dumps(value)
+
+
+def fast_json_loads(data: Any) -> Any:
+    """Decode JSON text or bytes with orjson when installed."""
+    return CODECS[CODEC_ORJSON].loads(data)
+
+
+@dataclass(frozen=True)
+class SerializationConfig:
+    """
+    How a namespace serializes its values.
+    
+    Payloads of at least compress_threshold bytes are compressed even when
+    the caller did not ask for it; None leaves it to the caller. The
+    threshold only applies when the configured compressor is installed.
+    """
+    codec: str = "orjson"
+    compression: str = "zlib"
+    compress_threshold: Optional[int] = None
+    
+    def resolve(self) -> "ResolvedSerialization":
+        """Pick the configured codecs, or the closest installed ones."""
+        codec_name = self.codec
+        while codec_name not in CODECS_BY_NAME:
+            fallback = CODEC_FALLBACKS.get(codec_name, "json")
+            _warn_fallback("codec", codec_name, fallback)
+            codec_name = fallback
+        
+        compression_name = self.compression
+        compress_threshold = self.compress_threshold
+        while compression_name not in COMPRESSORS_BY_NAME:
+            fallback = COMPRESSION_FALLBACKS.get(compression_name, "zlib")
+            _warn_fallback("compression", compression_name, fallback)
+            compression_name = fallback
+            # The fallbacks are too slow to apply to every large payload
+            compress_threshold = None
+        
+        return ResolvedSerialization(
+            CODECS_BY_NAME[codec_name],
+            COMPRESSORS_BY_NAME[compression_name],
+            compress_threshold
+        )
+
+
+@dataclass(frozen=True)
+class ResolvedSerialization:
+    """A SerializationConfig bound to installed codecs."""
+    codec: Codec
+    compressor: Compressor
+    compress_threshold: Optional[int]
+    
+    def should_compress(self, size: int, requested: bool) -> bool:
+        """Compress when asked to, or when the payload crosses the threshold."""
+        if requested:
+            return True
+        return self.compress_threshold is not None and size >= self.compress_threshold
@@ -9,7 +9,7 @@ import logging
 from typing import Any, Callable, Dict, List, Optional, Union
 from datetime import datetime, timedelta
 
-from core.redis import get_cache_manager
+from utils.cache_manager import CacheNamespace, get_cache
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +20,16 @@ def cache_result(
     include_user: bool = True,
     include_workspace: bool = True,
     exclude_params: Optional[List[str]] = None,
-    vary_on: Optional[List[str]] = None
+    vary_on: Optional[List[str]] = None,
+    namespace: CacheNamespace = CacheNamespace.API_RESPONSES,
+    beta: float = 1.0
 ):
     """
     Decorator to cache function results in Redis.
     
+    Concurrent misses for the same key run the function once and hot keys
+    are refreshed shortly before they expire (see CacheManager.get_or_compute).
+    
     Args:
         ttl_seconds: Time to live in seconds
         key_prefix: Prefix for cache key
@@ -32,12 +37,18 @@ def cache_result(
         include_workspace: Include workspace ID in cache key
         exclude_params: Parameters to exclude from cache key
         vary_on: Specific parameters to include in cache key
+        namespace: Cache namespace
+        beta: Early refresh eagerness, 0 disables it
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Get cache manager
-            cache_manager = await get_cache_manager()
+            try:
+                cache_manager = await get_cache()
+            except Exception as e:
+                logger.error(f"Cache unavailable, calling {func.__name__} directly: {str(e)}")
+                return await func(*args, **kwargs)
             
             # Generate cache key
             cache_key = _generate_cache_key(
@@ -51,26 +62,15 @@ def cache_result(
                 vary_on
             )
             
-            # Try to get from cache
-            try:
-                cached_result = await cache_manager.get(cache_key)
-                if cached_result is not None:
-                    logger.debug(f"Cache hit for key: {cache_key}")
-                    return cached_result
-            except Exception as e:
-                logger.error(f"Cache get error for key {cache_key}: {str(e)}")
-            
-            # Execute function if not in cache
-            result = await func(*args, **kwargs)
-            
-            # Store result in cache
-            try:
-                await cache_manager.set(cache_key, result, ttl_seconds)
-                logger.debug(f"Cached result for key: {cache_key}")
-            except Exception as e:
-                logger.error(f"Cache set error for key {cache_key}: {str(e)}")
-            
-            return result
+            # Get from cache, or execute the function once for all concurrent callers
+            return await cache_manager.get_or_compute(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl_seconds,
+                namespace=namespace,
+                tags=_generate_cache_tags(kwargs, key_prefix, include_user, include_workspace),
+                beta=beta
+            )
         
         return wrapper
     return decorator
@@ -80,16 +80,21 @@ def cache_invalidate(
     pattern: str = "",
     key_prefix: str = "",
     include_user: bool = True,
-    include_workspace: bool = True
+    include_workspace: bool = True,
+    namespace: CacheNamespace = CacheNamespace.API_RESPONSES
 ):
     """
     Decorator to invalidate cache entries after function execution.
     
+    Without a pattern, the entries cached by cache_result with the same
+    key_prefix, workspace and user are looked up in the tag index.
+    
     Args:
         pattern: Pattern to match cache keys for invalidation
         key_prefix: Prefix for cache key pattern
         include_user: Include user ID in pattern
         include_workspace: Include workspace ID in pattern
+        namespace: Cache namespace the entries were cached in
     """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -98,21 +103,25 @@ def cache_invalidate(
             
             # Invalidate cache after successful execution
             try:
-                cache_manager = await get_cache_manager()
-                
-                # Generate invalidation pattern
-                invalidation_pattern = _generate_invalidation_pattern(
-                    pattern,
-                    args,
-                    kwargs,
-                    key_prefix,
-                    include_user,
-                    include_workspace
-                )
+                cache_manager = await get_cache()
                 
-                # Clear matching cache entries
-                cleared_count = await cache_manager.clear_pattern(invalidation_pattern)
-                logger.debug(f"Invalidated {cleared_count} cache entries with pattern: {invalidation_pattern}")
+                if pattern:
+                    # Clear matching cache entries
+                    cleared_count = await cache_manager.delete_pattern(pattern, namespace)
+                    logger.debug(f"Invalidated {cleared_count} cache entries with pattern: {pattern}")
+                else:
+                    # Clear entries registered under the tag
+                    tag = _generate_invalidation_tag(
+                        kwargs,
+                        key_prefix,
+                        include_user,
+                        include_workspace
+                    )
+                    if tag:
+                        cleared_count = await cache_manager.delete_by_tag(tag)
+                    else:
+                        cleared_count = await cache_manager.clear_namespace(namespace)
+                    logger.debug(f"Invalidated {cleared_count} cache entries with tag: {tag or '*'}")
                 
             except Exception as e:
                 logger.error(f"Cache invalidation error: {str(e)}")
@@ -357,40 +366,70 @@ def _generate_cache_key(
     return ":".join(str(part) for part in key_parts)
 
 
-def _generate_invalidation_pattern(
-    pattern: str,
-    args: tuple,
+def _context_parts(
     kwargs: dict,
-    key_prefix: str,
     include_user: bool,
     include_workspace: bool
-) -> str:
-    """Generate cache invalidation pattern."""
+) -> List[str]:
+    """Workspace and user components shared by cache tags."""
     
-    if pattern:
-        return pattern
-    
-    pattern_parts = []
-    
-    if key_prefix:
-        pattern_parts.append(key_prefix)
+    parts = []
     
     # Add workspace context if available
     if include_workspace:
         if 'workspace_id' in kwargs:
-            pattern_parts.append(f"workspace:{kwargs['workspace_id']}")
+            parts.append(f"workspace:{kwargs['workspace_id']}")
         elif 'current_user' in kwargs and hasattr(kwargs['current_user'], 'workspace_id'):
-            pattern_parts.append(f"workspace:{kwargs['current_user'].workspace_id}")
+            parts.append(f"workspace:{kwargs['current_user'].workspace_id}")
     
     # Add user context if requested
     if include_user and 'current_user' in kwargs:
         user = kwargs['current_user']
         if hasattr(user, 'id'):
-            pattern_parts.append(f"user:{user.id}")
+            parts.append(f"user:{user.id}")
+    
+    return parts
+
+
+def _generate_cache_tags(
+    kwargs: dict,
+    key_prefix: str,
+    include_user: bool,
+    include_workspace: bool
+) -> List[str]:
+    """
+    Generate the tags a cached result is indexed under.
+    
+    One tag per combination of prefix, workspace and user, so any
+    invalidation cache_invalidate can build finds the entry, plus the
+    workspace's own tag.
+    """
+    
+    prefix = [key_prefix] if key_prefix else []
+    workspace = _context_parts(kwargs, False, include_workspace)
+    user = _context_parts(kwargs, include_user, False)
+    
+    tags = set(workspace)
+    for scope in ([], workspace, user, workspace + user):
+        parts = prefix + scope
+        if parts:
+            tags.add(":".join(str(part) for part in parts))
+    
+    return sorted(tags)
+
+
+def _generate_invalidation_tag(
+    kwargs: dict,
+    key_prefix: str,
+    include_user: bool,
+    include_workspace: bool
+) -> str:
+    """Generate the cache invalidation tag."""
     
-    pattern_parts.append("*")
+    tag_parts = [key_prefix] if key_prefix else []
+    tag_parts.extend(_context_parts(kwargs, include_user, include_workspace))
     
-    return ":".join(str(part) for part in pattern_parts)
+    return ":".join(str(part) for part in tag_parts)
 
 
 def _generate_memo_key(func_name: str, args: tuple, kwargs: dict) -> str:
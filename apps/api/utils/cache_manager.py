@@ -8,20 +8,108 @@ import json
 import logging
 import hashlib
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Callable, TypeVar, Generic
-from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Union, Callable, TypeVar, Generic
+from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
+import math
+import random
+import struct
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
 
 import redis.asyncio as redis
 from redis.asyncio.lock import Lock
-from redis.exceptions import RedisError, ConnectionError, TimeoutError
+from redis.exceptions import RedisError, ConnectionError, TimeoutError, LockError
+
+from utils.cache_codecs import (
+    CODEC_BYTES,
+    CODECS,
+    COMPRESSION_NONE,
+    COMPRESSORS,
+    ResolvedSerialization,
+    SerializationConfig,
+)
+from utils.cache_metrics import (
+    LATENCY_BUCKETS_MS,
+    SIZE_BUCKETS_BYTES,
+    Histogram,
+    render_cache_metrics,
+)
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Sentinel for a cache miss, since None can be a cached value
+_MISSING = object()
+
+# Every value written by CacheManager.set starts with one header byte. The top
+# two bits hold the envelope version (0b10 for v1, 0b11 for v2), so a header is
+# always >= 0x80 and never collides with legacy values, which are JSON text
+# (ASCII) or a zlib stream (0x78) described by a separate ":meta" hash. The low
+# bits name the compression and the codec of the payload that follows, see
+# utils.cache_codecs for the ids. A v2
+# header is followed by the time the value took to compute, in milliseconds as
+# a big-endian uint32, which drives probabilistic early refresh.
+ENVELOPE_V1 = 0x80
+ENVELOPE_V2 = 0xC0
+ENVELOPE_VERSION_MASK = 0xC0
+COMPUTE_TIME = struct.Struct(">I")
+COMPRESSION_SHIFT = 3
+COMPRESSION_MASK = 0x38
+CODEC_MASK = 0x07
+
+# Cached keys are indexed by tag in sorted sets scored by the key's expiry, so
+# invalidation reads only the affected keys instead of scanning the keyspace.
+# Expired members are pruned on write and each index expires with its
+# longest-lived member. Indexes left as plain sets by older writers are
+# converted in place.
+# KEYS: tag indexes. ARGV: cache key, its expiry timestamp ('+inf' for none), now.
+TAG_INDEX_SCRIPT = """
+for _, tag in ipairs(KEYS) do
+    if redis.call('TYPE', tag)['ok'] == 'set' then
+        local members = redis.call('SMEMBERS', tag)
+        redis.call('DEL', tag)
+        for _, member in ipairs(members) do
+            redis.call('ZADD', tag, ARGV[2], member)
+        end
+    end
+    redis.call('ZADD', tag, ARGV[2], ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', tag, '-inf', ARGV[3])
+    local last = redis.call('ZRANGE', tag, -1, -1, 'WITHSCORES')
+    if last[2] == 'inf' then
+        redis.call('PERSIST', tag)
+    else
+        redis.call('EXPIREAT', tag, math.ceil(tonumber(last[2])) + 1)
+    end
+end
+return #KEYS
+"""
+
+# Keys invalidated per round trip when draining a tag index
+TAG_CHUNK_SIZE = 500
+
+
+async def iter_tag_members(
+    client: redis.Redis,
+    tag_key: str,
+    chunk_size: int = TAG_CHUNK_SIZE
+):
+    """Pop the keys of a tag index in bounded chunks until it is empty."""
+    while True:
+        popped = await client.zpopmin(tag_key, chunk_size)
+        if not popped:
+            return
+        yield [member for member, _ in popped]
+
+
+def workspace_tag(workspace_id: Any) -> str:
+    """Tag every cached value of a workspace carries, whatever its namespace."""
+    return f"workspace:{workspace_id}"
+
 
 class CacheNamespace(Enum):
     """Cache namespaces for different data types."""
@@ -35,6 +123,7 @@ class CacheNamespace(Enum):
     CAMPAIGN_STATS = "campaign_stats"
     FEATURE_FLAGS = "feature_flags"
     RATE_LIMITS = "rate_limits"
+    AUTH_PRINCIPALS = "auth_principals"
 
 
 @dataclass
@@ -50,22 +139,127 @@ class CacheConfig:
     refresh_on_expire: bool = False
 
 
+@dataclass
+class LocalCacheConfig:
+    """Configuration for the in-process tier of a namespace."""
+    max_entries: int = 1024
+    ttl: float = 30.0  # Upper bound on staleness if an invalidation is missed
+
+
+# Codecs per namespace, the rest use SerializationConfig() (orjson, zlib on request).
+# Chosen from scripts/cache_codec_benchmark.py: orjson beats msgpack on every
+# payload shape we cache, zstd shrinks large AI, enrichment and analytics values
+# by 40-85%, and lz4 keeps hot API responses cheap to read.
+DEFAULT_SERIALIZATION: Dict[CacheNamespace, SerializationConfig] = {
+    CacheNamespace.AI_RESPONSES: SerializationConfig("orjson", "zstd", compress_threshold=1024),
+    CacheNamespace.LEAD_ENRICHMENT: SerializationConfig("orjson", "zstd", compress_threshold=1024),
+    CacheNamespace.ANALYTICS: SerializationConfig("orjson", "zstd", compress_threshold=4096),
+    CacheNamespace.CAMPAIGN_STATS: SerializationConfig("orjson", "zstd", compress_threshold=4096),
+    CacheNamespace.API_RESPONSES: SerializationConfig("orjson", "lz4", compress_threshold=4096),
+}
+
+
+# Small, hot namespaces served from process memory by default
+DEFAULT_LOCAL_CACHE: Dict[CacheNamespace, LocalCacheConfig] = {
+    CacheNamespace.WORKSPACE_SETTINGS: LocalCacheConfig(max_entries=2048, ttl=30),
+    CacheNamespace.FEATURE_FLAGS: LocalCacheConfig(max_entries=256, ttl=30),
+    CacheNamespace.AUTH_PRINCIPALS: LocalCacheConfig(max_entries=4096, ttl=30),
+}
+
+
 @dataclass
 class CacheStats:
-    """Cache performance statistics."""
+    """Cache performance statistics for one namespace."""
     hits: int = 0
+    local_hits: int = 0
     misses: int = 0
     errors: int = 0
     evictions: int = 0
-    avg_get_time_ms: float = 0.0
-    avg_set_time_ms: float = 0.0
+    sets: int = 0
     memory_usage_mb: float = 0.0
+    get_latency_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+    set_latency_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+    value_size_bytes: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS_BYTES))
     
     @property
     def hit_rate(self) -> float:
         """Calculate cache hit rate."""
         total = self.hits + self.misses
         return (self.hits / total * 100) if total > 0 else 0.0
+    
+    @property
+    def avg_get_time_ms(self) -> float:
+        return self.get_latency_ms.mean
+    
+    @property
+    def avg_set_time_ms(self) -> float:
+        return self.set_latency_ms.mean
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Counters, rates and latency percentiles as plain values."""
+        return {
+            "hits": self.hits,
+            "local_hits": self.local_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "sets": self.sets,
+            "hit_rate": self.hit_rate,
+            "avg_get_time_ms": self.avg_get_time_ms,
+            "avg_set_time_ms": self.avg_set_time_ms,
+            "memory_usage_mb": self.memory_usage_mb,
+            "get_latency_ms": self.get_latency_ms.summary(),
+            "set_latency_ms": self.set_latency_ms.summary(),
+            "value_size_bytes": self.value_size_bytes.summary()
+        }
+
+
+class LocalCache:
+    """
+    Bounded LRU/TTL store for serialized cache entries.
+    
+    Entries are kept as envelope bytes rather than decoded objects so callers
+    can never mutate a shared cached value.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Get an entry if present and not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return data
+    
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None):
+        """Store an entry for at most the configured TTL."""
+        ttl = self.ttl if ttl is None or ttl <= 0 else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, data)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        """Drop an entry."""
+        self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all entries."""
+        self._entries.clear()
 
 
 class CacheManager:
@@ -79,58 +273,229 @@ class CacheManager:
         redis_url: str = "redis://localhost:6379",
         prefix: str = "coldcopy",
         default_ttl: int = 3600,
-        max_connections: int = 50
+        max_connections: int = 50,
+        local_cache: Optional[Dict[CacheNamespace, LocalCacheConfig]] = None,
+        serialization: Optional[Dict[CacheNamespace, SerializationConfig]] = None,
+        redis_client: Optional[redis.Redis] = None
     ):
         self.redis_url = redis_url
         self.prefix = prefix
         self.default_ttl = default_ttl
-        self._redis: Optional[redis.Redis] = None
+        # A client borrowed from a shared pool is left open on close()
+        self._redis: Optional[redis.Redis] = redis_client
+        self._owns_client = redis_client is None
         self._pool = None
         self._stats: Dict[str, CacheStats] = {}
         self._refresh_callbacks: Dict[str, Callable] = {}
         self.max_connections = max_connections
+        
+        # Stampede protection
+        self.lock_timeout = 10
+        self.lock_poll_interval = 0.05
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: set = set()
+        self._background_tasks: set = set()
+        
+        # Optional in-process tier, kept coherent across processes over pub/sub
+        self._local: Dict[CacheNamespace, LocalCache] = {
+            namespace: LocalCache(config.max_entries, config.ttl)
+            for namespace, config in (local_cache or {}).items()
+        }
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation_channel = f"{prefix}:cache:invalidate"
+        self._invalidation_task: Optional[asyncio.Task] = None
+        
+        # Tag index maintained on every write
+        self.invalidation_batch_size = TAG_CHUNK_SIZE
+        self._tag_script = None
+        
+        # Optional AccessPatternModel told about every read, for predictive warming
+        self.access_tracker = None
+        
+        # Codecs per namespace, recorded in each value's envelope
+        configs = {**DEFAULT_SERIALIZATION, **(serialization or {})}
+        self._serialization: Dict[Optional[CacheNamespace], ResolvedSerialization] = {
+            namespace: configs.get(namespace, SerializationConfig()).resolve()
+            for namespace in CacheNamespace
+        }
+        self._serialization[None] = SerializationConfig().resolve()
     
     async def initialize(self):
-        """Initialize Redis connection pool."""
+        """Initialize Redis connection pool, unless a shared client was given."""
         try:
-            self._pool = redis.ConnectionPool.from_url(
-                self.redis_url,
-                max_connections=self.max_connections,
-                decode_responses=False  # We'll handle decoding ourselves
-            )
-            self._redis = redis.Redis(connection_pool=self._pool)
+            if self._owns_client:
+                self._pool = redis.ConnectionPool.from_url(
+                    self.redis_url,
+                    max_connections=self.max_connections,
+                    decode_responses=False  # We'll handle decoding ourselves
+                )
+                self._redis = redis.Redis(connection_pool=self._pool)
+            self._tag_script = self._redis.register_script(TAG_INDEX_SCRIPT)
             
             # Test connection
             await self._redis.ping()
             logger.info(f"Redis cache initialized with prefix: {self.prefix}")
             
+            if self._local:
+                self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+            
         except Exception as e:
             logger.error(f"Failed to initialize Redis: {e}")
             raise
     
     async def close(self):
         """Close Redis connections."""
-        if self._redis:
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        
+        for local in self._local.values():
+            local.clear()
+        
+        if self._redis and self._owns_client:
             await self._redis.close()
             await self._pool.disconnect()
+            self._redis = None
     
     def _make_key(self, key: str, namespace: CacheNamespace, version: int = 1) -> str:
         """Generate namespaced cache key."""
         return f"{self.prefix}:{namespace.value}:v{version}:{key}"
     
-    def _serialize(self, value: Any, compress: bool = False) -> bytes:
-        """Serialize value for storage."""
-        json_str = json.dumps(value, default=str)
-        data = json_str.encode('utf-8')
+    def _tag_key(self, tag: str) -> str:
+        """Generate the index key for a tag."""
+        return f"{self.prefix}:tags:{tag}"
+    
+    def _namespace_tag_key(self, namespace: CacheNamespace) -> str:
+        """Generate the index key listing every key of a namespace."""
+        return f"{self.prefix}:tags:namespace:{namespace.value}"
+    
+    def _invalidate_local(
+        self,
+        keys: Optional[List[str]] = None,
+        namespace: Optional[str] = None
+    ):
+        """Drop keys, or a whole namespace, from the in-process tier."""
+        for ns, local in self._local.items():
+            if namespace is not None and ns.value == namespace:
+                local.clear()
+                continue
+            for key in keys or []:
+                local.delete(key)
+    
+    async def _publish_invalidation(
+        self,
+        keys: Optional[List[str]] = None,
+        namespace: Optional[CacheNamespace] = None
+    ):
+        """Invalidate the in-process tier here and in every other process."""
+        if not self._local:
+            return
         
-        if compress:
-            import zlib
-            data = zlib.compress(data)
+        self._invalidate_local(keys, namespace.value if namespace else None)
         
-        return data
+        message = {"origin": self.instance_id}
+        if keys:
+            message["keys"] = keys
+        if namespace:
+            message["namespace"] = namespace.value
+        
+        try:
+            await self._redis.publish(self.invalidation_channel, json.dumps(message))
+        except RedisError as e:
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+    
+    async def _listen_for_invalidations(self):
+        """Apply invalidations published by other processes."""
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                
+                # Anything published while we were not subscribed was missed
+                for local in self._local.values():
+                    local.clear()
+                
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self.instance_id:
+                        continue
+                    
+                    self._invalidate_local(payload.get("keys"), payload.get("namespace"))
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+    
+    def _serialize(
+        self,
+        value: Any,
+        compress: bool = False,
+        compute_time: Optional[float] = None,
+        namespace: Optional[CacheNamespace] = None
+    ) -> bytes:
+        """Serialize value into a self-describing envelope."""
+        settings = self._serialization[namespace]
+        codec = CODECS[CODEC_BYTES] if isinstance(value, (bytes, bytearray, memoryview)) else settings.codec
+        data = codec.dumps(value)
+        compression = COMPRESSION_NONE
+        
+        if settings.should_compress(len(data), compress):
+            data = settings.compressor.compress(data)
+            compression = settings.compressor.compression_id
+        
+        flags = (compression << COMPRESSION_SHIFT) | codec.codec_id
+        if compute_time is None:
+            return bytes((ENVELOPE_V1 | flags,)) + data
+        
+        compute_ms = min(int(compute_time * 1000), 0xFFFFFFFF)
+        return bytes((ENVELOPE_V2 | flags,)) + COMPUTE_TIME.pack(compute_ms) + data
+    
+    def _unpack(self, data: bytes) -> Tuple[Any, float]:
+        """Decode an envelope into its value and compute time in seconds."""
+        header = data[0]
+        compression = (header & COMPRESSION_MASK) >> COMPRESSION_SHIFT
+        codec = CODECS.get(header & CODEC_MASK)
+        
+        if codec is None:
+            raise ValueError(f"Cache codec {header & CODEC_MASK} is not available")
+        
+        offset = 1
+        compute_time = 0.0
+        if header & ENVELOPE_VERSION_MASK == ENVELOPE_V2:
+            compute_time = COMPUTE_TIME.unpack_from(data, 1)[0] / 1000
+            offset += COMPUTE_TIME.size
+        
+        payload = memoryview(data)[offset:]
+        if compression != COMPRESSION_NONE:
+            compressor = COMPRESSORS.get(compression)
+            if compressor is None:
+                raise ValueError(f"Cache compression {compression} is not available")
+            payload = compressor.decompress(payload)
+        
+        return codec.loads(payload), compute_time
     
-    def _deserialize(self, data: bytes, compress: bool = False) -> Any:
-        """Deserialize value from storage."""
+    def _deserialize(self, data: bytes) -> Any:
+        """Deserialize an envelope written by _serialize."""
+        return self._unpack(data)[0]
+    
+    @staticmethod
+    def _is_envelope(data: bytes) -> bool:
+        """Check whether a stored value carries an envelope header."""
+        return bool(data) and data[0] >= ENVELOPE_V1
+    
+    def _deserialize_legacy(self, data: bytes, compress: bool = False) -> Any:
+        """Deserialize a value written before the envelope format."""
         if compress:
             import zlib
             data = zlib.decompress(data)
@@ -138,6 +503,93 @@ class CacheManager:
         json_str = data.decode('utf-8')
         return json.loads(json_str)
     
+    async def _read_legacy(
+        self,
+        full_key: str,
+        data: bytes,
+        namespace: Optional[CacheNamespace] = None
+    ) -> Any:
+        """
+        Read a value stored with a separate ":meta" hash.
+        
+        The value is rewritten as an envelope with its remaining TTL and the
+        metadata key is dropped, so each legacy entry costs the extra round
+        trip only once.
+        """
+        meta_key = f"{full_key}:meta"
+        metadata = await self._redis.hget(meta_key, "compress")
+        compress = metadata == b"true" if metadata else False
+        
+        value = self._deserialize_legacy(data, compress)
+        
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.set(full_key, self._serialize(value, compress, namespace=namespace), xx=True, keepttl=True)
+            pipe.delete(meta_key)
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to upgrade legacy cache entry {full_key}: {e}")
+        
+        return value
+    
+    async def _read_entry(self, full_key: str) -> Tuple[Optional[bytes], int]:
+        """Read a raw value and its remaining TTL in milliseconds."""
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.get(full_key)
+        pipe.pttl(full_key)
+        data, pttl = await pipe.execute()
+        return data, pttl
+    
+    async def _get_entry(
+        self,
+        full_key: str,
+        namespace: CacheNamespace
+    ) -> Tuple[Any, Optional[float], float]:
+        """
+        Look a key up in the local tier, then Redis, in one round trip.
+        
+        Returns the value (or _MISSING), the remaining TTL in seconds when
+        known and the time the value took to compute.
+        """
+        stats = self._get_stats(namespace)
+        local = self._local.get(namespace)
+        
+        try:
+            if local is not None:
+                data = local.get(full_key)
+                if data is not None:
+                    stats.hits += 1
+                    stats.local_hits += 1
+                    return self._deserialize(data), None, 0.0
+            
+            start_time = time.perf_counter()
+            
+            # Get value and TTL in a single round trip
+            data, pttl = await self._read_entry(full_key)
+            
+            stats.get_latency_ms.observe((time.perf_counter() - start_time) * 1000)
+            
+            if data is None:
+                stats.misses += 1
+                return _MISSING, None, 0.0
+            
+            stats.hits += 1
+            remaining = pttl / 1000 if pttl > 0 else None
+            
+            # The envelope header says how to decode the payload
+            if self._is_envelope(data):
+                if local is not None:
+                    local.set(full_key, data, remaining)
+                value, compute_time = self._unpack(data)
+                return value, remaining, compute_time
+            
+            return await self._read_legacy(full_key, data, namespace), remaining, 0.0
+            
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"Cache get error for {full_key}: {e}")
+            return _MISSING, None, 0.0
+    
     async def get(
         self,
         key: str,
@@ -161,58 +613,188 @@ class CacheManager:
             logger.warning("Redis not initialized, skipping cache get")
             return None
         
+        if refresh_callback:
+            return await self.get_or_compute(
+                key,
+                refresh_callback,
+                namespace=namespace,
+                version=version
+            )
+        
         full_key = self._make_key(key, namespace, version)
-        stats = self._get_stats(namespace)
+        if self.access_tracker is not None:
+            self.access_tracker.record(namespace.value, key)
+        value, _, _ = await self._get_entry(full_key, namespace)
+        
+        return None if value is _MISSING else value
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        namespace: CacheNamespace = CacheNamespace.API_RESPONSES,
+        version: int = 1,
+        compress: bool = False,
+        tags: Optional[List[str]] = None,
+        beta: float = 1.0
+    ) -> Any:
+        """
+        Get a value, computing it on a miss with stampede protection.
+        
+        Concurrent misses for a key share one computation: within a process
+        through a shared future, across processes through a Redis lock whose
+        losers wait for the winner's value. Hits are refreshed early in the
+        background with the XFetch probability, which rises as the entry nears
+        expiry in proportion to how long it took to compute, so a hot key is
+        usually recomputed once before it expires instead of by every caller
+        after.
+        
+        Args:
+            key: Cache key
+            compute: Async function producing the value
+            ttl: Time to live in seconds
+            namespace: Cache namespace
+            version: Cache version
+            compress: Whether to compress the value
+            tags: Optional tags for bulk invalidation
+            beta: Early refresh eagerness, 0 disables it
+        """
+        if not self._redis:
+            return await compute()
+        
+        full_key = self._make_key(key, namespace, version)
+        
+        async def compute_and_store():
+            start_time = time.monotonic()
+            value = await compute()
+            if value is not None:
+                await self.set(
+                    key, value,
+                    ttl=ttl,
+                    namespace=namespace,
+                    version=version,
+                    compress=compress,
+                    tags=tags,
+                    compute_time=time.monotonic() - start_time
+                )
+            return value
+        
+        if self.access_tracker is not None:
+            self.access_tracker.record(namespace.value, key)
+        value, remaining, compute_time = await self._get_entry(full_key, namespace)
+        
+        if value is not _MISSING:
+            if self._should_refresh_early(remaining, compute_time, beta):
+                self._refresh_in_background(full_key, compute_and_store)
+            return value
+        
+        return await self._single_flight(full_key, compute_and_store)
+    
+    @staticmethod
+    def _should_refresh_early(
+        remaining: Optional[float],
+        compute_time: float,
+        beta: float
+    ) -> bool:
+        """XFetch: refresh when delta * beta * -ln(rand) reaches the remaining TTL."""
+        if remaining is None or not compute_time or beta <= 0:
+            return False
+        return compute_time * beta * -math.log(1.0 - random.random()) >= remaining
+    
+    async def _single_flight(
+        self,
+        full_key: str,
+        compute_and_store: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run one computation per key, shared by every concurrent caller."""
+        future = self._inflight.get(full_key)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
         
         try:
-            start_time = asyncio.get_event_loop().time()
-            
-            # Get value and TTL in pipeline
-            pipe = self._redis.pipeline()
-            pipe.get(full_key)
-            pipe.ttl(full_key)
-            results = await pipe.execute()
-            
-            data, ttl = results[0], results[1]
-            
-            elapsed_ms = (asyncio.get_event_loop().time() - start_time) * 1000
-            stats.avg_get_time_ms = (stats.avg_get_time_ms + elapsed_ms) / 2
-            
-            if data is None:
-                stats.misses += 1
-                
-                # Try to refresh if callback provided
-                if refresh_callback:
-                    logger.info(f"Cache miss for {full_key}, refreshing...")
-                    fresh_value = await refresh_callback()
-                    if fresh_value is not None:
-                        await self.set(
-                            key, fresh_value, 
-                            namespace=namespace,
-                            version=version
-                        )
-                    return fresh_value
-                
-                return None
-            
-            stats.hits += 1
-            
-            # Check if nearing expiration and refresh
-            if ttl > 0 and ttl < 60 and refresh_callback:  # Less than 1 minute
-                asyncio.create_task(self._background_refresh(
-                    key, namespace, version, refresh_callback
-                ))
-            
-            # Deserialize based on metadata
-            metadata = await self._redis.hget(f"{full_key}:meta", "compress")
-            compress = metadata == b"true" if metadata else False
-            
-            return self._deserialize(data, compress)
-            
+            value = await self._compute_with_lock(full_key, compute_and_store)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except Exception as e:
-            stats.errors += 1
-            logger.error(f"Cache get error for {full_key}: {e}")
-            return None
+            future.set_exception(e)
+            # Mark retrieved, waiters (if any) re-raise it themselves
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+    
+    async def _compute_with_lock(
+        self,
+        full_key: str,
+        compute_and_store: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Compute under a Redis lock, or wait for the process holding it."""
+        lock = Lock(
+            self._redis,
+            f"{full_key}:lock",
+            timeout=self.lock_timeout,
+            thread_local=False
+        )
+        
+        try:
+            acquired = await lock.acquire(blocking=False)
+        except RedisError as e:
+            logger.warning(f"Cache lock unavailable for {full_key}: {e}")
+            return await compute_and_store()
+        
+        if not acquired:
+            value = await self._wait_for_value(full_key, self.lock_timeout)
+            if value is not _MISSING:
+                return value
+            # The holder is slow or gone, compute without the lock
+            return await compute_and_store()
+        
+        try:
+            # Another process may have stored the value before we got the lock
+            data, _ = await self._read_entry(full_key)
+            if data is not None and self._is_envelope(data):
+                return self._deserialize(data)
+            
+            return await compute_and_store()
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                # Expired while computing, someone else may own it now
+                pass
+    
+    async def _wait_for_value(self, full_key: str, timeout: float) -> Any:
+        """Poll for a value another process is computing."""
+        deadline = time.monotonic() + timeout
+        
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            data, _ = await self._read_entry(full_key)
+            if data is not None and self._is_envelope(data):
+                return self._deserialize(data)
+        
+        return _MISSING
+    
+    def _refresh_in_background(
+        self,
+        full_key: str,
+        compute_and_store: Callable[[], Awaitable[Any]]
+    ):
+        """Start an early refresh unless one is already running for the key."""
+        if full_key in self._inflight or full_key in self._refreshing:
+            return
+        
+        self._refreshing.add(full_key)
+        task = asyncio.create_task(self._background_refresh(full_key, compute_and_store))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
     async def set(
         self,
@@ -222,7 +804,8 @@ class CacheManager:
         namespace: CacheNamespace = CacheNamespace.API_RESPONSES,
         version: int = 1,
         compress: bool = False,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        compute_time: Optional[float] = None
     ) -> bool:
         """
         Set value in cache with metadata.
@@ -235,6 +818,7 @@ class CacheManager:
             version: Cache version
             compress: Whether to compress the value
             tags: Optional tags for bulk invalidation
+            compute_time: Seconds the value took to compute, for early refresh
             
         Returns:
             True if successful
@@ -247,40 +831,36 @@ class CacheManager:
         stats = self._get_stats(namespace)
         
         try:
-            start_time = asyncio.get_event_loop().time()
+            start_time = time.perf_counter()
             
             # Serialize value
-            data = self._serialize(value, compress)
+            data = self._serialize(value, compress, compute_time, namespace)
+            stats.value_size_bytes.observe(len(data))
             
             # Use pipeline for atomic operations
             pipe = self._redis.pipeline()
             
-            # Set main value
+            # Set main value, the envelope carries its own metadata
             if ttl is None:
                 ttl = self.default_ttl
             pipe.setex(full_key, ttl, data)
             
-            # Set metadata
-            meta_key = f"{full_key}:meta"
-            pipe.hset(meta_key, mapping={
-                "compress": str(compress).lower(),
-                "created_at": datetime.utcnow().isoformat(),
-                "ttl": str(ttl),
-                "size": str(len(data))
-            })
-            pipe.expire(meta_key, ttl)
-            
-            # Add to tags if provided
-            if tags:
-                for tag in tags:
-                    tag_key = f"{self.prefix}:tags:{tag}"
-                    pipe.sadd(tag_key, full_key)
-                    pipe.expire(tag_key, ttl)
+            # Index the key under its namespace and any tags
+            now = time.time()
+            tag_keys = [self._namespace_tag_key(namespace)]
+            tag_keys.extend(self._tag_key(tag) for tag in tags or [])
+            await self._tag_script(keys=tag_keys, args=[full_key, now + ttl, now], client=pipe)
             
             await pipe.execute()
             
-            elapsed_ms = (asyncio.get_event_loop().time() - start_time) * 1000
-            stats.avg_set_time_ms = (stats.avg_set_time_ms + elapsed_ms) / 2
+            local = self._local.get(namespace)
+            if local is not None:
+                # Other processes drop their stale copy, this one keeps the new value
+                await self._publish_invalidation([full_key])
+                local.set(full_key, data, ttl)
+            
+            stats.sets += 1
+            stats.set_latency_ms.observe((time.perf_counter() - start_time) * 1000)
             
             return True
             
@@ -302,12 +882,15 @@ class CacheManager:
         full_key = self._make_key(key, namespace, version)
         
         try:
-            # Delete value and metadata
+            # Delete value and any legacy metadata
             pipe = self._redis.pipeline()
             pipe.delete(full_key)
             pipe.delete(f"{full_key}:meta")
             results = await pipe.execute()
             
+            if namespace in self._local:
+                await self._publish_invalidation([full_key])
+            
             return results[0] > 0
             
         except Exception as e:
@@ -319,79 +902,128 @@ class CacheManager:
         pattern: str,
         namespace: CacheNamespace = CacheNamespace.API_RESPONSES
     ) -> int:
-        """Delete all keys matching a pattern."""
+        """
+        Delete all keys in a namespace matching a pattern.
+        
+        Matches are looked up in the namespace index, so the cost grows with
+        the size of the namespace rather than the whole database. Prefer
+        delete_by_tag, which only touches the affected keys.
+        """
         if not self._redis:
             return 0
         
+        if pattern == "*":
+            return await self.clear_namespace(namespace)
+        
         full_pattern = f"{self.prefix}:{namespace.value}:*:{pattern}"
-        deleted = 0
         
         try:
-            # Use SCAN to find matching keys
-            cursor = 0
-            while True:
-                cursor, keys = await self._redis.scan(
-                    cursor, match=full_pattern, count=100
-                )
-                
-                if keys:
-                    deleted += await self._redis.delete(*keys)
-                
-                if cursor == 0:
-                    break
-            
-            return deleted
+            return await self._delete_index_matches(
+                self._namespace_tag_key(namespace), full_pattern, namespace
+            )
             
         except Exception as e:
             logger.error(f"Cache delete pattern error: {e}")
             return 0
     
-    async def delete_by_tag(self, tag: str) -> int:
-        """Delete all cached values with a specific tag."""
+    async def delete_by_tag(self, tag: str, namespace: Optional[CacheNamespace] = None) -> int:
+        """
+        Delete all cached values with a specific tag.
+        
+        With a namespace only the tagged values in it are deleted, the rest
+        stay indexed under the tag.
+        """
         if not self._redis:
             return 0
         
-        tag_key = f"{self.prefix}:tags:{tag}"
-        deleted = 0
+        if namespace is None:
+            return await self._drain_index(self._tag_key(tag))
         
         try:
-            # Get all keys with this tag
-            keys = await self._redis.smembers(tag_key)
-            
-            if keys:
-                # Delete all keys and their metadata
-                pipe = self._redis.pipeline()
-                for key in keys:
-                    pipe.delete(key)
-                    pipe.delete(f"{key}:meta")
-                results = await pipe.execute()
-                deleted = sum(1 for r in results if r > 0)
-            
-            # Delete the tag set
-            await self._redis.delete(tag_key)
-            
-            return deleted
+            return await self._delete_index_matches(
+                self._tag_key(tag), f"{self.prefix}:{namespace.value}:*", namespace
+            )
             
         except Exception as e:
-            logger.error(f"Cache delete by tag error: {e}")
+            logger.error(f"Cache delete by tag error for {tag}: {e}")
             return 0
     
     async def clear_namespace(self, namespace: CacheNamespace) -> int:
         """Clear all keys in a namespace."""
-        return await self.delete_pattern("*", namespace)
+        if not self._redis:
+            return 0
+        
+        deleted = await self._drain_index(self._namespace_tag_key(namespace), publish=False)
+        
+        if namespace in self._local:
+            await self._publish_invalidation(namespace=namespace)
+        
+        return deleted
+    
+    async def _drain_index(self, index_key: str, publish: bool = True) -> int:
+        """Delete every key listed in a tag index, a chunk at a time."""
+        deleted = 0
+        
+        try:
+            async for keys in iter_tag_members(self._redis, index_key, self.invalidation_batch_size):
+                deleted += await self._delete_keys(keys)
+                if publish:
+                    await self._publish_invalidation([key.decode() for key in keys])
+            
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Cache delete by tag error for {index_key}: {e}")
+            return deleted
+    
+    async def _delete_index_matches(
+        self,
+        index_key: str,
+        match: str,
+        namespace: CacheNamespace
+    ) -> int:
+        """Delete the keys of an index matching a pattern, a chunk at a time."""
+        deleted = 0
+        cursor = 0
+        while True:
+            cursor, members = await self._redis.zscan(
+                index_key, cursor, match=match, count=self.invalidation_batch_size
+            )
+            
+            if members:
+                keys = [member for member, _ in members]
+                deleted += await self._delete_keys(keys)
+                await self._redis.zrem(index_key, *keys)
+                if namespace in self._local:
+                    await self._publish_invalidation([k.decode() for k in keys])
+            
+            if cursor == 0:
+                return deleted
+    
+    async def _delete_keys(self, keys: List[bytes]) -> int:
+        """Delete keys and any legacy metadata in one round trip."""
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.delete(*keys)
+        pipe.delete(*[key + b":meta" for key in keys])
+        deleted, _ = await pipe.execute()
+        return deleted
     
     async def get_stats(self, namespace: Optional[CacheNamespace] = None) -> Dict[str, Any]:
         """Get cache statistics."""
         if namespace:
             stats = self._get_stats(namespace)
-            return asdict(stats)
+            return stats.to_dict()
         
         # Return all stats
         return {
-            ns.value: asdict(self._get_stats(ns))
+            ns.value: self._get_stats(ns).to_dict()
             for ns in CacheNamespace
         }
     
+    def prometheus_metrics(self) -> List[str]:
+        """Per-namespace counters and histograms in the Prometheus text format."""
+        return render_cache_metrics(dict(self._stats))
+    
     async def get_memory_usage(self) -> Dict[str, Any]:
         """Get Redis memory usage information."""
         if not self._redis:
@@ -418,23 +1050,34 @@ class CacheManager:
     
     async def _background_refresh(
         self,
-        key: str,
-        namespace: CacheNamespace,
-        version: int,
-        refresh_callback: Callable
+        full_key: str,
+        compute_and_store: Callable[[], Awaitable[Any]]
     ):
-        """Background task to refresh cache."""
+        """Refresh a key early if no other process is already refreshing it."""
+        lock = Lock(
+            self._redis,
+            f"{full_key}:lock",
+            timeout=self.lock_timeout,
+            thread_local=False
+        )
+        
         try:
-            logger.info(f"Background refresh for {key}")
-            fresh_value = await refresh_callback()
-            if fresh_value is not None:
-                await self.set(
-                    key, fresh_value,
-                    namespace=namespace,
-                    version=version
-                )
+            if not await lock.acquire(blocking=False):
+                return
+            
+            try:
+                logger.debug(f"Early refresh for {full_key}")
+                await compute_and_store()
+            finally:
+                try:
+                    await lock.release()
+                except LockError:
+                    pass
+                
         except Exception as e:
             logger.error(f"Background refresh failed: {e}")
+        finally:
+            self._refreshing.discard(full_key)
     
     # Decorator for automatic caching
     def cached(
@@ -443,7 +1086,8 @@ class CacheManager:
         ttl: Optional[int] = None,
         key_func: Optional[Callable] = None,
         compress: bool = False,
-        version: int = 1
+        version: int = 1,
+        beta: float = 1.0
     ):
         """
         Decorator for automatic function result caching.
@@ -454,6 +1098,7 @@ class CacheManager:
             key_func: Function to generate cache key from arguments
             compress: Whether to compress cached values
             version: Cache version
+            beta: Early refresh eagerness, 0 disables it
         """
         def decorator(func: Callable) -> Callable:
             @wraps(func)
@@ -468,30 +1113,15 @@ class CacheManager:
                     key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
                     cache_key = ":".join(key_parts)
                 
-                # Try to get from cache
-                cached_value = await self.get(
-                    cache_key,
-                    namespace=namespace,
-                    version=version
-                )
-                
-                if cached_value is not None:
-                    return cached_value
-                
-                # Execute function
-                result = await func(*args, **kwargs)
-                
-                # Cache the result
-                await self.set(
+                return await self.get_or_compute(
                     cache_key,
-                    result,
+                    lambda: func(*args, **kwargs),
                     ttl=ttl,
                     namespace=namespace,
+                    version=version,
                     compress=compress,
-                    version=version
+                    beta=beta
                 )
-                
-                return result
             
             return wrapper
         return decorator
@@ -528,12 +1158,12 @@ class LeadEnrichmentCache:
             ttl=self.ttl,
             namespace=self.namespace,
             compress=True,  # Enrichment data can be large
-            tags=[workspace_id, "enrichment"]
+            tags=[workspace_tag(workspace_id), "enrichment"]
         )
     
     async def invalidate_workspace(self, workspace_id: str) -> int:
         """Invalidate all enrichment data for a workspace."""
-        return await self.cache.delete_by_tag(workspace_id)
+        return await self.cache.delete_by_tag(workspace_tag(workspace_id), namespace=self.namespace)
 
 
 class AIResponseCache:
@@ -592,7 +1222,7 @@ class AIResponseCache:
             ttl=self.ttl,
             namespace=self.namespace,
             compress=True,
-            tags=[workspace_id, model, "ai_response"]
+            tags=[workspace_tag(workspace_id), model, "ai_response"]
         )
 
 
@@ -626,7 +1256,7 @@ class AnalyticsCache:
             stats,
             ttl=self.ttl,
             namespace=self.namespace,
-            tags=[workspace_id, campaign_id, "campaign_stats"]
+            tags=[workspace_tag(workspace_id), campaign_id, "campaign_stats"]
         )
     
     async def get_workspace_dashboard(
@@ -650,7 +1280,7 @@ class AnalyticsCache:
             ttl=60,  # 1 minute for dashboard
             namespace=self.namespace,
             compress=True,
-            tags=[workspace_id, "dashboard"]
+            tags=[workspace_tag(workspace_id), "dashboard"]
         )
 
 
@@ -659,13 +1289,16 @@ _cache_instance: Optional[CacheManager] = None
 
 
 async def get_cache() -> CacheManager:
-    """Get global cache instance."""
+    """Get global cache instance, backed by the shared "cache" pool."""
     global _cache_instance
     
     if _cache_instance is None:
-        import os
-        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-        _cache_instance = CacheManager(redis_url=redis_url)
+        from utils.redis_manager import get_redis_pool
+        
+        _cache_instance = CacheManager(
+            local_cache=DEFAULT_LOCAL_CACHE,
+            redis_client=await get_redis_pool("cache")
+        )
         await _cache_instance.initialize()
     
     return _cache_instance
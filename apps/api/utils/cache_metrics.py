@@ -0,0 +1,155 @@
+"""
+In-process cache metrics for ColdCopy.
+
+CacheManager records every call into fixed-bucket histograms per namespace:
+an observation is one bisect and two additions, so it stays cheap on the hot
+path. The same buckets give p50/p95/p99 for get_stats() and are exported in
+the Prometheus text format by /api/system/metrics, where they can be summed
+across processes.
+"""
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence
+
+# Redis round trips from sub-millisecond up to a stalled connection
+LATENCY_BUCKETS_MS = (
+    0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000
+)
+
+# Serialized value sizes, 64 bytes to 4 MB in powers of four
+SIZE_BUCKETS_BYTES = (
+    64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values.
+    
+    Percentiles are interpolated inside the bucket that holds them, the way
+    Prometheus' histogram_quantile does, and never exceed the largest value
+    seen.
+    """
+    
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+    
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # One count per bound, plus the +Inf bucket
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Record one value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th quantile, q between 0 and 1."""
+        if not self.count:
+            return 0.0
+        
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50/p95/p99 and max, for JSON stats."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max
+        }
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def histogram_lines(
+    name: str,
+    histogram: Histogram,
+    labels: Dict[str, str],
+    scale: float = 1.0
+) -> List[str]:
+    """
+    Prometheus sample lines for one histogram.
+    
+    Bounds and sum are multiplied by scale, so millisecond histograms can be
+    exported in seconds.
+    """
+    label_text = _format_labels(labels)
+    lines = []
+    cumulative = 0
+    
+    for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{label_text},le="{bound * scale:g}"}} {cumulative}')
+    
+    lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{label_text}}} {histogram.sum * scale}")
+    lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+    return lines
+
+
+def metric_header(name: str, metric_type: str, description: str) -> List[str]:
+    """HELP and TYPE lines that precede a metric's samples."""
+    return [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+
+
+def render_cache_metrics(stats: Dict[str, Any], prefix: str = "coldcopy_cache") -> List[str]:
+    """
+    Prometheus text lines for CacheStats keyed by namespace.
+    
+    Only namespaces that have been used appear, so idle ones do not add
+    empty series.
+    """
+    lines: List[str] = []
+    counters = {
+        "hits": "Cache hits, from either tier",
+        "local_hits": "Cache hits served from process memory",
+        "misses": "Cache misses",
+        "errors": "Failed cache operations",
+        "sets": "Values written to the cache",
+    }
+    
+    for field, description in counters.items():
+        name = f"{prefix}_{field}_total"
+        lines.extend(metric_header(name, "counter", description))
+        for namespace, namespace_stats in stats.items():
+            lines.append(f'{name}{{namespace="{namespace}"}} {getattr(namespace_stats, field)}')
+    
+    histograms = {
+        "get_duration_seconds": ("get_latency_ms", 0.001, "Redis round trip of cache reads"),
+        "set_duration_seconds": ("set_latency_ms", 0.001, "Time to serialize and write a value"),
+        "value_size_bytes": ("value_size_bytes", 1.0, "Serialized size of written values"),
+    }
+    
+    for suffix, (attribute, scale, description) in histograms.items():
+        name = f"{prefix}_{suffix}"
+        lines.extend(metric_header(name, "histogram", description))
+        for namespace, namespace_stats in stats.items():
+            lines.extend(histogram_lines(
+                name, getattr(namespace_stats, attribute), {"namespace": namespace}, scale
+            ))
+    
+    return lines
@@ -2,32 +2,48 @@
 Advanced email client with queue management for ColdCopy.
 """
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import re
+import socket
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 import aioboto3
-import aioredis
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import BotoCoreError, ClientError
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from jinja2 import Template
+from redis.asyncio import Redis
 
 from core.config import get_settings
+from utils.redis_manager import get_redis_pool
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _compile_jinja(source: str) -> Template:
+    """Compile a Jinja2 source once per distinct string."""
+    return Template(source)
+
+
 class EmailTemplate:
     """Email template handling with Jinja2."""
     
     def __init__(self, subject: str, html_content: str, text_content: Optional[str] = None):
-        self.subject_template = Template(subject)
-        self.html_template = Template(html_content)
-        self.text_template = Template(text_content) if text_content else None
+        self.subject_template = _compile_jinja(subject)
+        self.html_template = _compile_jinja(html_content)
+        self.text_template = _compile_jinja(text_content) if text_content else None
     
     def render(self, variables: Dict[str, Any]) -> Dict[str, str]:
         """Render template with variables."""
@@ -36,30 +52,79 @@ class EmailTemplate:
             "html": self.html_template.render(**variables),
             "text": self.text_template.render(**variables) if self.text_template else None
         }
+    
+    def render_many(self, variables_list: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Render template once per variables dict."""
+        return [self.render(variables) for variables in variables_list]
+
+
+# Moves due scheduled jobs into the priority queue.
+# KEYS: scheduled zset, queue zset. ARGV: now timestamp, max jobs to promote.
+PROMOTE_SCHEDULED_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, job in ipairs(due) do
+    local ok, decoded = pcall(cjson.decode, job)
+    local priority = ok and tonumber(decoded['priority']) or 5
+    redis.call('ZADD', KEYS[2], priority, job)
+    redis.call('ZREM', KEYS[1], job)
+end
+return #due
+"""
+
+# Promotes due scheduled jobs, then pops up to N jobs by priority.
+# KEYS: scheduled zset, queue zset. ARGV: now timestamp, max jobs to promote, N.
+DEQUEUE_BATCH_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, job in ipairs(due) do
+    local ok, decoded = pcall(cjson.decode, job)
+    local priority = ok and tonumber(decoded['priority']) or 5
+    redis.call('ZADD', KEYS[2], priority, job)
+    redis.call('ZREM', KEYS[1], job)
+end
+return redis.call('ZPOPMAX', KEYS[2], tonumber(ARGV[3]))
+"""
+
+
+# SES SendBulkTemplatedEmail accepts at most 50 destinations per call
+SES_BULK_MAX_DESTINATIONS = 50
+
+# Placeholder filled per destination when tracking is baked into an SES template
+SES_TEMPLATE_EMAIL_ID = "{{email_id}}"
+
+# Bulk templates keep their last needed time here, so unused ones can be deleted
+SES_TEMPLATES_KEY = "email:ses_templates"
+SES_TEMPLATE_CACHE_SIZE = 256
+
+# Queue workers heartbeat into this sorted set to split the SES send rate
+EMAIL_WORKERS_KEY = "email:workers"
+EMAIL_WORKER_TTL = 300
 
 
 class EmailQueue:
     """Redis-based email queue with priority and scheduling."""
     
-    def __init__(self, redis_client: aioredis.Redis):
+    # Upper bound on scheduled jobs promoted per call, keeps script run time constant
+    promote_batch_size = 500
+    
+    def __init__(self, redis_client: Redis):
         self.redis = redis_client
         self.queue_key = "email_queue"
         self.processing_key = "email_processing"
         self.failed_key = "email_failed"
         self.scheduled_key = "email_scheduled"
+        self._promote_script = redis_client.register_script(PROMOTE_SCHEDULED_SCRIPT)
+        self._dequeue_script = redis_client.register_script(DEQUEUE_BATCH_SCRIPT)
     
-    async def enqueue(
+    def _build_job(
         self,
         email_data: Dict[str, Any],
-        priority: int = 5,
-        scheduled_at: Optional[datetime] = None,
-        max_retries: int = 3
-    ) -> str:
-        """Add email to queue with priority and scheduling."""
-        email_id = str(uuid4())
-        
-        email_job = {
-            "id": email_id,
+        priority: int,
+        scheduled_at: Optional[datetime],
+        max_retries: int
+    ) -> Dict[str, Any]:
+        """Wrap email data in a queue job."""
+        return {
+            "id": str(uuid4()),
             "data": email_data,
             "priority": priority,
             "max_retries": max_retries,
@@ -68,68 +133,111 @@ class EmailQueue:
             "scheduled_at": scheduled_at.isoformat() if scheduled_at else None,
             "status": "queued"
         }
+    
+    async def enqueue(
+        self,
+        email_data: Dict[str, Any],
+        priority: int = 5,
+        scheduled_at: Optional[datetime] = None,
+        max_retries: int = 3
+    ) -> str:
+        """Add email to queue with priority and scheduling."""
+        email_ids = await self.enqueue_many([email_data], priority, scheduled_at, max_retries)
+        return email_ids[0]
+    
+    async def enqueue_many(
+        self,
+        email_data_list: List[Dict[str, Any]],
+        priority: int = 5,
+        scheduled_at: Optional[datetime] = None,
+        max_retries: int = 3
+    ) -> List[str]:
+        """Add a batch of emails to the queue with a single ZADD."""
+        if not email_data_list:
+            return []
+        
+        email_jobs = [
+            self._build_job(email_data, priority, scheduled_at, max_retries)
+            for email_data in email_data_list
+        ]
         
         if scheduled_at and scheduled_at > datetime.utcnow():
             # Schedule for later
-            await self.redis.zadd(
-                self.scheduled_key,
-                {json.dumps(email_job): scheduled_at.timestamp()}
-            )
+            key, score = self.scheduled_key, scheduled_at.timestamp()
         else:
             # Add to immediate queue with priority
-            await self.redis.zadd(
-                self.queue_key,
-                {json.dumps(email_job): priority}
-            )
+            key, score = self.queue_key, priority
+        
+        await self.redis.zadd(
+            key,
+            {json.dumps(email_job): score for email_job in email_jobs}
+        )
         
-        return email_id
+        return [email_job["id"] for email_job in email_jobs]
     
     async def dequeue(self) -> Optional[Dict[str, Any]]:
         """Get next email from queue (highest priority first)."""
-        # First, check for scheduled emails that are ready
-        await self._process_scheduled_emails()
+        email_jobs = await self.dequeue_batch(1)
+        return email_jobs[0] if email_jobs else None
+    
+    async def dequeue_batch(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Claim up to ``count`` emails from the queue (highest priority first).
         
-        # Get highest priority email
-        result = await self.redis.zpopmax(self.queue_key)
+        Due scheduled emails are promoted and the batch is popped in one
+        server-side script, so concurrent workers never claim the same job.
+        """
+        result = await self._dequeue_script(
+            keys=[self.scheduled_key, self.queue_key],
+            args=[datetime.utcnow().timestamp(), self.promote_batch_size, count]
+        )
         if not result:
-            return None
-        
-        email_job_json, priority = result[0]
-        email_job = json.loads(email_job_json)
+            return []
         
-        # Move to processing
-        email_job["status"] = "processing"
-        email_job["processing_started"] = datetime.utcnow().isoformat()
+        # ZPOPMAX replies with a flat [member, score, member, score, ...] list
+        email_jobs = []
+        processing_started = datetime.utcnow().isoformat()
         
-        await self.redis.setex(
-            f"{self.processing_key}:{email_job['id']}",
-            3600,  # 1 hour TTL
-            json.dumps(email_job)
-        )
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for email_job_json in result[::2]:
+                email_job = json.loads(email_job_json)
+                
+                # Move to processing
+                email_job["status"] = "processing"
+                email_job["processing_started"] = processing_started
+                
+                pipe.setex(
+                    f"{self.processing_key}:{email_job['id']}",
+                    3600,  # 1 hour TTL
+                    json.dumps(email_job)
+                )
+                email_jobs.append(email_job)
+            
+            await pipe.execute()
         
-        return email_job
+        return email_jobs
     
-    async def _process_scheduled_emails(self):
+    async def _process_scheduled_emails(self) -> int:
         """Move ready scheduled emails to main queue."""
-        now = datetime.utcnow().timestamp()
-        ready_emails = await self.redis.zrangebyscore(
-            self.scheduled_key, 0, now, withscores=False
+        return await self._promote_script(
+            keys=[self.scheduled_key, self.queue_key],
+            args=[datetime.utcnow().timestamp(), self.promote_batch_size]
         )
-        
-        for email_job_json in ready_emails:
-            email_job = json.loads(email_job_json)
-            # Move to main queue
-            await self.redis.zadd(
-                self.queue_key,
-                {email_job_json: email_job["priority"]}
-            )
-            # Remove from scheduled
-            await self.redis.zrem(self.scheduled_key, email_job_json)
     
     async def mark_completed(self, email_id: str):
         """Mark email as successfully sent."""
         await self.redis.delete(f"{self.processing_key}:{email_id}")
     
+    async def mark_completed_many(self, email_ids: List[str]):
+        """Acknowledge a batch of sent emails in a single round trip."""
+        if not email_ids:
+            return
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for email_id in email_ids:
+                pipe.delete(f"{self.processing_key}:{email_id}")
+            await pipe.execute()
+    
     async def mark_failed(self, email_id: str, error: str):
         """Mark email as failed and handle retries."""
         processing_key = f"{self.processing_key}:{email_id}"
@@ -176,38 +284,84 @@ class EmailQueue:
         }
 
 
+# Stands in for the email id while a template is compiled into segments
+TRACKING_SLOT = "\x00"
+
+HREF_PATTERN = re.compile(r'href="([^"]+)"')
+
+
 class EmailTracker:
-    """Email tracking with open/click tracking."""
+    """
+    Email tracking with open/click tracking.
+    
+    Tracking is compiled once per HTML body into static segments split at
+    the email id, so each recipient is rendered with a single join.
+    """
     
-    def __init__(self, base_url: str, redis_client: aioredis.Redis):
+    def __init__(self, base_url: str, redis_client: Redis, template_cache_size: int = 256):
         self.base_url = base_url.rstrip('/')
         self.redis = redis_client
+        self.template_cache_size = template_cache_size
+        self._segment_cache: "OrderedDict[Tuple[str, bool, bool], Tuple[str, ...]]" = OrderedDict()
+    
+    def add_tracking(
+        self,
+        email_id: str,
+        html_content: str,
+        pixel: bool = True,
+        clicks: bool = True
+    ) -> str:
+        """Add tracking pixel and click tracking to HTML content."""
+        return email_id.join(self._get_segments(html_content, pixel, clicks))
     
     def add_tracking_pixel(self, email_id: str, html_content: str) -> str:
         """Add tracking pixel to HTML content."""
-        tracking_url = f"{self.base_url}/api/track/open/{email_id}"
-        pixel_html = f'<img src="{tracking_url}" width="1" height="1" style="display:none;" />'
-        
-        # Insert before closing body tag, or append if no body tag
-        if '</body>' in html_content:
-            html_content = html_content.replace('</body>', f'{pixel_html}</body>')
-        else:
-            html_content += pixel_html
-        
-        return html_content
+        return self.add_tracking(email_id, html_content, clicks=False)
     
     def add_click_tracking(self, email_id: str, html_content: str) -> str:
         """Add click tracking to all links in HTML content."""
-        import re
+        return self.add_tracking(email_id, html_content, pixel=False)
+    
+    def _get_segments(self, html_content: str, pixel: bool, clicks: bool) -> Tuple[str, ...]:
+        """Get the compiled segments for an HTML body, compiling on first use."""
+        cache_key = (html_content, pixel, clicks)
+        segments = self._segment_cache.get(cache_key)
+        
+        if segments is not None:
+            self._segment_cache.move_to_end(cache_key)
+            return segments
+        
+        segments = tuple(self._compile(html_content, pixel, clicks).split(TRACKING_SLOT))
         
-        def replace_link(match):
-            original_url = match.group(1)
-            tracked_url = f"{self.base_url}/api/track/click/{email_id}?url={original_url}"
-            return f'href="{tracked_url}"'
+        self._segment_cache[cache_key] = segments
+        if len(self._segment_cache) > self.template_cache_size:
+            self._segment_cache.popitem(last=False)
         
-        # Replace href attributes
-        tracked_content = re.sub(r'href="([^"]+)"', replace_link, html_content)
-        return tracked_content
+        return segments
+    
+    def _compile(self, html_content: str, pixel: bool, clicks: bool) -> str:
+        """Rewrite HTML with tracking, leaving TRACKING_SLOT where the email id goes."""
+        # NUL never belongs in HTML and would be mistaken for a slot
+        html_content = html_content.replace(TRACKING_SLOT, "")
+        
+        if pixel:
+            tracking_url = f"{self.base_url}/api/track/open/{TRACKING_SLOT}"
+            pixel_html = f'<img src="{tracking_url}" width="1" height="1" style="display:none;" />'
+            
+            # Insert before closing body tag, or append if no body tag
+            if '</body>' in html_content:
+                html_content = html_content.replace('</body>', f'{pixel_html}</body>')
+            else:
+                html_content += pixel_html
+        
+        if clicks:
+            click_prefix = f"{self.base_url}/api/track/click/{TRACKING_SLOT}?url="
+            html_content = HREF_PATTERN.sub(
+                lambda match: f'href="{click_prefix}{match.group(1)}"',
+                html_content
+            )
+        
+        return html_content
     
     async def record_open(self, email_id: str, user_agent: str, ip_address: str):
         """Record email open event."""
@@ -240,61 +394,122 @@ class EmailTracker:
 class EmailDeliverabilityMonitor:
     """Monitor email deliverability and reputation."""
     
-    def __init__(self, ses_client, redis_client: aioredis.Redis):
+    # SES send statistics are account-wide, so one verdict serves every domain
+    verdict_key = "reputation:account"
+    refresh_lock_key = "reputation:account:refresh_lock"
+    
+    def __init__(self, ses_client, redis_client: Redis, verdict_ttl: int = 60):
         self.ses = ses_client
         self.redis = redis_client
+        self.verdict_ttl = verdict_ttl
+        self._verdict: Optional[Dict[str, Any]] = None
+        self._verdict_expires_at = 0.0
+        self._refresh_lock = asyncio.Lock()
     
     async def check_reputation(self, domain: str) -> Dict[str, Any]:
         """Check sending reputation for domain."""
         try:
-            # Get SES reputation metrics
-            response = await self.ses.get_account_sending_enabled()
-            sending_enabled = response.get('Enabled', False)
-            
-            # Get bounce and complaint rates
-            stats = await self.ses.get_send_statistics()
-            
-            recent_stats = stats.get('SendDataPoints', [])[-10:]  # Last 10 data points
-            
-            if recent_stats:
-                total_sends = sum(point.get('DeliveryAttempts', 0) for point in recent_stats)
-                total_bounces = sum(point.get('Bounces', 0) for point in recent_stats)
-                total_complaints = sum(point.get('Complaints', 0) for point in recent_stats)
-                
-                bounce_rate = (total_bounces / total_sends * 100) if total_sends > 0 else 0
-                complaint_rate = (total_complaints / total_sends * 100) if total_sends > 0 else 0
-            else:
-                bounce_rate = complaint_rate = 0
-            
-            # Determine reputation status
-            reputation_status = "good"
-            if bounce_rate > 5 or complaint_rate > 0.1:
-                reputation_status = "poor"
-            elif bounce_rate > 2 or complaint_rate > 0.05:
-                reputation_status = "warning"
-            
-            reputation_data = {
-                "domain": domain,
-                "sending_enabled": sending_enabled,
-                "bounce_rate": round(bounce_rate, 3),
-                "complaint_rate": round(complaint_rate, 3),
-                "status": reputation_status,
-                "last_checked": datetime.utcnow().isoformat()
-            }
-            
-            # Cache reputation data
-            await self.redis.setex(
-                f"reputation:{domain}",
-                1800,  # 30 minutes
-                json.dumps(reputation_data)
-            )
-            
-            return reputation_data
-            
+            verdict = await self._get_verdict()
+            return {"domain": domain, **verdict}
+        
         except Exception as e:
             logger.error(f"Error checking reputation for {domain}: {str(e)}")
             return {"domain": domain, "status": "unknown", "error": str(e)}
     
+    async def _get_verdict(self) -> Dict[str, Any]:
+        """
+        Get the account reputation verdict.
+        
+        Served from process memory, then from Redis; only one caller per
+        process and one worker across the fleet refreshes it from SES.
+        """
+        if self._verdict and time.monotonic() < self._verdict_expires_at:
+            return self._verdict
+        
+        async with self._refresh_lock:
+            # Another coroutine may have refreshed while we waited
+            if self._verdict and time.monotonic() < self._verdict_expires_at:
+                return self._verdict
+            
+            verdict = await self._read_shared_verdict()
+            if verdict is None:
+                verdict = await self._refresh_shared_verdict()
+            
+            return verdict
+    
+    async def _read_shared_verdict(self) -> Optional[Dict[str, Any]]:
+        """Load the verdict cached in Redis and memoize it until it expires there."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self.verdict_key)
+            pipe.pttl(self.verdict_key)
+            verdict_json, ttl_ms = await pipe.execute()
+        
+        if not verdict_json or ttl_ms <= 0:
+            return None
+        
+        self._verdict = json.loads(verdict_json)
+        self._verdict_expires_at = time.monotonic() + ttl_ms / 1000
+        return self._verdict
+    
+    async def _refresh_shared_verdict(self) -> Dict[str, Any]:
+        """Recompute the verdict from SES, letting one worker at a time do it."""
+        lock_acquired = await self.redis.set(self.refresh_lock_key, "1", nx=True, ex=10)
+        
+        if not lock_acquired:
+            # Someone else is refreshing; wait briefly for their result
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+                verdict = await self._read_shared_verdict()
+                if verdict is not None:
+                    return verdict
+        
+        try:
+            verdict = await self._fetch_verdict()
+            await self.redis.setex(self.verdict_key, self.verdict_ttl, json.dumps(verdict))
+        finally:
+            if lock_acquired:
+                await self.redis.delete(self.refresh_lock_key)
+        
+        self._verdict = verdict
+        self._verdict_expires_at = time.monotonic() + self.verdict_ttl
+        return verdict
+    
+    async def _fetch_verdict(self) -> Dict[str, Any]:
+        """Compute the account reputation verdict from SES."""
+        # Get SES reputation metrics
+        response = await self.ses.get_account_sending_enabled()
+        sending_enabled = response.get('Enabled', False)
+        
+        # Get bounce and complaint rates
+        stats = await self.ses.get_send_statistics()
+        
+        recent_stats = stats.get('SendDataPoints', [])[-10:]  # Last 10 data points
+        
+        if recent_stats:
+            total_sends = sum(point.get('DeliveryAttempts', 0) for point in recent_stats)
+            total_bounces = sum(point.get('Bounces', 0) for point in recent_stats)
+            total_complaints = sum(point.get('Complaints', 0) for point in recent_stats)
+            
+            bounce_rate = (total_bounces / total_sends * 100) if total_sends > 0 else 0
+            complaint_rate = (total_complaints / total_sends * 100) if total_sends > 0 else 0
+        else:
+            bounce_rate = complaint_rate = 0
+        
+        # Determine reputation status
+        reputation_status = "good"
+        if bounce_rate > 5 or complaint_rate > 0.1:
+            reputation_status = "poor"
+        elif bounce_rate > 2 or complaint_rate > 0.05:
+            reputation_status = "warning"
+        
+        return {
+            "sending_enabled": sending_enabled,
+            "bounce_rate": round(bounce_rate, 3),
+            "complaint_rate": round(complaint_rate, 3),
+            "status": reputation_status,
+            "last_checked": datetime.utcnow().isoformat()
+        }
+    
     async def get_suppression_list(self) -> List[str]:
         """Get suppressed email addresses."""
         try:
@@ -305,42 +520,112 @@ class EmailDeliverabilityMonitor:
             return []
 
 
+class SendRateLimiter:
+    """Token bucket pacing SES sends to the account's MaxSendRate."""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(rate, 0.1)
+        self.capacity = capacity or max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def set_rate(self, rate: float):
+        """Change the rate, keeping the tokens already in the bucket."""
+        self._refill()
+        self.rate = max(rate, 0.1)
+        self.capacity = max(self.rate, 1.0)
+        self._tokens = min(self._tokens, self.capacity)
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    async def acquire(self, tokens: int = 1):
+        """Wait until ``tokens`` sends are allowed and take them."""
+        # A bulk call larger than the bucket waits for a full bucket and
+        # leaves it in debt, so the average rate still holds
+        needed = min(tokens, self.capacity)
+        
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            self._refill()
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
 class AdvancedEmailClient:
     """Advanced email client with queue management, tracking, and deliverability monitoring."""
     
     def __init__(self):
         self.settings = get_settings()
         self._ses_session = None
+        self._ses_client = None
         self._redis_client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
         self.queue = None
         self.tracker = None
         self.deliverability_monitor = None
+        self._max_send_rate: Optional[float] = None
+        self._send_rate_checked_at = 0.0
+        self._worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._worker_count = 1
+        self._rate_limiter: Optional[SendRateLimiter] = None
+        self._ses_templates: "OrderedDict[str, None]" = OrderedDict()
     
-    async def initialize(self):
-        """Initialize async clients."""
-        # Initialize SES client
-        self._ses_session = aioboto3.Session()
-        
-        # Initialize Redis client
-        self._redis_client = aioredis.from_url(
-            self.settings.REDIS_URL,
-            encoding="utf-8",
-            decode_responses=True
-        )
-        
-        # Initialize components
-        self.queue = EmailQueue(self._redis_client)
-        self.tracker = EmailTracker(self.settings.API_BASE_URL, self._redis_client)
-        
-        async with self._ses_session.client(
+    def _create_ses_client(self, max_pool_connections: int = 10):
+        """Create an SES client context sized for the given number of in-flight calls."""
+        return self._ses_session.client(
             'ses',
             aws_access_key_id=self.settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=self.settings.AWS_SECRET_ACCESS_KEY,
-            region_name=self.settings.AWS_REGION
-        ) as ses_client:
-            self.deliverability_monitor = EmailDeliverabilityMonitor(ses_client, self._redis_client)
+            region_name=self.settings.AWS_REGION,
+            config=BotoConfig(max_pool_connections=max_pool_connections)
+        )
     
-    async def send_email(
+    async def initialize(self):
+        """
+        Initialize async clients.
+        
+        The SES client stays open until cleanup(), so repeated calls are no-ops
+        once the client is warm. Redis is borrowed from the shared pools.
+        """
+        async with self._init_lock:
+            if self._initialized:
+                return
+            
+            # Initialize SES client
+            self._ses_session = aioboto3.Session()
+            self._exit_stack = AsyncExitStack()
+            self._ses_client = await self._exit_stack.enter_async_context(
+                self._create_ses_client(max_pool_connections=self.settings.EMAIL_DISPATCH_CONCURRENCY)
+            )
+            
+            # Borrow the shared queue pool rather than opening connections
+            self._redis_client = await get_redis_pool("queue")
+            
+            # Initialize components
+            self.queue = EmailQueue(self._redis_client)
+            self.tracker = EmailTracker(self.settings.API_BASE_URL, self._redis_client)
+            self.deliverability_monitor = EmailDeliverabilityMonitor(
+                self._ses_client,
+                self._redis_client,
+                verdict_ttl=self.settings.EMAIL_REPUTATION_CACHE_TTL
+            )
+            
+            # One bucket for the client's lifetime, so back-to-back
+            # process_queue calls don't each start with a free burst
+            if self._rate_limiter is None:
+                self._rate_limiter = SendRateLimiter(self.settings.SES_FALLBACK_SEND_RATE)
+            
+            self._initialized = True
+    
+    def _build_email_data(
         self,
         to_email: str,
         subject: str,
@@ -353,21 +638,24 @@ class AdvancedEmailClient:
         lead_id: Optional[UUID] = None,
         workspace_id: Optional[UUID] = None,
         add_tracking: bool = True,
-        priority: int = 5,
-        scheduled_at: Optional[datetime] = None
-    ) -> str:
-        """Send email with comprehensive tracking and queue management."""
+        ses_template: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the queued payload for one email, with tracking applied.
         
+        Emails sent through an SES template carry only the template name;
+        their body and tracking live in the template.
+        """
         email_id = str(uuid4())
         
-        # Add tracking if enabled
-        if add_tracking:
-            html_content = self.tracker.add_tracking_pixel(email_id, html_content)
-            html_content = self.tracker.add_click_tracking(email_id, html_content)
+        if ses_template:
+            html_content = text_content = None
+        elif add_tracking:
+            html_content = self.tracker.add_tracking(email_id, html_content)
         
-        # Prepare email data
-        email_data = {
+        return {
             "id": email_id,
+            "ses_template": ses_template,
             "to_email": to_email,
             "subject": subject,
             "html_content": html_content,
@@ -380,6 +668,37 @@ class AdvancedEmailClient:
             "workspace_id": str(workspace_id) if workspace_id else None,
             "tracking_enabled": add_tracking
         }
+    
+    async def send_email(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        campaign_id: Optional[UUID] = None,
+        lead_id: Optional[UUID] = None,
+        workspace_id: Optional[UUID] = None,
+        add_tracking: bool = True,
+        priority: int = 5,
+        scheduled_at: Optional[datetime] = None
+    ) -> str:
+        """Send email with comprehensive tracking and queue management."""
+        email_data = self._build_email_data(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            from_email=from_email,
+            from_name=from_name,
+            reply_to=reply_to,
+            campaign_id=campaign_id,
+            lead_id=lead_id,
+            workspace_id=workspace_id,
+            add_tracking=add_tracking
+        )
         
         # Queue email
         await self.queue.enqueue(
@@ -388,7 +707,7 @@ class AdvancedEmailClient:
             scheduled_at=scheduled_at
         )
         
-        return email_id
+        return email_data["id"]
     
     async def send_template_email(
         self,
@@ -416,79 +735,364 @@ class AdvancedEmailClient:
         text_content: Optional[str] = None,
         priority: int = 5,
         batch_size: int = 100,
+        scheduled_at: Optional[datetime] = None,
+        use_ses_template: bool = False,
         **kwargs
     ) -> List[str]:
-        """Send bulk emails with queue management."""
+        """
+        Send bulk emails with queue management.
+        
+        Each batch of recipients is rendered and then written to the queue
+        in a single ZADD, instead of one round trip per recipient. With
+        ``use_ses_template`` the shared content is registered once as an SES
+        template and dispatched with SendBulkTemplatedEmail.
+        """
+        ses_template = None
+        if use_ses_template:
+            ses_template = await self._ensure_ses_template(
+                subject,
+                html_content,
+                text_content,
+                add_tracking=kwargs.get("add_tracking", True),
+                needed_until=scheduled_at
+            )
+        
         email_ids = []
         
         for i in range(0, len(recipients), batch_size):
             batch = recipients[i:i + batch_size]
             
-            for email in batch:
-                email_id = await self.send_email(
+            email_data_batch = [
+                self._build_email_data(
                     to_email=email,
                     subject=subject,
                     html_content=html_content,
                     text_content=text_content,
-                    priority=priority,
+                    ses_template=ses_template,
                     **kwargs
                 )
-                email_ids.append(email_id)
+                for email in batch
+            ]
+            
+            await self.queue.enqueue_many(
+                email_data_batch,
+                priority=priority,
+                scheduled_at=scheduled_at
+            )
+            email_ids.extend(email_data["id"] for email_data in email_data_batch)
         
         return email_ids
     
-    async def process_queue(self, max_emails: int = 100) -> Dict[str, int]:
-        """Process emails from queue."""
+    async def _ensure_ses_template(
+        self,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str],
+        add_tracking: bool = True,
+        needed_until: Optional[datetime] = None
+    ) -> str:
+        """
+        Register shared campaign content as an SES template and return its name.
+        
+        Templates are named by content, so campaigns sending the same content
+        reuse one template. The time the template is last needed is kept in
+        Redis for cleanup_ses_templates().
+        """
         if not self.queue:
             await self.initialize()
         
-        results = {"sent": 0, "failed": 0, "skipped": 0}
+        # SES templates are Handlebars; escape literal braces in the content
+        subject, html_content, text_content = (
+            part.replace("{{", "\\{{") if part else part
+            for part in (subject, html_content, text_content)
+        )
         
-        async with self._ses_session.client(
-            'ses',
-            aws_access_key_id=self.settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=self.settings.AWS_SECRET_ACCESS_KEY,
-            region_name=self.settings.AWS_REGION
-        ) as ses_client:
+        if add_tracking:
+            html_content = self.tracker.add_tracking(SES_TEMPLATE_EMAIL_ID, html_content)
+        
+        digest = hashlib.sha256(
+            json.dumps([subject, html_content, text_content]).encode()
+        ).hexdigest()[:32]
+        template_name = f"coldcopy-bulk-{digest}"
+        
+        needed_at = max(time.time(), needed_until.timestamp() if needed_until else 0)
+        # GT never moves the time back, e.g. behind a scheduled campaign
+        await self._redis_client.zadd(SES_TEMPLATES_KEY, {template_name: needed_at}, gt=True)
+        
+        if template_name in self._ses_templates:
+            self._ses_templates.move_to_end(template_name)
+            return template_name
+        
+        template = {"TemplateName": template_name, "SubjectPart": subject, "HtmlPart": html_content}
+        if text_content:
+            template["TextPart"] = text_content
+        
+        try:
+            await self._ses_client.create_template(Template=template)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "AlreadyExists":
+                raise
+        
+        self._ses_templates[template_name] = None
+        if len(self._ses_templates) > SES_TEMPLATE_CACHE_SIZE:
+            self._ses_templates.popitem(last=False)
+        
+        return template_name
+    
+    async def cleanup_ses_templates(self, max_age: timedelta = timedelta(days=7)) -> int:
+        """
+        Delete bulk SES templates no email has needed for max_age.
+        
+        Returns the number of templates deleted.
+        """
+        if not self.queue:
+            await self.initialize()
+        
+        cutoff = time.time() - max_age.total_seconds()
+        template_names = await self._redis_client.zrangebyscore(SES_TEMPLATES_KEY, 0, cutoff)
+        
+        deleted = 0
+        for template_name in template_names:
+            try:
+                await self._ses_client.delete_template(TemplateName=template_name)
+                deleted += 1
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "TemplateDoesNotExist":
+                    logger.error(f"Error deleting SES template {template_name}: {str(e)}")
+                    continue
             
-            for _ in range(max_emails):
-                email_job = await self.queue.dequeue()
-                if not email_job:
-                    break
+            await self._redis_client.zrem(SES_TEMPLATES_KEY, template_name)
+            self._ses_templates.pop(template_name, None)
+        
+        return deleted
+    
+    async def process_queue(
+        self,
+        max_emails: int = 100,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Process emails from queue.
+        
+        Jobs are claimed from the queue in batches and up to ``concurrency``
+        sends are kept in flight on the shared SES client, paced by the
+        client's token bucket, tied to the account's MaxSendRate. Jobs that share an SES
+        template go out in SendBulkTemplatedEmail calls of up to 50
+        destinations. Successful sends are acknowledged to the queue in
+        batches.
+        """
+        if not self.queue:
+            await self.initialize()
+        
+        concurrency = max(1, min(concurrency or self.settings.EMAIL_DISPATCH_CONCURRENCY, max_emails))
+        ack_batch_size = self.settings.EMAIL_ACK_BATCH_SIZE
+        
+        results = {"sent": 0, "failed": 0, "skipped": 0}
+        remaining = max_emails
+        claim_size = max(concurrency, SES_BULK_MAX_DESTINATIONS)
+        claimed: List[List[Dict[str, Any]]] = []
+        claim_lock = asyncio.Lock()
+        completed: List[str] = []
+        
+        async def next_send() -> Optional[List[Dict[str, Any]]]:
+            nonlocal remaining
+            async with claim_lock:
+                if not claimed and remaining > 0:
+                    email_jobs = await self.queue.dequeue_batch(min(remaining, claim_size))
+                    remaining = remaining - len(email_jobs) if email_jobs else 0
+                    claimed.extend(self._group_jobs(email_jobs))
+                return claimed.pop(0) if claimed else None
+        
+        async def flush_completed():
+            if completed:
+                batch = completed[:]
+                completed.clear()
+                await self.queue.mark_completed_many(batch)
+        
+        ses_client = self._ses_client
+        send_rate = await self._get_send_rate(ses_client)
+        if self._rate_limiter is None:
+            self._rate_limiter = SendRateLimiter(send_rate)
+        else:
+            self._rate_limiter.set_rate(send_rate)
+        rate_limiter = self._rate_limiter
+        
+        async def dispatch_worker():
+            while True:
+                email_jobs = await next_send()
+                if not email_jobs:
+                    return
                 
-                try:
-                    # Check deliverability before sending
-                    domain = email_job["data"]["to_email"].split("@")[1]
-                    reputation = await self.deliverability_monitor.check_reputation(domain)
-                    
-                    if reputation.get("status") == "poor":
-                        await self.queue.mark_failed(
-                            email_job["id"],
-                            f"Poor reputation for domain {domain}"
-                        )
-                        results["skipped"] += 1
-                        continue
-                    
-                    # Send email via SES
-                    success = await self._send_via_ses(ses_client, email_job["data"])
-                    
-                    if success:
-                        await self.queue.mark_completed(email_job["id"])
-                        results["sent"] += 1
-                    else:
-                        await self.queue.mark_failed(email_job["id"], "SES send failed")
-                        results["failed"] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing email {email_job['id']}: {str(e)}")
-                    await self.queue.mark_failed(email_job["id"], str(e))
-                    results["failed"] += 1
+                if email_jobs[0]["data"].get("ses_template"):
+                    outcomes = await self._dispatch_bulk_jobs(ses_client, rate_limiter, email_jobs)
+                else:
+                    outcomes = [
+                        (email_jobs[0], await self._dispatch_job(ses_client, rate_limiter, email_jobs[0]))
+                    ]
                 
-                # Rate limiting
-                await asyncio.sleep(0.1)  # 10 emails per second max
+                for email_job, outcome in outcomes:
+                    results[outcome] += 1
+                    if outcome == "sent":
+                        completed.append(email_job["id"])
+                
+                if len(completed) >= ack_batch_size:
+                    await flush_completed()
+        
+        try:
+            await asyncio.gather(*(dispatch_worker() for _ in range(concurrency)))
+        finally:
+            await flush_completed()
         
         return results
     
+    def _group_jobs(self, email_jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split claimed jobs into sends: single jobs, or bulk groups sharing an SES template."""
+        sends = []
+        bulk_groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        
+        for email_job in email_jobs:
+            data = email_job["data"]
+            if not data.get("ses_template"):
+                sends.append([email_job])
+                continue
+            
+            group_key = (data["ses_template"], data["from_email"], data.get("from_name"), data.get("reply_to"))
+            bulk_groups.setdefault(group_key, []).append(email_job)
+        
+        for group in bulk_groups.values():
+            sends.extend(
+                group[i:i + SES_BULK_MAX_DESTINATIONS]
+                for i in range(0, len(group), SES_BULK_MAX_DESTINATIONS)
+            )
+        
+        return sends
+    
+    async def _dispatch_bulk_jobs(
+        self,
+        ses_client,
+        rate_limiter: SendRateLimiter,
+        email_jobs: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """Send jobs sharing an SES template in one bulk call and map each destination's result."""
+        outcomes = []
+        sendable = []
+        
+        try:
+            for email_job in email_jobs:
+                domain = email_job["data"]["to_email"].split("@")[1]
+                reputation = await self.deliverability_monitor.check_reputation(domain)
+                
+                if reputation.get("status") == "poor":
+                    await self.queue.mark_failed(email_job["id"], f"Poor reputation for domain {domain}")
+                    outcomes.append((email_job, "skipped"))
+                else:
+                    sendable.append(email_job)
+            
+            if not sendable:
+                return outcomes
+            
+            await rate_limiter.acquire(len(sendable))
+            statuses = await self._send_bulk_via_ses(ses_client, [email_job["data"] for email_job in sendable])
+            
+            for email_job, status in zip(sendable, statuses):
+                if status.get("Status") == "Success":
+                    outcomes.append((email_job, "sent"))
+                else:
+                    await self.queue.mark_failed(
+                        email_job["id"],
+                        status.get("Error") or f"SES bulk send failed: {status.get('Status')}"
+                    )
+                    outcomes.append((email_job, "failed"))
+        
+        except Exception as e:
+            logger.error(f"Error processing bulk send of {len(email_jobs)} emails: {str(e)}")
+            # Jobs without an outcome go back to the queue for retry
+            handled = {email_job["id"] for email_job, _ in outcomes}
+            for email_job in email_jobs:
+                if email_job["id"] not in handled:
+                    await self.queue.mark_failed(email_job["id"], str(e))
+                    outcomes.append((email_job, "failed"))
+        
+        return outcomes
+    
+    async def _dispatch_job(
+        self,
+        ses_client,
+        rate_limiter: SendRateLimiter,
+        email_job: Dict[str, Any]
+    ) -> str:
+        """Send one dequeued job and return its outcome ("sent", "failed" or "skipped")."""
+        try:
+            # Check deliverability before sending
+            domain = email_job["data"]["to_email"].split("@")[1]
+            reputation = await self.deliverability_monitor.check_reputation(domain)
+            
+            if reputation.get("status") == "poor":
+                await self.queue.mark_failed(
+                    email_job["id"],
+                    f"Poor reputation for domain {domain}"
+                )
+                return "skipped"
+            
+            # Send email via SES
+            await rate_limiter.acquire()
+            success = await self._send_via_ses(ses_client, email_job["data"])
+            
+            if success:
+                return "sent"
+            
+            await self.queue.mark_failed(email_job["id"], "SES send failed")
+            return "failed"
+        
+        except Exception as e:
+            logger.error(f"Error processing email {email_job['id']}: {str(e)}")
+            await self.queue.mark_failed(email_job["id"], str(e))
+            return "failed"
+    
+    async def _get_send_rate(self, ses_client) -> float:
+        """
+        Get this worker's share of the account MaxSendRate.
+        
+        The quota is refreshed every 5 minutes. Unless EMAIL_SEND_RATE_SHARE
+        sets a fixed fraction, the rate is split evenly across the queue
+        workers that processed the queue recently, so the fleet as a whole
+        stays under the account limit.
+        """
+        if self._max_send_rate is None or time.monotonic() - self._send_rate_checked_at > 300:
+            try:
+                quota = await ses_client.get_send_quota()
+                self._max_send_rate = float(quota.get("MaxSendRate", 0)) or self.settings.SES_FALLBACK_SEND_RATE
+            except (ClientError, BotoCoreError) as e:
+                logger.warning(f"Could not read SES send quota, using fallback rate: {str(e)}")
+                self._max_send_rate = self.settings.SES_FALLBACK_SEND_RATE
+            self._send_rate_checked_at = time.monotonic()
+        
+        share = self.settings.EMAIL_SEND_RATE_SHARE
+        if share is None:
+            share = 1 / await self._count_queue_workers()
+        
+        return self._max_send_rate * share
+    
+    async def _count_queue_workers(self) -> int:
+        """Register this worker as live and count the live ones."""
+        if self._redis_client is None:
+            return self._worker_count
+        
+        now = time.time()
+        try:
+            pipe = self._redis_client.pipeline()
+            pipe.zadd(EMAIL_WORKERS_KEY, {self._worker_id: now})
+            pipe.zremrangebyscore(EMAIL_WORKERS_KEY, 0, now - EMAIL_WORKER_TTL)
+            pipe.expire(EMAIL_WORKERS_KEY, EMAIL_WORKER_TTL)
+            pipe.zcard(EMAIL_WORKERS_KEY)
+            results = await pipe.execute()
+            self._worker_count = max(1, int(results[-1]))
+        except Exception as e:
+            # Keep the last known count rather than claiming the whole rate
+            logger.warning(f"Could not count email queue workers: {str(e)}")
+        
+        return self._worker_count
+    
     async def _send_via_ses(self, ses_client, email_data: Dict[str, Any]) -> bool:
         """Send email via SES."""
         try:
@@ -525,7 +1129,7 @@ class AdvancedEmailClient:
             
             logger.info(f"Email sent: {email_data['id']} -> {email_data['to_email']} (MessageId: {response['MessageId']})")
             return True
-            
+        
         except (ClientError, BotoCoreError) as e:
             logger.error(f"SES error sending email {email_data['id']}: {str(e)}")
             return False
@@ -533,6 +1137,62 @@ class AdvancedEmailClient:
             logger.error(f"Unexpected error sending email {email_data['id']}: {str(e)}")
             return False
     
+    async def _send_bulk_via_ses(
+        self,
+        ses_client,
+        email_data_list: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Send emails sharing an SES template via SendBulkTemplatedEmail.
+        
+        Returns one SES status entry per email, in the same order.
+        """
+        first = email_data_list[0]
+        
+        if first.get("from_name"):
+            from_address = formataddr((first["from_name"], first["from_email"]))
+        else:
+            from_address = first["from_email"]
+        
+        params = {
+            "Source": from_address,
+            "Template": first["ses_template"],
+            "DefaultTemplateData": json.dumps({"email_id": ""}),
+            "Destinations": [
+                {
+                    "Destination": {"ToAddresses": [email_data["to_email"]]},
+                    "ReplacementTemplateData": json.dumps({"email_id": email_data["id"]})
+                }
+                for email_data in email_data_list
+            ]
+        }
+        
+        if first.get("reply_to"):
+            params["ReplyToAddresses"] = [first["reply_to"]]
+        
+        if self.settings.SES_CONFIGURATION_SET:
+            params["ConfigurationSetName"] = self.settings.SES_CONFIGURATION_SET
+        
+        try:
+            response = await ses_client.send_bulk_templated_email(**params)
+            statuses = response.get("Status", [])
+            
+            # Destinations without a status entry were not accepted
+            statuses += [
+                {"Status": "Failed", "Error": "No status returned by SES"}
+                for _ in range(len(email_data_list) - len(statuses))
+            ]
+            
+            logger.info(
+                f"Bulk email sent with template {first['ses_template']}: "
+                f"{sum(1 for status in statuses if status.get('Status') == 'Success')}/{len(email_data_list)} accepted"
+            )
+            return statuses
+        
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"SES error sending bulk email with template {first['ses_template']}: {str(e)}")
+            return [{"Status": "Failed", "Error": str(e)} for _ in email_data_list]
+    
     async def get_queue_stats(self) -> Dict[str, Any]:
         """Get comprehensive queue statistics."""
         if not self.queue:
@@ -550,8 +1210,18 @@ class AdvancedEmailClient:
     
     async def cleanup(self):
         """Cleanup resources."""
-        if self._redis_client:
-            await self._redis_client.close()
+        async with self._init_lock:
+            if self._exit_stack:
+                await self._exit_stack.aclose()
+            
+            # The Redis pool is shared and closed by shutdown_redis()
+            self._exit_stack = None
+            self._ses_client = None
+            self._redis_client = None
+            self.queue = None
+            self.tracker = None
+            self.deliverability_monitor = None
+            self._initialized = False
 
 
 # Global email client instance
@@ -3,8 +3,9 @@ Rate limiting decorators for FastAPI endpoints.
 """
 import functools
 import logging
-from typing import Callable, Optional, Dict, Any, Union
-from datetime import datetime
+import math
+from typing import Callable, Optional, Dict, Any, List, Tuple, Union
+from datetime import datetime, timedelta
 
 from fastapi import Request, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
@@ -50,6 +51,15 @@ def rate_limit(
     """
     
     def decorator(func: Callable) -> Callable:
+        # Built once here rather than on every request
+        windows = _compile_windows(
+            func.__name__,
+            requests_per_minute,
+            requests_per_hour,
+            requests_per_day,
+            burst_multiplier
+        )
+        
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Extract request object
@@ -89,15 +99,7 @@ def rate_limit(
                 
                 # Check rate limits for each identifier
                 for identifier in identifiers:
-                    await _check_endpoint_rate_limits(
-                        identifier,
-                        func.__name__,
-                        requests_per_minute,
-                        requests_per_hour,
-                        requests_per_day,
-                        burst_multiplier,
-                        error_message
-                    )
+                    await _check_endpoint_rate_limits(identifier, windows, error_message)
                 
                 # Execute the function
                 return await func(*args, **kwargs)
@@ -457,7 +459,19 @@ async def _build_identifiers(
     per_ip: bool,
     per_workspace: bool
 ) -> list[str]:
-    """Build rate limit identifiers based on configuration."""
+    """
+    Build rate limit identifiers based on configuration.
+    
+    Identifiers are kept on request.state, so stacked rate limit decorators
+    build them once per request and configuration.
+    """
+    cache_key = (per_user, per_ip, per_workspace)
+    built = getattr(request.state, "rate_limit_identifiers", None)
+    if built is None:
+        built = request.state.rate_limit_identifiers = {}
+    elif cache_key in built:
+        return built[cache_key]
+    
     identifiers = []
     
     try:
@@ -479,82 +493,70 @@ async def _build_identifiers(
         ip = _get_client_ip(request)
         identifiers.append(f"ip:{ip}")
     
+    built[cache_key] = identifiers
     return identifiers
 
 
-async def _check_endpoint_rate_limits(
-    identifier: str,
+def _compile_windows(
     endpoint_name: str,
     requests_per_minute: int,
     requests_per_hour: int,
     requests_per_day: Optional[int],
-    burst_multiplier: float,
+    burst_multiplier: float
+) -> List[Tuple[str, str, int, int]]:
+    """
+    (limit_type, key suffix, limit, window_seconds) per window of an endpoint.
+    
+    The daily window is a calendar day (UTC): its key is suffixed with the
+    date when checked, so the quota resets at midnight.
+    """
+    windows = [
+        ("minute", f"minute:{endpoint_name}", int(requests_per_minute * burst_multiplier), 60),
+        ("hour", f"hour:{endpoint_name}", requests_per_hour, 3600),
+    ]
+    if requests_per_day:
+        windows.append(("daily", f"daily:{endpoint_name}", requests_per_day, 86400))
+    return windows
+
+
+async def _check_endpoint_rate_limits(
+    identifier: str,
+    windows: List[Tuple[str, str, int, int]],
     error_message: str
 ):
-    """Check rate limits for an endpoint."""
+    """Check rate limits for an endpoint, all windows in one round trip."""
     rate_cache = await get_rate_limit_cache()
     
-    # Check minute limit
-    minute_limit = int(requests_per_minute * burst_multiplier)
-    minute_result = await rate_cache.check_rate_limit(
-        f"{identifier}:minute:{endpoint_name}",
-        minute_limit,
-        60,
-        1
-    )
+    now = datetime.utcnow()
+    today = now.strftime("%Y-%m-%d")
+    results = await rate_cache.check_rate_limits([
+        (f"{identifier}:{suffix}:{today}" if limit_type == "daily" else f"{identifier}:{suffix}", limit, seconds)
+        for limit_type, suffix, limit, seconds in windows
+    ])
     
-    if not minute_result["allowed"]:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": error_message,
-                "limit_type": "minute",
-                "current_usage": minute_result["current_usage"],
-                "limit": minute_limit,
-                "retry_after": 60
-            }
-        )
+    if results[0]["allowed"]:
+        return
     
-    # Check hour limit
-    hour_result = await rate_cache.check_rate_limit(
-        f"{identifier}:hour:{endpoint_name}",
-        requests_per_hour,
-        3600,
-        1
-    )
+    # Report the window that denied the request, the one with a wait
+    for (limit_type, _, limit, seconds), result in zip(windows, results):
+        if result["retry_after"]:
+            break
     
-    if not hour_result["allowed"]:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error": error_message,
-                "limit_type": "hour",
-                "current_usage": hour_result["current_usage"],
-                "limit": requests_per_hour,
-                "retry_after": 3600
-            }
-        )
+    if limit_type == "daily":
+        # The daily quota is back at the next UTC midnight
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        result["retry_after"] = math.ceil((midnight - now).total_seconds())
     
-    # Check daily limit if specified
-    if requests_per_day:
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        daily_key = f"{identifier}:daily:{endpoint_name}:{today}"
-        current_daily = await rate_cache.cache.get(daily_key, 0)
-        
-        if current_daily >= requests_per_day:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": error_message,
-                    "limit_type": "daily",
-                    "current_usage": current_daily,
-                    "limit": requests_per_day,
-                    "retry_after": 86400
-                }
-            )
-        
-        # Increment daily counter
-        await rate_cache.cache.set(daily_key, current_daily + 1, 86400)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error": error_message,
+            "limit_type": limit_type,
+            "current_usage": result["current_usage"],
+            "limit": limit,
+            "retry_after": result["retry_after"] or seconds
+        }
+    )
 
 
 def _get_client_ip(request: Request) -> str:
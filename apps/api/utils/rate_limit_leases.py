@@ -0,0 +1,211 @@
+"""
+Approximate rate limiting with quota leased from Redis.
+
+Instead of asking Redis about every request, a process leases a chunk of an
+identifier's quota with one RateLimitCache.check_rate_limits call (cost =
+chunk size) and admits the next requests from that local token bucket. Before
+the bucket runs dry a background task leases the next chunk, so busy
+identifiers rarely wait on Redis.
+
+Quota is paid for before it is used, so the global limits are never exceeded.
+The error goes the other way: tokens leased but not used before the lease
+expires are lost, and a leased token may be spent up to lease_seconds after
+it was charged. Chunks are sized from recent demand and capped at max_error
+of the smallest limit, so each process holds at most about max_error of a
+limit at a time. Within 2 x max_error of a limit every request is checked in
+Redis again (strict mode), which keeps the last of the quota from being
+stranded on other processes.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def quota_headroom(checks: List[Dict[str, Any]], cost: int) -> int:
+    """Quota left in the tightest window after a check of cost."""
+    charged = cost if checks[0]["allowed"] else 0
+    return min(check["limit"] - check["current_usage"] for check in checks) - charged
+
+
+class QuotaLease:
+    """Tokens one process has leased for one identifier."""
+    
+    __slots__ = ("tokens", "size", "checks", "headroom", "started_at", "expires_at", "used", "refresh")
+    
+    def __init__(self, tokens: int, size: int, checks: List[Dict[str, Any]], now: float, lease_seconds: float):
+        self.tokens = tokens
+        self.size = size
+        self.checks = checks
+        self.headroom = quota_headroom(checks, size)
+        self.started_at = now
+        self.expires_at = now + lease_seconds
+        self.used = size - tokens
+        self.refresh: Optional[asyncio.Task] = None
+
+
+class LeasedRateLimiter:
+    """
+    Local token buckets in front of RateLimitCache.check_rate_limits.
+    
+    check_rate_limits() takes the same windows and returns results in the
+    same shape, so callers can switch between strict and approximate mode.
+    """
+    
+    def __init__(
+        self,
+        get_rate_cache: Callable[[], Awaitable[Any]],
+        max_error: float = 0.05,
+        lease_seconds: float = 1.0,
+        max_identifiers: int = 10000
+    ):
+        self.get_rate_cache = get_rate_cache
+        self.max_error = max_error
+        self.lease_seconds = lease_seconds
+        self.max_identifiers = max_identifiers
+        
+        self._leases: Dict[str, QuotaLease] = {}
+        self._acquiring: Dict[str, asyncio.Task] = {}
+        self.local_admissions = 0
+        self.remote_checks = 0
+    
+    async def check_rate_limits(
+        self,
+        identifier: str,
+        windows: List[Tuple[str, int, int]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Admit one request for identifier.
+        
+        Args:
+            identifier: Owner of the local bucket, usually the windows' prefix
+            windows: (identifier, limit, window_seconds) per window
+        
+        Returns:
+            The window results of the lease the request was admitted from, or
+            of the Redis check that admitted or denied it.
+        """
+        while True:
+            lease = self._leases.get(identifier)
+            now = time.monotonic()
+            
+            if lease is not None and lease.tokens > 0 and lease.expires_at > now:
+                lease.tokens -= 1
+                lease.used += 1
+                self.local_admissions += 1
+                # Lease the next chunk while the rest of this one is spent
+                if lease.tokens <= lease.size // 2 and lease.refresh is None:
+                    lease.refresh = asyncio.create_task(self._refresh(identifier, windows, lease))
+                return lease.checks
+            
+            pending = self._acquiring.get(identifier)
+            if pending is None and lease is not None:
+                pending = lease.refresh
+            if pending is None or pending.done():
+                break
+            
+            # Another request is leasing for this identifier, wait for it and
+            # look again, so waiters share its chunk or its successor's
+            await asyncio.shield(pending)
+        
+        task = asyncio.ensure_future(self._acquire(identifier, windows, lease, now))
+        self._acquiring[identifier] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._acquiring.get(identifier) is task:
+                del self._acquiring[identifier]
+    
+    def _chunk_size(self, windows: List[Tuple[str, int, int]], lease: Optional[QuotaLease], now: float) -> int:
+        """Tokens to lease next, 1 meaning strict mode."""
+        cap = int(min(limit for _, limit, _ in windows) * self.max_error)
+        if cap < 2:
+            return 1
+        if lease is None:
+            return 2
+        
+        if lease.headroom <= 2 * cap:
+            return 1
+        
+        # Enough for this lease period and the next, at the recent rate
+        elapsed = max(now - lease.started_at, 0.001)
+        demand = math.ceil(lease.used / elapsed * self.lease_seconds * 2)
+        return max(2, min(cap, demand))
+    
+    async def _acquire(
+        self,
+        identifier: str,
+        windows: List[Tuple[str, int, int]],
+        lease: Optional[QuotaLease],
+        now: float
+    ) -> List[Dict[str, Any]]:
+        """Lease a chunk and admit one request from it, or check it strictly."""
+        rate_cache = await self.get_rate_cache()
+        chunk = self._chunk_size(windows, lease, now)
+        
+        if chunk > 1:
+            self.remote_checks += 1
+            checks = await rate_cache.check_rate_limits(windows, chunk)
+            if checks[0]["allowed"]:
+                self._store(identifier, QuotaLease(chunk - 1, chunk, checks, now, self.lease_seconds))
+                return checks
+        
+        # Near the limit, every request is checked in Redis
+        self.remote_checks += 1
+        checks = await rate_cache.check_rate_limits(windows, 1)
+        # An empty lease keeps the headroom for sizing the next chunk
+        self._store(identifier, QuotaLease(0, 1, checks, now, self.lease_seconds))
+        return checks
+    
+    async def _refresh(self, identifier: str, windows: List[Tuple[str, int, int]], lease: QuotaLease):
+        """Top up a lease in the background."""
+        try:
+            now = time.monotonic()
+            chunk = self._chunk_size(windows, lease, now)
+            if chunk < 2:
+                return
+            
+            rate_cache = await self.get_rate_cache()
+            self.remote_checks += 1
+            checks = await rate_cache.check_rate_limits(windows, chunk)
+            # Denied leases still report usage, so the next chunk can shrink
+            lease.headroom = quota_headroom(checks, chunk)
+            if checks[0]["allowed"]:
+                lease.checks = checks
+                lease.tokens += chunk
+                lease.size = chunk
+                lease.used = 0
+                lease.started_at = now
+                lease.expires_at = now + self.lease_seconds
+        except Exception as e:
+            logger.error(f"Failed to refresh rate limit lease for {identifier}: {e}")
+        finally:
+            lease.refresh = None
+    
+    def _store(self, identifier: str, lease: QuotaLease):
+        """Keep a lease, bounding how many identifiers are held."""
+        self._leases.pop(identifier, None)
+        self._leases[identifier] = lease
+        
+        if len(self._leases) > self.max_identifiers:
+            now = time.monotonic()
+            for key in [key for key, held in self._leases.items() if held.expires_at <= now]:
+                del self._leases[key]
+            # Still full, drop the least recently leased
+            while len(self._leases) > self.max_identifiers:
+                del self._leases[next(iter(self._leases))]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Admissions served locally versus checks sent to Redis."""
+        total = self.local_admissions + self.remote_checks
+        return {
+            "identifiers": len(self._leases),
+            "local_admissions": self.local_admissions,
+            "remote_checks": self.remote_checks,
+            "local_ratio": self.local_admissions / total if total else 0.0,
+            "max_error": self.max_error,
+            "lease_seconds": self.lease_seconds
+        }
@@ -3,33 +3,113 @@ Redis connection manager and health monitoring for ColdCopy.
 """
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import json
 
-import aioredis
-from aioredis import Redis
-from aioredis.exceptions import RedisError, ConnectionError as RedisConnectionError
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, ConnectionError as RedisConnectionError
 
 from core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PoolMetrics:
+    """Command counters and round-trip latency for one logical pool."""
+    commands: int = 0
+    round_trips: int = 0
+    errors: int = 0
+    total_time_ms: float = 0.0
+    max_time_ms: float = 0.0
+    
+    def record(self, started: float, commands: int = 1, failed: bool = False):
+        """Record one round trip that started at the given perf_counter()."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.commands += commands
+        self.round_trips += 1
+        self.errors += int(failed)
+        self.total_time_ms += elapsed_ms
+        self.max_time_ms = max(self.max_time_ms, elapsed_ms)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "commands": self.commands,
+            "round_trips": self.round_trips,
+            "errors": self.errors,
+            "avg_time_ms": self.total_time_ms / self.round_trips if self.round_trips else 0.0,
+            "max_time_ms": self.max_time_ms
+        }
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline that reports each execute() to its pool's metrics."""
+    
+    metrics: PoolMetrics
+    
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        commands = len(self.command_stack)
+        try:
+            result = await super().execute(raise_on_error)
+        except Exception:
+            self.metrics.record(started, commands, failed=True)
+            raise
+        self.metrics.record(started, commands)
+        return result
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that reports every command to its pool's metrics."""
+    
+    metrics: PoolMetrics
+    
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = await super().execute_command(*args, **options)
+        except Exception:
+            self.metrics.record(started, failed=True)
+            raise
+        self.metrics.record(started)
+        return result
+    
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> InstrumentedPipeline:
+        pipe = InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+        pipe.metrics = self.metrics
+        return pipe
+
+
 class RedisConnectionPool:
-    """Manages Redis connections with health monitoring and failover."""
+    """
+    The single Redis connection layer for the API and workers.
+    
+    Callers borrow clients from named logical pools instead of opening their
+    own: each pool has its own connection limit and decoding, so rate limiting
+    cannot starve the cache of connections, and every command is counted in
+    the pool's metrics. main.lifespan opens the pools on startup and closes
+    them on shutdown.
+    """
     
     def __init__(self):
         self.settings = get_settings()
-        self._pools: Dict[str, Redis] = {}
+        self._pools: Dict[str, InstrumentedRedis] = {}
         self._health_status: Dict[str, bool] = {}
         self._last_health_check: Dict[str, datetime] = {}
         self._health_check_interval = 30  # seconds
+        self.metrics: Dict[str, PoolMetrics] = {}
         
         # Connection configurations
         self.connection_configs = {
+            # Text client for core.redis caches and general use
             "default": {
-                "url": self.settings.REDIS_URL,
+                "url": str(self.settings.REDIS_URL),
                 "max_connections": 20,
                 "retry_on_timeout": True,
                 "health_check_interval": 30,
@@ -38,21 +118,21 @@ class RedisConnectionPool:
                 "decode_responses": True
             },
             
-            # Separate connection for Celery
-            "celery": {
-                "url": self.settings.REDIS_URL,
+            # Binary values for utils.cache_manager, which decodes its own envelopes
+            "cache": {
+                "url": str(self.settings.REDIS_URL),
                 "max_connections": 50,
                 "retry_on_timeout": True,
                 "health_check_interval": 30,
                 "socket_keepalive": True,
                 "encoding": "utf-8",
-                "decode_responses": False  # Celery needs binary data
+                "decode_responses": False
             },
             
-            # High-performance connection for caching
-            "cache": {
-                "url": self.settings.REDIS_URL,
-                "max_connections": 30,
+            # Rate limiting specific connection
+            "rate_limit": {
+                "url": str(self.settings.REDIS_URL),
+                "max_connections": 20,
                 "retry_on_timeout": True,
                 "health_check_interval": 30,
                 "socket_keepalive": True,
@@ -60,10 +140,10 @@ class RedisConnectionPool:
                 "decode_responses": True
             },
             
-            # Rate limiting specific connection
-            "rate_limit": {
-                "url": self.settings.REDIS_URL,
-                "max_connections": 10,
+            # Email queue, tracking events and SES bookkeeping, all JSON text
+            "queue": {
+                "url": str(self.settings.REDIS_URL),
+                "max_connections": 50,
                 "retry_on_timeout": True,
                 "health_check_interval": 30,
                 "socket_keepalive": True,
@@ -71,9 +151,13 @@ class RedisConnectionPool:
                 "decode_responses": True
             }
         }
+        
+        # Earlier name of the queue pool
+        self.aliases = {"celery": "queue"}
     
-    async def get_pool(self, pool_name: str = "default") -> Redis:
+    async def get_pool(self, pool_name: str = "default") -> InstrumentedRedis:
         """Get Redis connection pool by name."""
+        pool_name = self.aliases.get(pool_name, pool_name)
         if pool_name not in self._pools:
             await self._create_pool(pool_name)
         
@@ -92,7 +176,7 @@ class RedisConnectionPool:
         config = self.connection_configs[pool_name]
         
         try:
-            pool = aioredis.from_url(
+            pool = InstrumentedRedis.from_url(
                 config["url"],
                 max_connections=config["max_connections"],
                 retry_on_timeout=config["retry_on_timeout"],
@@ -102,6 +186,9 @@ class RedisConnectionPool:
                 decode_responses=config["decode_responses"]
             )
             
+            # Metrics survive pool recreation
+            pool.metrics = self.metrics.setdefault(pool_name, PoolMetrics())
+            
             # Test connection
             await pool.ping()
             
@@ -151,7 +238,7 @@ class RedisConnectionPool:
         # Close existing pool
         if pool_name in self._pools:
             try:
-                await self._pools[pool_name].close()
+                await self._close_pool(self._pools[pool_name])
             except:
                 pass
             del self._pools[pool_name]
@@ -159,11 +246,16 @@ class RedisConnectionPool:
         # Create new pool
         await self._create_pool(pool_name)
     
+    async def _close_pool(self, pool: Redis):
+        """Close a client and the connections of its pool."""
+        await pool.close()
+        await pool.connection_pool.disconnect()
+    
     async def close_all(self):
         """Close all Redis connection pools."""
         for pool_name, pool in self._pools.items():
             try:
-                await pool.close()
+                await self._close_pool(pool)
                 logger.info(f"Closed Redis pool '{pool_name}'")
             except Exception as e:
                 logger.error(f"Error closing Redis pool '{pool_name}': {str(e)}")
@@ -186,7 +278,8 @@ class RedisConnectionPool:
                     "created_connections": connection_pool._created_connections,
                     "max_connections": connection_pool.max_connections,
                     "health_status": self._health_status.get(pool_name, False),
-                    "last_health_check": self._last_health_check.get(pool_name, datetime.min).isoformat()
+                    "last_health_check": self._last_health_check.get(pool_name, datetime.min).isoformat(),
+                    "metrics": self.metrics[pool_name].to_dict()
                 }
                 
             except Exception as e:
@@ -367,13 +460,18 @@ redis_monitor = RedisMonitor(redis_pool)
 
 
 async def initialize_redis():
-    """Initialize Redis connections."""
+    """Initialize Redis connections and the caches built on them."""
+    from utils.cache_manager import get_cache
+    
     try:
         # Create default pools
         await redis_pool.get_pool("default")
         await redis_pool.get_pool("cache")
         await redis_pool.get_pool("rate_limit")
         
+        # Start the global cache now rather than on the first request
+        await get_cache()
+        
         logger.info("Redis connections initialized successfully")
         
     except Exception as e:
@@ -382,8 +480,13 @@ async def initialize_redis():
 
 
 async def shutdown_redis():
-    """Shutdown Redis connections."""
+    """Shutdown the caches, then the Redis connections they borrow."""
+    from core.redis import redis_client
+    from utils.cache_manager import close_cache
+    
     try:
+        await close_cache()
+        await redis_client.disconnect()
         await redis_pool.close_all()
         logger.info("Redis connections closed successfully")
         
@@ -391,7 +494,7 @@ async def shutdown_redis():
         logger.error(f"Error shutting down Redis connections: {str(e)}")
 
 
-async def get_redis_pool(pool_name: str = "default") -> Redis:
+async def get_redis_pool(pool_name: str = "default") -> InstrumentedRedis:
     """Get Redis pool by name."""
     return await redis_pool.get_pool(pool_name)
 
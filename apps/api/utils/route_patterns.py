@@ -0,0 +1,113 @@
+"""
+Method and path trie for matching requests against route patterns.
+
+Patterns use FastAPI's path syntax, "/api/campaigns/{campaign_id}/action",
+and are compiled once. A lookup walks one node per path segment, so it costs
+O(path length) however many patterns are registered. Static segments win
+over parameters, and the walk only backtracks when a static segment leads to
+no pattern.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class RouteMatch(NamedTuple):
+    """The pattern a request matched, its value and the path parameters."""
+    pattern: str
+    value: Any
+    params: Dict[str, str]
+
+
+class _Node:
+    __slots__ = ("static", "param", "param_name", "pattern", "value")
+    
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.param_name: Optional[str] = None
+        # Set on nodes that end a pattern
+        self.pattern: Optional[str] = None
+        self.value: Any = None
+
+
+def _split(path: str) -> List[str]:
+    """Path segments, ignoring leading, trailing and repeated slashes."""
+    return [segment for segment in path.split("/") if segment]
+
+
+class RouteTrie:
+    """Route patterns per HTTP method."""
+    
+    def __init__(self):
+        self._roots: Dict[str, _Node] = {}
+    
+    def add(self, method: str, path: str, value: Any, pattern: Optional[str] = None):
+        """
+        Register a path pattern.
+        
+        Args:
+            method: HTTP method
+            path: Path pattern, parameters in braces
+            value: Returned with matches
+            pattern: Name reported by matches, "METHOD:path" by default
+        """
+        node = self._roots.setdefault(method.upper(), _Node())
+        
+        for segment in _split(path):
+            if segment.startswith("{") and segment.endswith("}"):
+                # FastAPI converters, "{name:int}", only change validation
+                name = segment[1:-1].split(":", 1)[0]
+                if node.param is None:
+                    node.param = _Node()
+                    node.param_name = name
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+        
+        node.pattern = pattern or f"{method.upper()}:{path}"
+        node.value = value
+    
+    def match(self, method: str, path: str) -> Optional[RouteMatch]:
+        """Find the pattern for a request, static segments first."""
+        root = self._roots.get(method.upper())
+        if root is None:
+            return None
+        
+        segments = _split(path)
+        params: Dict[str, str] = {}
+        node = self._match(root, segments, 0, params)
+        if node is None:
+            return None
+        return RouteMatch(node.pattern, node.value, params)
+    
+    def _match(self, node: _Node, segments: List[str], index: int, params: Dict[str, str]) -> Optional[_Node]:
+        if index == len(segments):
+            return node if node.pattern is not None else None
+        
+        segment = segments[index]
+        static = node.static.get(segment)
+        if static is not None:
+            found = self._match(static, segments, index + 1, params)
+            if found is not None:
+                return found
+        
+        if node.param is not None:
+            found = self._match(node.param, segments, index + 1, params)
+            if found is not None:
+                params[node.param_name] = segment
+                return found
+        
+        return None
+    
+    @classmethod
+    def from_rules(cls, rules: Dict[str, Any]) -> "RouteTrie":
+        """
+        Compile the endpoint rules of a "METHOD:/path" keyed mapping.
+        
+        Keys of any other form, like "user_type:pro", are ignored.
+        """
+        trie = cls()
+        for key, value in rules.items():
+            method, separator, path = key.partition(":")
+            if separator and path.startswith("/") and method.isupper():
+                trie.add(method, path, value, pattern=key)
+        return trie
@@ -1,11 +1,18 @@
 """
 Celery application configuration for ColdCopy background processing.
 """
+import asyncio
+import logging
 import os
+from typing import Optional
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 from core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 # Create Celery app
@@ -17,7 +24,8 @@ celery_app = Celery(
         "workers.email_tasks",
         "workers.campaign_tasks", 
         "workers.analytics_tasks",
-        "workers.gdpr_tasks"
+        "workers.gdpr_tasks",
+        "workers.webhook_tasks"
     ]
 )
 
@@ -115,10 +123,61 @@ celery_app.conf.update(
             "task": "workers.analytics_tasks.calculate_daily_token_usage",
             "schedule": crontab(hour=3, minute=0),  # Daily at 3 AM
             "options": {"queue": "analytics"}
+        },
+        
+        # Lead score reconciliation daily at 4 AM
+        "reconcile-lead-scores": {
+            "task": "workers.webhook_tasks.reconcile_lead_scores",
+            "schedule": crontab(hour=4, minute=0)  # Daily at 4 AM
         }
     }
 )
 
+# Per-process event loop. Async clients (Redis, aioboto3) are bound to the
+# loop they were created on, so every task in a worker process shares one.
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Get the persistent event loop for this worker process."""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def run_async(coro):
+    """Run an async function in a Celery task on the worker's persistent loop."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Warm the shared email client once per worker process."""
+    from utils.email_client import email_client
+    
+    try:
+        run_async(email_client.initialize())
+        logger.info("Email client initialized for worker process %s", os.getpid())
+    except Exception as e:
+        # Tasks initialize lazily if warm-up fails
+        logger.error(f"Failed to warm email client: {str(e)}")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Close the shared email client and the worker's event loop."""
+    from utils.email_client import email_client
+    
+    try:
+        run_async(email_client.cleanup())
+    except Exception as e:
+        logger.error(f"Failed to clean up email client: {str(e)}")
+    finally:
+        get_worker_loop().close()
+
+
 # Health check task
 @celery_app.task
 def health_check():
@@ -1,7 +1,6 @@
 """
 Advanced email-related Celery tasks with queue management.
 """
-import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 from uuid import UUID
@@ -10,23 +9,12 @@ from datetime import datetime, timedelta
 from celery import Task
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from workers.celery_app import celery_app
+from workers.celery_app import celery_app, run_async
 from core.database import get_async_session
 
 logger = logging.getLogger(__name__)
 
 
-def run_async(coro):
-    """Helper to run async functions in Celery tasks."""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(coro)
-
-
 class AsyncDatabaseTask(Task):
     """Base task class with async database session management."""
     
@@ -79,7 +67,6 @@ def send_single_email(
                 scheduled_at=scheduled_datetime
             )
             
-            await email_client.cleanup()
             return email_id
         
         email_id = run_async(_send_email())
@@ -124,7 +111,8 @@ def send_bulk_emails(
     workspace_id: Optional[str] = None,
     add_tracking: bool = True,
     priority: int = 5,
-    batch_size: int = 100
+    batch_size: int = 100,
+    use_ses_template: bool = False
 ) -> Dict[str, Any]:
     """Send bulk emails via the advanced email client."""
     try:
@@ -145,10 +133,10 @@ def send_bulk_emails(
                 workspace_id=UUID(workspace_id) if workspace_id else None,
                 add_tracking=add_tracking,
                 priority=priority,
-                batch_size=batch_size
+                batch_size=batch_size,
+                use_ses_template=use_ses_template
             )
             
-            await email_client.cleanup()
             return email_ids
         
         email_ids = run_async(_send_bulk())
@@ -181,7 +169,6 @@ def process_email_queue(max_emails: int = 100) -> Dict[str, Any]:
         async def _process_queue():
             await email_client.initialize()
             results = await email_client.process_queue(max_emails=max_emails)
-            await email_client.cleanup()
             return results
         
         results = run_async(_process_queue())
@@ -373,8 +360,6 @@ def monitor_email_deliverability() -> Dict[str, Any]:
             # Get suppression list
             suppressed = await email_client.deliverability_monitor.get_suppression_list()
             
-            await email_client.cleanup()
-            
             return {
                 "reputation_data": reputation_data,
                 "suppressed_count": len(suppressed),
@@ -414,11 +399,13 @@ def cleanup_email_data() -> Dict[str, Any]:
             cleaned_failed = 0
             cleaned_events = 0
             
-            await email_client.cleanup()
+            # Bulk SES templates count towards the account's template limit
+            deleted_templates = await email_client.cleanup_ses_templates(max_age=timedelta(days=7))
             
             return {
                 "cleaned_failed_jobs": cleaned_failed,
-                "cleaned_events": cleaned_events
+                "cleaned_events": cleaned_events,
+                "deleted_ses_templates": deleted_templates
             }
         
         result = run_async(_cleanup())
@@ -1,7 +1,6 @@
 """
 GDPR compliance and data management Celery tasks.
 """
-import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
@@ -9,23 +8,12 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from workers.celery_app import celery_app
+from workers.celery_app import celery_app, run_async
 from core.database import get_async_session
 
 logger = logging.getLogger(__name__)
 
 
-def run_async(coro):
-    """Helper to run async functions in Celery tasks."""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    
-    return loop.run_until_complete(coro)
-
-
 @celery_app.task
 def check_data_retention() -> Dict[str, Any]:
     """Check and enforce data retention policies across all workspaces."""
@@ -349,8 +337,6 @@ def sync_suppression_lists() -> Dict[str, Any]:
                         )
                         sync_results["added_to_internal"] += 1
                 
-                await email_client.cleanup()
-                
                 return sync_results
         
         sync_results = run_async(_sync_suppressions())
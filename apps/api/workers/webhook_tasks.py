@@ -1,6 +1,8 @@
 """
 Background tasks for processing webhook events.
 """
+import hashlib
+import json
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -13,18 +15,90 @@ from core.database import get_async_session
 from models.email_event import EmailEvent
 from models.lead import Lead
 from models.campaign import Campaign
-from utils.redis_manager import get_analytics_cache, get_deliverability_cache
-from workers.celery_app import celery_app
+from core.redis import get_analytics_cache, get_deliverability_cache, get_redis
+from workers.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 
+# Providers redeliver events, processed ones are remembered this long
+WEBHOOK_DEDUPE_TTL = 7 * 24 * 3600
+
+
+# Provider-specific event types mapped to our standard types
+EVENT_STATUS_MAPPING = {
+    "ses": {
+        "send": "sent",
+        "delivery": "delivered",
+        "bounce": "bounced",
+        "complaint": "complained",
+        "open": "opened",
+        "click": "clicked",
+        "reject": "rejected"
+    },
+    "sendgrid": {
+        "delivered": "delivered",
+        "bounce": "bounced",
+        "dropped": "dropped",
+        "spamreport": "complained",
+        "unsubscribe": "unsubscribed",
+        "group_unsubscribe": "unsubscribed",
+        "open": "opened",
+        "click": "clicked",
+        "processed": "sent"
+    },
+    "mailgun": {
+        "delivered": "delivered",
+        "failed": "failed",
+        "opened": "opened",
+        "clicked": "clicked",
+        "unsubscribed": "unsubscribed",
+        "complained": "complained"
+    },
+    "postmark": {
+        "delivery": "delivered",
+        "bounce": "bounced",
+        "spamcomplaint": "complained",
+        "open": "opened",
+        "click": "clicked"
+    }
+}
+
+
+def _standard_status(event_data: Dict[str, Any]) -> str:
+    """Standard status of a provider event, SES sends event types capitalized."""
+    event_type = event_data.get("event_type") or ""
+    provider_mapping = EVENT_STATUS_MAPPING.get(event_data.get("provider"), {})
+    return provider_mapping.get(event_type.lower(), event_type)
+
+
+def _webhook_event_key(event_data: Dict[str, Any]) -> str:
+    """Redis key identifying a provider event, the same on redelivery and retries."""
+    event_id = hashlib.sha256(json.dumps(
+        [
+            event_data.get("provider"),
+            event_data.get("message_id"),
+            event_data.get("event_type"),
+            event_data.get("timestamp"),
+            event_data.get("event_data")
+        ],
+        sort_keys=True,
+        default=str
+    ).encode()).hexdigest()
+    return f"webhook:processed:{event_id}"
+
 
 @celery_app.task(bind=True, max_retries=3)
 def process_webhook_event(self, event_data: Dict[str, Any]):
     """Process webhook event from email providers."""
-    import asyncio
     
     async def _process_event():
+        # Lead scores are updated by deltas, so each event is applied once
+        redis = await get_redis()
+        event_key = _webhook_event_key(event_data)
+        if not await redis.set(event_key, "1", nx=True, ex=WEBHOOK_DEDUPE_TTL):
+            logger.info(f"Skipping already processed webhook event {event_key}")
+            return
+        
         try:
             provider = event_data.get("provider")
             event_type = event_data.get("event_type")
@@ -60,17 +134,21 @@ def process_webhook_event(self, event_data: Dict[str, Any]):
                 # Handle special events
                 await _handle_special_events(db, email_event, event_data)
                 
+                # Apply the event to the lead's score
+                await _update_lead_score(db, email_event, event_data)
+                
                 await db.commit()
                 
                 logger.info(f"Successfully processed {provider} webhook event")
         
         except Exception as e:
             logger.error(f"Error processing webhook event: {str(e)}")
-            # Retry the task
+            # Nothing was committed, let the retry process the event
+            await redis.delete(event_key)
             raise self.retry(countdown=60, exc=e)
     
     # Run the async function
-    asyncio.run(_process_event())
+    run_async(_process_event())
 
 
 async def _update_email_event(
@@ -80,52 +158,11 @@ async def _update_email_event(
 ) -> None:
     """Update email event with webhook data."""
     provider = event_data.get("provider")
-    event_type = event_data.get("event_type")
     timestamp = datetime.fromisoformat(event_data.get("timestamp"))
     raw_event_data = event_data.get("event_data", {})
     
-    # Map provider-specific event types to our standard types
-    status_mapping = {
-        "ses": {
-            "send": "sent",
-            "delivery": "delivered",
-            "bounce": "bounced",
-            "complaint": "complained",
-            "open": "opened",
-            "click": "clicked",
-            "reject": "rejected"
-        },
-        "sendgrid": {
-            "delivered": "delivered",
-            "bounce": "bounced",
-            "dropped": "dropped",
-            "spamreport": "complained",
-            "unsubscribe": "unsubscribed",
-            "group_unsubscribe": "unsubscribed",
-            "open": "opened",
-            "click": "clicked",
-            "processed": "sent"
-        },
-        "mailgun": {
-            "delivered": "delivered",
-            "failed": "failed",
-            "opened": "opened",
-            "clicked": "clicked",
-            "unsubscribed": "unsubscribed",
-            "complained": "complained"
-        },
-        "postmark": {
-            "delivery": "delivered",
-            "bounce": "bounced",
-            "spamcomplaint": "complained",
-            "open": "opened",
-            "click": "clicked"
-        }
-    }
-    
     # Get standardized status
-    provider_mapping = status_mapping.get(provider, {})
-    standard_status = provider_mapping.get(event_type, event_type)
+    standard_status = _standard_status(event_data)
     
     # Update email event
     update_data = {
@@ -404,7 +441,8 @@ async def _handle_bounce(
             ).values(
                 is_bounced=True,
                 bounced_at=datetime.utcnow(),
-                bounce_type="hard"
+                bounce_type="hard",
+                email_status="invalid"
             )
             await db.execute(stmt)
             
@@ -414,6 +452,32 @@ async def _handle_bounce(
         logger.error(f"Error handling bounce: {str(e)}")
 
 
+async def _update_lead_score(
+    db: AsyncSession,
+    email_event: EmailEvent,
+    event_data: Dict[str, Any]
+) -> None:
+    """Apply engagement and bounce events to the lead's score incrementally."""
+    try:
+        if not email_event.lead_id:
+            return
+        
+        from services.lead_scoring_service import LeadScoringService
+        
+        # A failed score update must not roll back the event itself
+        async with db.begin_nested():
+            service = LeadScoringService(db)
+            await service.apply_engagement_event(
+                str(email_event.lead_id),
+                str(email_event.workspace_id),
+                _standard_status(event_data),
+                datetime.fromisoformat(event_data.get("timestamp"))
+            )
+    
+    except Exception as e:
+        logger.error(f"Error updating lead score: {str(e)}")
+
+
 async def _create_orphaned_email_event(
     db: AsyncSession,
     event_data: Dict[str, Any]
@@ -447,7 +511,6 @@ async def _create_orphaned_email_event(
 @celery_app.task
 def cleanup_old_webhook_events():
     """Clean up old webhook event data."""
-    import asyncio
     
     async def _cleanup():
         try:
@@ -467,4 +530,27 @@ def cleanup_old_webhook_events():
         except Exception as e:
             logger.error(f"Error cleaning up webhook events: {str(e)}")
     
-    asyncio.run(_cleanup())
\ No newline at end of file
+    run_async(_cleanup())
+
+
+@celery_app.task
+def reconcile_lead_scores():
+    """Fully recalculate lead scores that were updated incrementally."""
+    
+    async def _reconcile():
+        try:
+            from services.lead_scoring_service import LeadScoringService
+            
+            async with get_async_session() as db:
+                service = LeadScoringService(db)
+                processed = await service.reconcile_scores()
+                
+                logger.info(
+                    f"Reconciled {sum(processed.values())} lead scores "
+                    f"across {len(processed)} workspaces"
+                )
+        
+        except Exception as e:
+            logger.error(f"Error reconciling lead scores: {str(e)}")
+    
+    run_async(_reconcile())
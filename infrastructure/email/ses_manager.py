@@ -134,6 +134,15 @@ class SESConfig:
     unsubscribe_url: str = "https://app.coldcopy.ai/unsubscribe"
 
 
+# Stands in for the tracking ID while an HTML body is compiled into segments
+TRACKING_SLOT = "\x00"
+
+HREF_PATTERN = re.compile(r'href="([^"]+)"')
+
+# SES SendBulkTemplatedEmail accepts at most 50 destinations per call
+SES_BULK_MAX_DESTINATIONS = 50
+
+
 # Prometheus metrics
 emails_sent = Counter('coldcopy_emails_sent_total', 'Total emails sent', ['region', 'type', 'status'])
 email_send_duration = Histogram('coldcopy_email_send_duration_seconds', 'Email send duration', ['region'])
@@ -155,6 +164,10 @@ class SESManager:
         self.redis_client = redis.from_url(config.redis_url, decode_responses=True)
         self.executor = ThreadPoolExecutor(max_workers=10)
         
+        # Compiled tracking segments per HTML body, see _get_tracking_segments
+        self._tracking_segments: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+        self.tracking_cache_size = 256
+        
     def _initialize_regions(self) -> Dict[str, SESRegion]:
         """Initialize SES regions"""
         regions = {}
@@ -259,6 +272,108 @@ class SESManager:
         emails_sent.labels(region="all", type=message.email_type.value, status="failed").inc()
         return False, "All regions failed"
     
+    async def send_bulk_templated_email(
+        self,
+        template_name: str,
+        messages: List[EmailMessage],
+        template_data: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Tuple[bool, str]]:
+        """Send messages sharing an SES template, up to 50 destinations per call.
+        
+        Sender, reply-to and email type are taken from the first message.
+        Each destination gets its own template data plus a ``tracking_id``.
+        Returns one (success, message_id or error) tuple per message.
+        """
+        results: List[Optional[Tuple[bool, str]]] = [None] * len(messages)
+        destinations = []
+        
+        for index, message in enumerate(messages):
+            if await self._is_suppressed(message.to_addresses[0]):
+                emails_sent.labels(region="suppressed", type=message.email_type.value, status="suppressed").inc()
+                results[index] = (False, "Recipient is suppressed")
+                continue
+            
+            replacement_data = dict(template_data[index]) if template_data else {}
+            replacement_data['tracking_id'] = self._generate_tracking_id(message)
+            destinations.append((index, {
+                'Destination': {'ToAddresses': message.to_addresses},
+                'ReplacementTemplateData': json.dumps(replacement_data)
+            }))
+        
+        for start in range(0, len(destinations), SES_BULK_MAX_DESTINATIONS):
+            chunk = destinations[start:start + SES_BULK_MAX_DESTINATIONS]
+            statuses = await self._send_bulk_chunk(template_name, messages[0], [d for _, d in chunk])
+            
+            for (index, _), status in zip(chunk, statuses):
+                message = messages[index]
+                if status.get('Status') == 'Success':
+                    results[index] = (True, status['MessageId'])
+                    await self._track_send(message)
+                else:
+                    results[index] = (False, status.get('Error') or status.get('Status', 'Failed'))
+        
+        return results
+    
+    async def _send_bulk_chunk(
+        self,
+        template_name: str,
+        first_message: EmailMessage,
+        destinations: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Send one SendBulkTemplatedEmail call with region failover"""
+        email_type = first_message.email_type.value
+        params = {
+            'Source': formataddr((first_message.from_name, first_message.from_address)),
+            'Template': template_name,
+            'DefaultTemplateData': json.dumps({'tracking_id': ''}),
+            'Destinations': destinations
+        }
+        
+        config_set = self._get_configuration_set(first_message.email_type)
+        if config_set:
+            params['ConfigurationSetName'] = config_set
+        
+        if first_message.reply_to:
+            params['ReplyToAddresses'] = [first_message.reply_to]
+        
+        for region_name in self.regions:
+            if not await self._check_region_health(region_name):
+                logger.warning(f"Region {region_name} unhealthy, skipping")
+                continue
+            
+            try:
+                start_time = time.time()
+                response = await asyncio.get_event_loop().run_in_executor(
+                    self.executor,
+                    lambda: self.ses_clients[region_name].send_bulk_templated_email(**params)
+                )
+                email_send_duration.labels(region=region_name).observe(time.time() - start_time)
+                
+                statuses = response.get('Status', [])
+                statuses += [{'Status': 'Failed'}] * (len(destinations) - len(statuses))
+                
+                for status in statuses:
+                    emails_sent.labels(
+                        region=region_name,
+                        type=email_type,
+                        status="sent" if status.get('Status') == 'Success' else "failed"
+                    ).inc()
+                
+                logger.info(f"Bulk templated email sent via {region_name}: {len(destinations)} destinations")
+                return statuses
+                
+            except ClientError as e:
+                logger.error(f"Failed bulk send via {region_name}: {e.response['Error']['Code']}")
+                continue
+            
+            except Exception as e:
+                logger.error(f"Unexpected error in bulk send via {region_name}: {str(e)}")
+                continue
+        
+        logger.error("Failed to send bulk email through all regions")
+        emails_sent.labels(region="all", type=email_type, status="failed").inc(len(destinations))
+        return [{'Status': 'Failed', 'Error': 'All regions failed'} for _ in destinations]
+    
     async def _send_via_region(self, region_name: str, message: EmailMessage) -> str:
         """Send email through specific region"""
         client = self.ses_clients[region_name]
@@ -461,16 +576,39 @@ class SESManager:
         pixel_url = f"{self.config.tracking_pixel_url}?{urlencode(pixel_params)}"
         
         tracking_pixel = f'<img src="{pixel_url}" width="1" height="1" style="display:none;" alt="">'
-        message.html_body = message.html_body.replace('</body>', f'{tracking_pixel}</body>')
         
-        # Add click tracking
-        message.html_body = self._add_click_tracking(message.html_body, tracking_id)
+        # Render from the cached segments: body chunks split at </body>,
+        # each split again at the click tracking ID
+        body_parts = self._get_tracking_segments(message.html_body)
+        message.html_body = f'{tracking_pixel}</body>'.join(
+            tracking_id.join(segments) for segments in body_parts
+        )
         
         return message
     
     def _add_click_tracking(self, html: str, tracking_id: str) -> str:
         """Replace links with tracking links"""
-        import re
+        return tracking_id.join(self._compile_click_tracking(html).split(TRACKING_SLOT))
+    
+    def _get_tracking_segments(self, html: str) -> Tuple[Tuple[str, ...], ...]:
+        """Get the HTML split at </body> and then at the tracking ID, compiled once per body"""
+        body_parts = self._tracking_segments.get(html)
+        
+        if body_parts is None:
+            body_parts = tuple(
+                tuple(self._compile_click_tracking(part).split(TRACKING_SLOT))
+                for part in html.split('</body>')
+            )
+            
+            if len(self._tracking_segments) >= self.tracking_cache_size:
+                self._tracking_segments.pop(next(iter(self._tracking_segments)))
+            self._tracking_segments[html] = body_parts
+        
+        return body_parts
+    
+    def _compile_click_tracking(self, html: str) -> str:
+        """Rewrite links to tracking links, leaving TRACKING_SLOT where the tracking ID goes"""
+        html = html.replace(TRACKING_SLOT, '')
         
         def replace_link(match):
             original_url = match.group(1)
@@ -479,18 +617,14 @@ class SESManager:
             if any(skip in original_url for skip in ['unsubscribe', 'tracking', 'mailto:', '#']):
                 return match.group(0)
             
-            # Create tracking URL
-            click_params = {
-                'id': tracking_id,
-                'url': base64.urlsafe_b64encode(original_url.encode()).decode()
-            }
-            tracking_url = f"{self.config.click_tracking_url}?{urlencode(click_params)}"
+            # Create tracking URL (tracking IDs are hex, so they need no URL encoding)
+            url_param = urlencode({'url': base64.urlsafe_b64encode(original_url.encode()).decode()})
+            tracking_url = f"{self.config.click_tracking_url}?id={TRACKING_SLOT}&{url_param}"
             
             return f'href="{tracking_url}"'
         
         # Replace all href links
-        pattern = r'href="([^"]+)"'
-        return re.sub(pattern, replace_link, html)
+        return HREF_PATTERN.sub(replace_link, html)
     
     def _generate_tracking_id(self, message: EmailMessage) -> str:
         """Generate unique tracking ID for email"""
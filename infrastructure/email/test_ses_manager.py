@@ -0,0 +1,135 @@
+"""
+Tests for SESManager.send_bulk_templated_email with mocked SES clients
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from ses_manager import SESConfig, SESManager, EmailMessage, EmailType
+
+
+PRIMARY = "us-east-1"
+BACKUP = "eu-west-1"
+
+
+def _message(index: int) -> EmailMessage:
+    return EmailMessage(
+        to_addresses=[f"lead{index}@example.com"],
+        from_address="sales@coldcopy.ai",
+        from_name="ColdCopy",
+        subject="Hello",
+        html_body="<p>Hello</p>",
+        text_body="Hello",
+        email_type=EmailType.MARKETING,
+        campaign_id="campaign-1"
+    )
+
+
+def _succeed_all(**params):
+    """SES response accepting every destination"""
+    return {'Status': [
+        {'Status': 'Success', 'MessageId': f"msg-{destination['Destination']['ToAddresses'][0]}"}
+        for destination in params['Destinations']
+    ]}
+
+
+@pytest.fixture
+def manager():
+    """SES manager with one mocked client per region, all regions healthy"""
+    config = SESConfig(
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        primary_region=PRIMARY,
+        backup_regions=[BACKUP]
+    )
+
+    with patch('ses_manager.boto3.client', side_effect=lambda *args, **kwargs: MagicMock()), \
+         patch('ses_manager.redis.from_url', return_value=MagicMock()):
+        manager = SESManager(config)
+
+    manager._check_region_health = AsyncMock(return_value=True)
+    manager._is_suppressed = AsyncMock(return_value=False)
+    manager._track_send = AsyncMock()
+    return manager
+
+
+def test_partially_failed_chunk(manager):
+    """Each destination gets its own status, missing statuses count as failed"""
+    manager.ses_clients[PRIMARY].send_bulk_templated_email.return_value = {'Status': [
+        {'Status': 'Success', 'MessageId': 'msg-0'},
+        {'Status': 'MessageRejected', 'Error': 'Address blacklisted'},
+        {'Status': 'Success', 'MessageId': 'msg-2'}
+    ]}
+    messages = [_message(i) for i in range(4)]
+
+    results = asyncio.run(manager.send_bulk_templated_email("coldcopy-intro", messages))
+
+    assert results == [
+        (True, 'msg-0'),
+        (False, 'Address blacklisted'),
+        (True, 'msg-2'),
+        (False, 'Failed')
+    ]
+    assert manager._track_send.await_count == 2
+    manager.ses_clients[BACKUP].send_bulk_templated_email.assert_not_called()
+
+
+def test_failover_to_next_region(manager):
+    """A chunk the primary region rejects is sent again through the backup region"""
+    primary = manager.ses_clients[PRIMARY].send_bulk_templated_email
+    backup = manager.ses_clients[BACKUP].send_bulk_templated_email
+    primary.side_effect = ClientError(
+        {'Error': {'Code': 'Throttling', 'Message': 'Maximum sending rate exceeded'}},
+        'SendBulkTemplatedEmail'
+    )
+    backup.side_effect = _succeed_all
+    messages = [_message(i) for i in range(3)]
+
+    results = asyncio.run(manager.send_bulk_templated_email("coldcopy-intro", messages))
+
+    assert results == [(True, f"msg-lead{i}@example.com") for i in range(3)]
+    assert primary.call_count == 1
+    assert backup.call_count == 1
+    assert backup.call_args.kwargs == primary.call_args.kwargs
+    assert backup.call_args.kwargs['ConfigurationSetName'] == manager.config.marketing_config_set
+
+
+def test_all_regions_failing(manager):
+    """Every destination fails when no region accepts the chunk"""
+    for client in manager.ses_clients.values():
+        client.send_bulk_templated_email.side_effect = ClientError(
+            {'Error': {'Code': 'ServiceUnavailable', 'Message': 'Unavailable'}},
+            'SendBulkTemplatedEmail'
+        )
+
+    results = asyncio.run(manager.send_bulk_templated_email("coldcopy-intro", [_message(0), _message(1)]))
+
+    assert results == [(False, 'All regions failed')] * 2
+    manager._track_send.assert_not_awaited()
+
+
+def test_chunks_of_50_destinations(manager):
+    """More than 50 recipients are split into calls of at most 50, results keep message order"""
+    send = manager.ses_clients[PRIMARY].send_bulk_templated_email
+    send.side_effect = _succeed_all
+    manager._is_suppressed.side_effect = lambda email: email == "lead7@example.com"
+    messages = [_message(i) for i in range(120)]
+    template_data = [{'first_name': f"Lead {i}"} for i in range(120)]
+
+    results = asyncio.run(manager.send_bulk_templated_email("coldcopy-intro", messages, template_data))
+
+    assert [len(call.kwargs['Destinations']) for call in send.call_args_list] == [50, 50, 19]
+    assert results[7] == (False, "Recipient is suppressed")
+    assert results[:7] + results[8:] == [
+        (True, f"msg-lead{i}@example.com") for i in range(120) if i != 7
+    ]
+
+    first = send.call_args_list[0].kwargs['Destinations'][0]
+    replacement_data = json.loads(first['ReplacementTemplateData'])
+    assert first['Destination'] == {'ToAddresses': ["lead0@example.com"]}
+    assert replacement_data['first_name'] == "Lead 0"
+    assert replacement_data['tracking_id']